@@ -0,0 +1,97 @@
+# Mide el arranque en frío de una réplica nueva del dashboard:
+#   - importacion:   importar los módulos de nivel superior de perfiles.py
+#   - primer_render: primera ejecución completa de perfiles.py (AppTest) con
+#                    caché vacía, hasta servir la vista inicial
+# Cada repetición corre en un proceso nuevo (nada queda en sys.modules).
+# También informa qué dependencias pesadas quedaron cargadas: fpdf y plotly
+# deben importarse sólo con la acción o la vista que las usa.
+#
+# Uso: python benchmarks/bench_arranque.py --vendedores 60 --repeticiones 3 --json
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from benchmarks.sinteticos import FILAS_POR_VENDEDOR, generar_datos  # noqa: E402
+
+MODULOS_PESADOS = ("plotly", "fpdf", "matplotlib", "openpyxl", "pyarrow", "xlsxwriter")
+
+IMPORTACION = """
+import time
+inicio = time.perf_counter()
+import streamlit, pandas, numpy, nucleo
+segundos = time.perf_counter() - inicio
+"""
+
+PRIMER_RENDER = """
+import time
+inicio = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=600)
+at.run()
+segundos = time.perf_counter() - inicio
+if at.exception:
+    raise SystemExit(at.exception[0].value)
+"""
+
+SALIDA = """
+import json, sys
+print(json.dumps({{"segundos": segundos, "modulos": [m for m in {modulos!r} if m in sys.modules]}}))
+"""
+
+
+def ejecutar(codigo, entorno):
+    resultado = subprocess.run(
+        [sys.executable, "-c", codigo], cwd=RAIZ, env=entorno,
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(resultado.stdout.strip().splitlines()[-1])
+
+
+def medir(codigo, entorno, repeticiones, cache_dir=None):
+    tiempos, modulos = [], []
+    for i in range(repeticiones):
+        if cache_dir:
+            # Caché vacía en cada repetición: una réplica nueva no tiene disco previo
+            entorno = {**entorno, "PERFILES_CACHE_DIR": os.path.join(cache_dir, str(i))}
+        medicion = ejecutar(codigo + SALIDA.format(modulos=MODULOS_PESADOS), entorno)
+        tiempos.append(medicion["segundos"])
+        modulos = medicion["modulos"]
+    return {"segundos": min(tiempos), "mediana": statistics.median(tiempos), "modulos_pesados": modulos}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de arranque en frío del dashboard")
+    parser.add_argument("--vendedores", type=int, default=60)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="Salida en JSON por línea")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        datos = generar_datos(args.vendedores * FILAS_POR_VENDEDOR, vendedores=args.vendedores)
+        entorno = {**os.environ, "PYTHONPATH": RAIZ, **datos.escribir(directorio)}
+
+        casos = {
+            "importacion": lambda: medir(IMPORTACION, entorno, args.repeticiones),
+            "primer_render": lambda: medir(
+                PRIMER_RENDER.format(app=os.path.join(RAIZ, "perfiles.py")), entorno,
+                args.repeticiones, cache_dir=os.path.join(directorio, "cache"),
+            ),
+        }
+        for caso, funcion in casos.items():
+            resultado = {"vendedores": args.vendedores, "caso": caso, **funcion()}
+            if args.json:
+                print(json.dumps(resultado))
+            else:
+                print(f"{caso:<14} {resultado['segundos']:8.3f} s (mediana {resultado['mediana']:.3f} s) "
+                      f"cargados: {', '.join(resultado['modulos_pesados']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
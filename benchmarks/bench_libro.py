@@ -0,0 +1,103 @@
+# Compara la ingesta del libro de cumplimiento:
+#   - actual:     dos pd.read_excel sobre la URL (dos descargas y dos parseos)
+#   - completo:   una descarga a memoria y un parseo con todas las hojas
+#   - streaming:  una descarga y lectura openpyxl en modo sólo lectura
+#
+# Uso: python benchmarks/bench_libro.py --filas 20000 50000 --repeticiones 3
+import argparse
+import functools
+import http.server
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import urllib.request
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.sinteticos import escribir_libro, generar_datos  # noqa: E402
+from nucleo.libros import leer_libro  # noqa: E402
+
+
+def generar_libro(ruta, filas, semilla=0):
+    datos = generar_datos(filas, semilla=semilla)
+    escribir_libro(ruta, datos.df_cump, datos.df_info)
+
+
+class ManejadorSilencioso(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def servir(directorio):
+    manejador = functools.partial(ManejadorSilencioso, directory=directorio)
+    servidor = http.server.ThreadingHTTPServer(("127.0.0.1", 0), manejador)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+def ruta_actual(url):
+    pd.read_excel(url, sheet_name="CUMPLIMIENTO")
+    pd.read_excel(url, sheet_name="informaciones")
+
+
+def ruta_una_descarga(url, modo):
+    with urllib.request.urlopen(url) as respuesta:
+        contenido = respuesta.read()
+    leer_libro(contenido, hojas=["CUMPLIMIENTO", "informaciones"], modo=modo)
+
+
+def medir(funcion, repeticiones):
+    # El tiempo se mide sin tracemalloc, que ralentiza mucho el parseo
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    try:
+        funcion()
+        pico = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"segundos": min(tiempos), "pico_mb": pico / 2**20}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de ingesta del libro de cumplimiento")
+    parser.add_argument("--filas", type=int, nargs="+", default=[10000, 50000])
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="Salida en JSON por línea")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        servidor = servir(directorio)
+        try:
+            for filas in args.filas:
+                nombre = f"cumplimiento_{filas}.xlsx"
+                generar_libro(os.path.join(directorio, nombre), filas)
+                url = f"http://127.0.0.1:{servidor.server_port}/{nombre}"
+
+                casos = {
+                    "actual": lambda: ruta_actual(url),
+                    "completo": lambda: ruta_una_descarga(url, "completo"),
+                    "streaming": lambda: ruta_una_descarga(url, "streaming"),
+                }
+                for caso, funcion in casos.items():
+                    resultado = {"filas": filas, "caso": caso, **medir(funcion, args.repeticiones)}
+                    if args.json:
+                        print(json.dumps(resultado))
+                    else:
+                        print(f"{filas:>8} {caso:<10} {resultado['segundos']:8.3f} s {resultado['pico_mb']:8.1f} MB")
+        finally:
+            servidor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+# Suite de rendimiento de los caminos críticos del núcleo sobre datos
+# sintéticos (benchmarks/sinteticos.py):
+#   - parseo de las tres fuentes (CSV de evaluación y seguimiento, libro xlsx)
+#   - procesar_datos + motor de reglas
+#   - búsquedas por vendedor en la dimensión de vendedores y en el seguimiento por ruta
+#   - agregados del Resumen (resumen_equipo, correlaciones, cubo de cumplimiento)
+#   - tendencias de cumplimiento de todo el equipo
+#   - preparación del mapa y cobertura de visitas del equipo
+#   - generar_pdf_perfil
+#
+# Cada resultado es una línea JSON (--json) o un archivo con metadatos
+# (--salida) que se puede comparar con el de otra versión (--comparar).
+#
+# Uso: python benchmarks/bench_nucleo.py --filas 1000 100000 --salida resultados.json
+#      python benchmarks/bench_nucleo.py --filas 1000 100000 --comparar resultados.json
+# Con 1M de filas escribir y parsear el libro xlsx tarda varios minutos;
+# --casos permite correr sólo una parte de la suite.
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from benchmarks.bench_libro import medir  # noqa: E402
+from benchmarks.sinteticos import generar_datos  # noqa: E402
+from nucleo import carga  # noqa: E402
+from nucleo.cobertura import construir_cobertura  # noqa: E402
+from nucleo.correlaciones import construir_correlaciones  # noqa: E402
+from nucleo.cubo import construir_cubo_cumplimiento  # noqa: E402
+from nucleo.mapas import construir_ubicaciones, marcadores_mapa  # noqa: E402
+from nucleo.procesamiento import procesar_datos, resumen_equipo  # noqa: E402
+from nucleo.reportes import generar_pdf_perfil  # noqa: E402
+from nucleo.seguimiento import construir_seguimiento_por_ruta  # noqa: E402
+from nucleo.segmentacion import aplicar_reglas  # noqa: E402
+from nucleo.tendencias import construir_tendencias  # noqa: E402
+from nucleo.vendedores import construir_dimension_vendedores  # noqa: E402
+
+BUSQUEDAS = 1000
+ZOOM_MAPA = 12
+
+
+def preparar(filas, semilla):
+    # Entradas de cada caso: contenidos crudos y datasets ya parseados
+    datos = generar_datos(filas, semilla=semilla)
+    contenidos = datos.contenidos()
+    df_eval = carga.parsear_evaluacion(contenidos["evaluacion"])
+    df_seg = carga.parsear_seguimiento(contenidos["seguimiento"])
+    df_cump, df_info = carga.parsear_cumplimiento(contenidos["cumplimiento"])
+    df_info = carga.normalizar_informacion(df_info)
+    df_eval_procesado = aplicar_reglas(procesar_datos(df_eval.copy()))
+    dimension = construir_dimension_vendedores(df_eval_procesado, df_info, df_seg, df_cump)
+    return {
+        "contenidos": contenidos,
+        "df_eval": df_eval,
+        "df_eval_procesado": df_eval_procesado,
+        "df_seg": df_seg,
+        "df_cump": df_cump,
+        "df_info": df_info,
+        "dimension": dimension,
+        "cubo": construir_cubo_cumplimiento(df_cump),
+        "ubicaciones": construir_ubicaciones(df_seg),
+        "seguimiento": construir_seguimiento_por_ruta(df_seg),
+        "cobertura": construir_cobertura(df_seg, df_eval_procesado, dimension),
+        "vendedores": np.random.default_rng(semilla).choice(df_eval["ruta"].to_numpy(), BUSQUEDAS),
+    }
+
+
+def buscar_vendedores(e):
+    for vendedor in e["vendedores"]:
+        e["dimension"].seleccionar(e["df_cump"], "cumplimiento", vendedor)
+        e["dimension"].seleccionar(e["df_seg"], "seguimiento", vendedor)
+
+
+def buscar_visitas(e):
+    for vendedor in e["vendedores"]:
+        e["seguimiento"].de(vendedor)
+
+
+def consultar_cobertura(e):
+    cobertura = e["cobertura"]
+    for periodo in ("M", "W"):
+        cobertura.por_supervisor(periodo)
+    cobertura.brechas()
+
+
+def consultar_cubo(e):
+    cubo = e["cubo"]
+    desde, hasta = cubo.rango_fechas()
+    cubo.consultar()
+    cubo.consultar(por=("supervisor",), desde=desde, hasta=hasta)
+    cubo.consultar(por=("vendedor",), desde=desde, hasta=hasta, colapsar_fecha=True)
+
+
+CASOS = {
+    "parsear_evaluacion": lambda e: carga.parsear_evaluacion(e["contenidos"]["evaluacion"]),
+    "parsear_seguimiento": lambda e: carga.parsear_seguimiento(e["contenidos"]["seguimiento"]),
+    "parsear_cumplimiento": lambda e: carga.parsear_cumplimiento(e["contenidos"]["cumplimiento"]),
+    "procesar_datos": lambda e: aplicar_reglas(procesar_datos(e["df_eval"].copy())),
+    "dimension_vendedores": lambda e: construir_dimension_vendedores(
+        e["df_eval_procesado"], e["df_info"], e["df_seg"], e["df_cump"]),
+    "busquedas_vendedor": buscar_vendedores,
+    "seguimiento_particiones": lambda e: construir_seguimiento_por_ruta(e["df_seg"]),
+    "busquedas_visitas": buscar_visitas,
+    "resumen_equipo": lambda e: resumen_equipo(e["df_eval_procesado"]),
+    "correlaciones": lambda e: construir_correlaciones(e["df_eval_procesado"], e["df_cump"], e["dimension"]),
+    "cubo_construccion": lambda e: construir_cubo_cumplimiento(e["df_cump"]),
+    "cubo_consultas": consultar_cubo,
+    "tendencias": lambda e: construir_tendencias(e["df_cump"], e["dimension"]),
+    "mapa": lambda e: marcadores_mapa(construir_ubicaciones(e["df_seg"]), ZOOM_MAPA),
+    "cobertura_construccion": lambda e: construir_cobertura(e["df_seg"], e["df_eval_procesado"], e["dimension"]),
+    "cobertura_consultas": consultar_cobertura,
+    "pdf_perfil": lambda e: generar_pdf_perfil(
+        e["vendedores"][0], e["df_eval_procesado"], e["df_seg"], e["df_cump"], e["df_info"],
+        dimension=e["dimension"]),
+}
+
+
+def metadatos():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "cpus": os.cpu_count(),
+    }
+
+
+def comparar(resultados, archivo, tolerancia):
+    # -> casos que empeoraron más que la tolerancia respecto del archivo anterior
+    with open(archivo) as f:
+        anteriores = {(r["filas"], r["caso"]): r for r in json.load(f)["resultados"]}
+    regresiones = []
+    for r in resultados:
+        anterior = anteriores.get((r["filas"], r["caso"]))
+        if anterior is None or not anterior["segundos"]:
+            continue
+        razon = r["segundos"] / anterior["segundos"]
+        marca = "  REGRESIÓN" if razon > tolerancia else ""
+        print(f"{r['filas']:>8} {r['caso']:<22} {anterior['segundos']:8.4f} -> {r['segundos']:8.4f} s  x{razon:.2f}{marca}")
+        if marca:
+            regresiones.append(r)
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de los caminos críticos del núcleo")
+    parser.add_argument("--filas", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--casos", nargs="+", choices=list(CASOS), default=list(CASOS))
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Salida en JSON por línea")
+    parser.add_argument("--salida", help="Guardar resultados y metadatos en un archivo JSON")
+    parser.add_argument("--comparar", help="Archivo JSON de una corrida anterior")
+    parser.add_argument("--tolerancia", type=float, default=1.25,
+                        help="Razón de tiempo a partir de la cual un caso es regresión")
+    args = parser.parse_args()
+
+    resultados = []
+    for filas in args.filas:
+        entradas = preparar(filas, args.semilla)
+        for caso in args.casos:
+            resultado = {
+                "filas": filas,
+                "vendedores": len(entradas["df_eval"]),
+                "caso": caso,
+                **medir(lambda: CASOS[caso](entradas), args.repeticiones),
+            }
+            resultados.append(resultado)
+            if args.json:
+                print(json.dumps(resultado))
+            elif not args.comparar:
+                print(f"{filas:>8} {caso:<22} {resultado['segundos']:8.4f} s {resultado['pico_mb']:8.1f} MB")
+
+    if args.salida:
+        with open(args.salida, "w") as f:
+            json.dump({"metadatos": metadatos(), "resultados": resultados}, f, indent=2)
+
+    if args.comparar and comparar(resultados, args.comparar, args.tolerancia):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# Memoria por sesión: con los cachés ya calientes (otra sesión cargó los
+# datos), cada sesión nueva hace su primer rerun con AppTest. Se mide con
+# tracemalloc el pico asignado durante el rerun y lo que la sesión retiene
+# mientras sigue abierta. Con datasets compartidos ambos deben ser pequeños
+# y no depender del tamaño de los datos.
+#
+# Uso: python benchmarks/bench_sesiones.py --filas 100000 --sesiones 5 --json
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from benchmarks.sinteticos import generar_datos  # noqa: E402
+
+VISTAS = ("Resumen Ejecutivo", "Individual", "Equipo")
+
+
+def abrir_sesion(vista):
+    from streamlit.testing.v1 import AppTest
+
+    sesion = AppTest.from_file(os.path.join(RAIZ, "perfiles.py"), default_timeout=600)
+    sesion.run()
+    if vista != VISTAS[0]:
+        sesion.sidebar.radio[0].set_value(vista)
+        sesion.run()
+    if sesion.exception:
+        raise RuntimeError(sesion.exception[0].value)
+    return sesion
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de memoria por sesión concurrente")
+    parser.add_argument("--filas", type=int, default=100000)
+    parser.add_argument("--sesiones", type=int, default=5)
+    parser.add_argument("--vista", choices=VISTAS, default=VISTAS[0])
+    parser.add_argument("--json", action="store_true", help="Salida en JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        os.environ.update(generar_datos(args.filas).escribir(directorio))
+        os.environ["PERFILES_CACHE_DIR"] = os.path.join(directorio, "cache")
+
+        inicio = time.perf_counter()
+        abiertas = [abrir_sesion(args.vista)]      # carga en frío: llena los cachés
+        segundos_frio = time.perf_counter() - inicio
+
+        tracemalloc.start()
+        picos, retenidos, tiempos = [], [], []
+        try:
+            for _ in range(args.sesiones):
+                tracemalloc.reset_peak()
+                antes = tracemalloc.get_traced_memory()[0]
+                inicio = time.perf_counter()
+                abiertas.append(abrir_sesion(args.vista))
+                tiempos.append(time.perf_counter() - inicio)
+                actual, pico = tracemalloc.get_traced_memory()
+                picos.append((pico - antes) / 2**20)
+                retenidos.append((actual - antes) / 2**20)
+        finally:
+            tracemalloc.stop()
+
+    resultado = {
+        "filas": args.filas,
+        "vista": args.vista,
+        "sesiones": args.sesiones,
+        "segundos_frio": segundos_frio,
+        "segundos_sesion": statistics.median(tiempos),
+        "pico_mb_sesion": statistics.median(picos),
+        "retenido_mb_sesion": statistics.median(retenidos),
+    }
+    if args.json:
+        print(json.dumps(resultado))
+    else:
+        print(f"{args.filas} filas · {args.vista} · carga en frío {segundos_frio:.2f} s")
+        print(f"por sesión: {resultado['segundos_sesion']:.2f} s · pico {resultado['pico_mb_sesion']:.1f} MB "
+              f"· retenido {resultado['retenido_mb_sesion']:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
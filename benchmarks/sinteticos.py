@@ -0,0 +1,135 @@
+# Datos sintéticos con las mismas columnas que entregan las fuentes reales:
+# encabezados del formulario de evaluación, seguimiento con "Location" y
+# "Timestamp" en texto, y el libro de cumplimiento con sus dos hojas.
+#
+# La escala es la cantidad de filas de las tablas de hechos (cumplimiento y
+# seguimiento); los vendedores salen de ahí con 3 indicadores x 24 meses por
+# vendedor, como en el libro real.
+import io
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from nucleo.esquema import COLUMNAS_CUALITATIVAS, REGISTRO
+
+SUPERVISORES = ("HENRY ESPINAL", "MIGUEL CAMILO", "JOSE MARTINEZ", "ANA ROSARIO")
+INDICADORES = ("VENTA", "COBERTURA", "EFECTIVIDAD")
+ZONAS = ("NORTE", "SUR", "ESTE", "OESTE")
+FILAS_POR_VENDEDOR = len(INDICADORES) * 24
+
+
+def encabezado(clave):
+    # "respeto,_trato_cordial_y_empatía" -> "Respeto, trato cordial y empatía"
+    return clave.replace("_", " ").capitalize()
+
+
+def generar_rutas(vendedores):
+    return np.array([f"R{i:04d}" for i in range(vendedores)], dtype=object)
+
+
+def generar_evaluacion(rutas, supervisores, rng):
+    n = len(rutas)
+    df_eval = pd.DataFrame({"Marca temporal": "1/2/2025 10:00:00", "Ruta": rutas, "Supervisor": supervisores})
+    for pregunta in REGISTRO:
+        puntajes = rng.integers(3, 11, n).astype(float)
+        puntajes[rng.random(n) < 0.02] = np.nan     # preguntas sin responder
+        df_eval[encabezado(pregunta.clave)] = puntajes
+    for columna in COLUMNAS_CUALITATIVAS:
+        df_eval[encabezado(columna)] = rng.choice(["Buen trato", "Puntualidad", "", "Curso de ventas"], n)
+    return df_eval
+
+
+def generar_seguimiento(rutas, supervisores, filas, rng):
+    vendedor = rng.integers(0, len(rutas), filas)
+    minutos = rng.integers(0, 730 * 24 * 60, filas)
+    marcas = (np.datetime64("2024-01-01") + minutos.astype("timedelta64[m]")).astype("datetime64[s]")
+    # Cada ruta visita alrededor de un punto propio
+    centros = rng.normal(0, 0.3, (len(rutas), 2)) + [18.6, -70.1]
+    coordenadas = centros[vendedor] + rng.normal(0, 0.02, (filas, 2))
+    location = pd.Series(coordenadas[:, 0].round(5).astype(str)) + "," + coordenadas[:, 1].round(5).astype(str)
+    location[rng.random(filas) < 0.01] = ""                     # visitas sin GPS
+    return pd.DataFrame({
+        "Timestamp": pd.DatetimeIndex(marcas).strftime("%d/%m/%Y %H:%M:%S"),
+        "Ruta": rutas[vendedor],
+        "Supervisor": supervisores[vendedor],
+        "Location": location,
+    })
+
+
+def generar_cumplimiento(rutas, supervisores, filas, rng):
+    vendedor = rng.integers(0, len(rutas), filas)
+    return pd.DataFrame({
+        "Vendedor": rutas[vendedor],
+        "Supervisor": supervisores[vendedor],
+        "Indicador": rng.choice(INDICADORES, filas),
+        "Year": rng.integers(2024, 2026, filas),
+        "Mes": rng.integers(1, 13, filas),
+        "Cumplimiento": rng.uniform(40, 130, filas).round(2),
+    })
+
+
+def generar_informacion(rutas, rng):
+    n = len(rutas)
+    return pd.DataFrame({
+        "Ruta": rutas,
+        "Nombre vendedor": [f"VENDEDOR {r}" for r in rutas],
+        "Cedula": [f"001-{i:07d}-1" for i in range(n)],
+        "Telefono": "809-555-0000",
+        "Fecha ingreso": pd.Timestamp("2018-01-01") + pd.to_timedelta(rng.integers(0, 2500, n), unit="D"),
+        "Fecha nacimiento": pd.Timestamp("1975-01-01") + pd.to_timedelta(rng.integers(0, 9000, n), unit="D"),
+        "Zona": rng.choice(ZONAS, n),
+        "Puesto": "Vendedor",
+    })
+
+
+def escribir_libro(destino, df_cump, df_info):
+    # destino: ruta o buffer; openpyxl tarda ~1 min por millón de filas
+    with pd.ExcelWriter(destino, engine="openpyxl") as escritor:
+        df_cump.to_excel(escritor, sheet_name="CUMPLIMIENTO", index=False)
+        df_info.to_excel(escritor, sheet_name="informaciones", index=False)
+
+
+@dataclass
+class DatosSinteticos:
+    df_eval: pd.DataFrame
+    df_seg: pd.DataFrame
+    df_cump: pd.DataFrame
+    df_info: pd.DataFrame
+
+    def contenidos(self):
+        # Bytes tal como los entrega cada fuente (CSV y libro xlsx)
+        libro = io.BytesIO()
+        escribir_libro(libro, self.df_cump, self.df_info)
+        return {
+            "evaluacion": self.df_eval.to_csv(index=False).encode(),
+            "seguimiento": self.df_seg.to_csv(index=False).encode(),
+            "cumplimiento": libro.getvalue(),
+        }
+
+    def escribir(self, directorio):
+        # -> variables de entorno PERFILES_FUENTE_* que apuntan a los archivos
+        archivos = {
+            "evaluacion": "evaluacion.csv",
+            "seguimiento": "seguimiento.csv",
+            "cumplimiento": "cumplimiento.xlsx",
+        }
+        for nombre, contenido in self.contenidos().items():
+            with open(os.path.join(directorio, archivos[nombre]), "wb") as f:
+                f.write(contenido)
+        return {f"PERFILES_FUENTE_{nombre.upper()}": os.path.join(directorio, archivo)
+                for nombre, archivo in archivos.items()}
+
+
+def generar_datos(filas, vendedores=None, semilla=0):
+    rng = np.random.default_rng(semilla)
+    vendedores = vendedores or max(filas // FILAS_POR_VENDEDOR, 10)
+    rutas = generar_rutas(vendedores)
+    supervisores = rng.choice(SUPERVISORES, vendedores).astype(object)
+    return DatosSinteticos(
+        df_eval=generar_evaluacion(rutas, supervisores, rng),
+        df_seg=generar_seguimiento(rutas, supervisores, filas, rng),
+        df_cump=generar_cumplimiento(rutas, supervisores, filas, rng),
+        df_info=generar_informacion(rutas, rng),
+    )
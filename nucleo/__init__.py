@@ -0,0 +1,54 @@
+# Lógica de datos de Gestión Perfiles 360, independiente de la interfaz Streamlit.
+#
+# Uso sin interfaz (trabajos por lotes, benchmarks):
+#   from nucleo import cargar_datos, construir_modelo, generar_lote_pdf
+#   modelo = construir_modelo(cargar_datos())
+from nucleo.artefactos import AlmacenArtefactos, version_artefactos
+from nucleo.carga import DatosCargados, cargar_datos, normalizar_informacion
+from nucleo.cobertura import CoberturaEquipo, MatrizVisitas, construir_cobertura
+from nucleo.compacto import compactar, congelar, reporte_memoria
+from nucleo.correlaciones import AnalisisCorrelaciones, construir_correlaciones, correlacion_por_pares
+from nucleo.cubo import CuboCumplimiento, construir_cubo_cumplimiento
+from nucleo.cumplimiento import IndiceTemporal, construir_indice_temporal, construir_modelo_cumplimiento
+from nucleo.esquema import CATEGORIAS, SECCIONES_COMPETENCIAS, PlanColumnas, resolver_columnas
+from nucleo.fuentes import (
+    ACTUALIZADO, FALLIDO, OBSOLETO, SIN_CAMBIOS,
+    AlmacenInstantaneas, ResultadoFuente, fuentes_configuradas, obtener_instantaneas,
+)
+from nucleo.historial import AlmacenCiclos, HistorialEvaluaciones
+from nucleo.mapas import construir_ubicaciones, marcadores_mapa
+from nucleo.perfilado import Perfilador
+from nucleo.procesamiento import (
+    COL_SUPERVISOR, COL_VENDEDOR, ModeloPerfiles,
+    columnas_faltantes, construir_modelo, procesar_datos, resumen_equipo,
+)
+from nucleo.ranking import RankingEquipo, construir_ranking
+from nucleo.reportes import TIPOS_PDF, escribir_zip_lote, generar_lote_pdf, generar_pdf_perfil
+from nucleo.seguimiento import SeguimientoPorRuta, VisitasRuta, construir_seguimiento_por_ruta
+from nucleo.segmentacion import REGLAS_POR_DEFECTO, ReglasSegmentacion, aplicar_reglas, segmentar
+from nucleo.tendencias import TendenciasCumplimiento, construir_tendencias
+from nucleo.vendedores import DimensionVendedores, construir_dimension_vendedores
+
+__all__ = [
+    "AlmacenArtefactos", "version_artefactos",
+    "DatosCargados", "cargar_datos", "normalizar_informacion",
+    "CoberturaEquipo", "MatrizVisitas", "construir_cobertura",
+    "compactar", "congelar", "reporte_memoria",
+    "AnalisisCorrelaciones", "construir_correlaciones", "correlacion_por_pares",
+    "CuboCumplimiento", "construir_cubo_cumplimiento",
+    "IndiceTemporal", "construir_indice_temporal", "construir_modelo_cumplimiento",
+    "CATEGORIAS", "SECCIONES_COMPETENCIAS", "PlanColumnas", "resolver_columnas",
+    "ACTUALIZADO", "FALLIDO", "OBSOLETO", "SIN_CAMBIOS",
+    "AlmacenInstantaneas", "ResultadoFuente", "fuentes_configuradas", "obtener_instantaneas",
+    "AlmacenCiclos", "HistorialEvaluaciones",
+    "construir_ubicaciones", "marcadores_mapa",
+    "Perfilador",
+    "COL_SUPERVISOR", "COL_VENDEDOR", "ModeloPerfiles",
+    "columnas_faltantes", "construir_modelo", "procesar_datos", "resumen_equipo",
+    "RankingEquipo", "construir_ranking",
+    "TIPOS_PDF", "escribir_zip_lote", "generar_lote_pdf", "generar_pdf_perfil",
+    "SeguimientoPorRuta", "VisitasRuta", "construir_seguimiento_por_ruta",
+    "REGLAS_POR_DEFECTO", "ReglasSegmentacion", "aplicar_reglas", "segmentar",
+    "TendenciasCumplimiento", "construir_tendencias",
+    "DimensionVendedores", "construir_dimension_vendedores",
+]
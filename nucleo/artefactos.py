@@ -0,0 +1,197 @@
+import hashlib
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from nucleo.fuentes import DIRECTORIO_INSTANTANEAS
+
+# =============================================
+# ALMACÉN DE ARTEFACTOS PDF (LRU MEMORIA + DISCO)
+# =============================================
+# Clave: (vendedor, tipo, versión de datos, variante). La versión cambia
+# cuando cambian la evaluación o el libro de cumplimiento, y con ella todas
+# las entradas anteriores quedan invalidadas. La variante distingue lo que
+# cambia por sesión (p. ej. las reglas de segmentación) sin invalidar nada:
+# sesiones con distintas reglas comparten el almacén sin pisarse. Los límites
+# se configuran en MB con PERFILES_PDF_CACHE_MB (memoria) y
+# PERFILES_PDF_CACHE_DISCO_MB (0 = sin disco).
+LIMITE_MEMORIA_MB = float(os.environ.get("PERFILES_PDF_CACHE_MB", 64))
+LIMITE_DISCO_MB = float(os.environ.get("PERFILES_PDF_CACHE_DISCO_MB", 256))
+DIRECTORIO_ARTEFACTOS = os.environ.get(
+    "PERFILES_PDF_CACHE_DIR", os.path.join(DIRECTORIO_INSTANTANEAS, "pdf")
+)
+
+
+def version_artefactos(*partes):
+    return hashlib.sha256("|".join(str(p) for p in partes).encode("utf-8")).hexdigest()[:16]
+
+
+class AlmacenArtefactos:
+    def __init__(self, limite_memoria_mb=LIMITE_MEMORIA_MB, directorio=DIRECTORIO_ARTEFACTOS,
+                 limite_disco_mb=LIMITE_DISCO_MB):
+        self.limite_memoria = int(limite_memoria_mb * 2**20)
+        self.limite_disco = int(limite_disco_mb * 2**20)
+        self.directorio = Path(directorio) if directorio and self.limite_disco > 0 else None
+        if self.directorio is not None:
+            self.directorio.mkdir(parents=True, exist_ok=True)
+
+        self._memoria = OrderedDict()
+        self._bytes_memoria = 0
+        self._bytes_disco = self._medir_disco()
+        self._version_vigente = None
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    # --- claves y rutas ---
+    @staticmethod
+    def _clave(vendedor, tipo, version, variante=""):
+        return (str(vendedor).strip().upper(), tipo, version, str(variante))
+
+    def _ruta_disco(self, clave):
+        vendedor, tipo, version, variante = clave
+        nombre = hashlib.sha256(f"{vendedor}|{tipo}|{variante}".encode("utf-8")).hexdigest()[:32]
+        return self.directorio / version / f"{nombre}.pdf"
+
+    # --- API ---
+    @property
+    def version_vigente(self):
+        return self._version_vigente
+
+    def obtener(self, vendedor, tipo, version, variante=""):
+        clave = self._clave(vendedor, tipo, version, variante)
+        with self._lock:
+            contenido = self._memoria.get(clave)
+            if contenido is not None:
+                self._memoria.move_to_end(clave)
+                self.aciertos += 1
+                return contenido
+
+        contenido = self._leer_disco(clave)
+        with self._lock:
+            if contenido is None:
+                self.fallos += 1
+                return None
+            self.aciertos += 1
+            self._guardar_memoria(clave, contenido)
+        return contenido
+
+    def guardar(self, vendedor, tipo, version, contenido, variante=""):
+        if not contenido:
+            return
+        clave = self._clave(vendedor, tipo, version, variante)
+        with self._lock:
+            self._guardar_memoria(clave, contenido)
+        self._escribir_disco(clave, contenido)
+
+    def obtener_o_generar(self, vendedor, tipo, version, generar, variante=""):
+        contenido = self.obtener(vendedor, tipo, version, variante)
+        if contenido is None:
+            contenido = generar()
+            self.guardar(vendedor, tipo, version, contenido, variante)
+        return contenido
+
+    def invalidar_excepto(self, version):
+        # Descarta todo lo generado con datos anteriores (no-op si la versión no cambió)
+        with self._lock:
+            if version == self._version_vigente:
+                return
+            self._version_vigente = version
+            for clave in [c for c in self._memoria if c[2] != version]:
+                self._bytes_memoria -= len(self._memoria.pop(clave))
+
+            if self.directorio is not None:
+                try:
+                    carpetas = [c for c in self.directorio.iterdir() if c.is_dir() and c.name != version]
+                except OSError:
+                    carpetas = []
+                for carpeta in carpetas:
+                    shutil.rmtree(carpeta, ignore_errors=True)
+                self._bytes_disco = self._medir_disco()
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                "entradas_memoria": len(self._memoria),
+                "mb_memoria": self._bytes_memoria / 2**20,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+            }
+
+    # --- memoria ---
+    def _guardar_memoria(self, clave, contenido):
+        if len(contenido) > self.limite_memoria:
+            return
+        anterior = self._memoria.pop(clave, None)
+        if anterior is not None:
+            self._bytes_memoria -= len(anterior)
+        self._memoria[clave] = contenido
+        self._bytes_memoria += len(contenido)
+        while self._bytes_memoria > self.limite_memoria:
+            _, expulsado = self._memoria.popitem(last=False)
+            self._bytes_memoria -= len(expulsado)
+
+    # --- disco (LRU por fecha de acceso) ---
+    def _leer_disco(self, clave):
+        if self.directorio is None:
+            return None
+        ruta = self._ruta_disco(clave)
+        try:
+            contenido = ruta.read_bytes()
+            os.utime(ruta)
+        except OSError:
+            return None
+        return contenido
+
+    def _escribir_disco(self, clave, contenido):
+        # Un fallo de disco no debe romper la ejecución: el PDF ya está en memoria
+        if self.directorio is None or len(contenido) > self.limite_disco:
+            return
+        ruta = self._ruta_disco(clave)
+        temporal = ruta.with_suffix(f".{threading.get_ident()}.tmp")
+        with self._lock:
+            try:
+                ruta.parent.mkdir(parents=True, exist_ok=True)
+                try:
+                    anterior = ruta.stat().st_size
+                except OSError:
+                    anterior = 0
+                temporal.write_bytes(contenido)
+                os.replace(temporal, ruta)
+            except OSError:
+                temporal.unlink(missing_ok=True)
+                return
+            # Total acumulado: sólo se recorre el disco al pasar el límite
+            self._bytes_disco += len(contenido) - anterior
+            if self._bytes_disco > self.limite_disco:
+                self._recortar_disco()
+
+    def _archivos_disco(self):
+        archivos = []
+        if self.directorio is None:
+            return archivos
+        for ruta in self.directorio.glob("*/*.pdf"):
+            try:
+                info = ruta.stat()
+            except OSError:
+                continue
+            archivos.append((info.st_mtime, info.st_size, ruta))
+        return archivos
+
+    def _medir_disco(self):
+        return sum(tamano for _, tamano, _ in self._archivos_disco())
+
+    def _recortar_disco(self):
+        archivos = self._archivos_disco()
+        total = sum(tamano for _, tamano, _ in archivos)
+        for _, tamano, ruta in sorted(archivos):
+            if total <= self.limite_disco:
+                break
+            try:
+                ruta.unlink(missing_ok=True)
+            except OSError:
+                continue
+            total -= tamano
+        self._bytes_disco = total
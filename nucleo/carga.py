@@ -0,0 +1,117 @@
+import io
+from dataclasses import dataclass
+
+import pandas as pd
+
+from nucleo.compacto import MODO_COMPACTO, compactar
+from nucleo.cumplimiento import construir_modelo_cumplimiento
+from nucleo.esquema import COLUMNAS_FECHA, normalizar_columna
+from nucleo.fuentes import FALLIDO, AlmacenInstantaneas, fuentes_configuradas, obtener_instantaneas
+from nucleo.libros import leer_libro
+from nucleo.seguimiento import parsear_timestamps
+
+# =============================================
+# PARSEO DE FUENTES Y CARGA DE DATOS
+# =============================================
+# Sin dependencias de Streamlit: el dashboard envuelve estas funciones con su
+# caché y los trabajos por lotes las usan directamente.
+def normalizar_encabezados(columnas):
+    return columnas.str.strip().str.lower().str.replace(' ', '_')
+
+
+def parsear_evaluacion(contenido):
+    df_eval = pd.read_csv(io.BytesIO(contenido))
+    df_eval.columns = [normalizar_columna(c) for c in df_eval.columns]
+    for columna in COLUMNAS_FECHA:
+        if columna in df_eval.columns:
+            df_eval[columna] = parsear_timestamps(df_eval[columna])
+    return df_eval
+
+
+def parsear_seguimiento(contenido):
+    df_seg = pd.read_csv(io.BytesIO(contenido))
+    df_seg.columns = normalizar_encabezados(df_seg.columns)
+    # Fechas parseadas una sola vez, con el formato del formulario
+    if 'timestamp' in df_seg.columns:
+        df_seg['timestamp'] = parsear_timestamps(df_seg['timestamp'])
+    return df_seg
+
+
+def parsear_cumplimiento(contenido):
+    # Un solo parseo del libro para ambas hojas
+    hojas = leer_libro(contenido, hojas=['CUMPLIMIENTO', 'informaciones'])
+
+    # Modelo canónico: se construye una vez por versión del libro y lo comparten todas las vistas
+    df_cump = hojas['CUMPLIMIENTO']
+    df_cump.columns = normalizar_encabezados(df_cump.columns)
+    df_cump = construir_modelo_cumplimiento(df_cump)
+
+    # Información de vendedores
+    df_info = hojas['informaciones']
+    df_info.columns = normalizar_encabezados(df_info.columns)
+    df_info['fecha_ingreso'] = pd.to_datetime(df_info['fecha_ingreso'])
+    df_info['fecha_nacimiento'] = pd.to_datetime(df_info['fecha_nacimiento'])
+
+    return df_cump, df_info
+
+
+def normalizar_informacion(df_info):
+    if df_info is None or df_info.empty:
+        return pd.DataFrame()
+    df_info = df_info.copy(deep=False)
+    df_info.columns = normalizar_encabezados(df_info.columns)
+    df_info['nombre_vendedor'] = df_info['nombre_vendedor'].str.strip().str.upper()
+    return df_info
+
+
+PARSERS = {
+    'evaluacion': parsear_evaluacion,
+    'seguimiento': parsear_seguimiento,
+    'cumplimiento': parsear_cumplimiento,
+}
+
+
+@dataclass
+class DatosCargados:
+    df_eval: pd.DataFrame
+    df_seg: pd.DataFrame
+    df_cump: pd.DataFrame
+    df_info: pd.DataFrame
+    estados: dict           # nombre de fuente -> ResultadoFuente
+
+    @property
+    def versiones(self):
+        # Versión de los datos: hash de contenido de cada fuente
+        return tuple(resultado.sha for resultado in self.estados.values())
+
+
+def cargar_datos(fuentes=None, almacen=None, parsers=None, compacto=MODO_COMPACTO):
+    # parsers: nombre -> función(sha); por defecto leen el contenido del almacén.
+    # Una fuente que no se puede parsear queda FALLIDA y devuelve datos vacíos.
+    # En modo compacto seguimiento, cumplimiento e información se compactan
+    # aquí; la evaluación se compacta al procesarla (procesar_datos).
+    almacen = almacen or AlmacenInstantaneas()
+    estados = obtener_instantaneas(fuentes or fuentes_configuradas(), almacen)
+    parsers = parsers or {
+        nombre: (lambda sha, parser=parser: parser(almacen.leer(sha)))
+        for nombre, parser in PARSERS.items()
+    }
+
+    def parsear(nombre, vacio):
+        resultado = estados.get(nombre)
+        if resultado is None or not resultado.disponible:
+            return vacio
+        try:
+            return parsers[nombre](resultado.sha)
+        except Exception as e:
+            resultado.estado = FALLIDO
+            resultado.error = f"Error al procesar: {str(e)}"
+            return vacio
+
+    df_eval = parsear('evaluacion', pd.DataFrame())
+    df_seg = parsear('seguimiento', pd.DataFrame())
+    df_cump, df_info = parsear('cumplimiento', (pd.DataFrame(), pd.DataFrame()))
+    if compacto:
+        df_seg, df_cump, df_info = compactar(df_seg), compactar(df_cump), compactar(df_info)
+
+    return DatosCargados(df_eval, df_seg, df_cump, df_info, estados)
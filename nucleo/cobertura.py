@@ -0,0 +1,193 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from nucleo.seguimiento import contar_por_periodo, inicio_periodo
+from nucleo.vendedores import normalizar_claves
+
+# =============================================
+# COBERTURA DE VISITAS DEL EQUIPO
+# =============================================
+# Para todo el equipo evaluado y en una pasada vectorizada sobre el
+# seguimiento, una vez por versión:
+#   - matriz dispersa vendedor x periodo (mes y semana) con la cantidad de
+#     visitas, en formato COO (fila, columna, conteo; sólo celdas con visitas)
+#   - marcas (vendedor, segundo) ordenadas: la última visita de cada vendedor
+#     hasta cualquier fecha de corte son dos búsquedas binarias vectorizadas
+# Encima se calculan la cobertura por supervisor (% de sus vendedores con al
+# menos una visita en cada periodo) y las brechas (vendedores sin visita en
+# N días), sin abrir los vendedores uno por uno. Las filas sin ruta (vacía o
+# NaN) no son un vendedor: quedan fuera del equipo y de las matrices.
+PERIODOS = {"Mes": "M", "Semana": "W"}
+DIAS_BRECHA = 30
+COLUMNAS_BRECHAS = ["Ruta", "Vendedor", "Supervisor", "Última visita", "Días sin visita", "Visitas"]
+
+
+@dataclass
+class MatrizVisitas:
+    periodos: pd.DatetimeIndex  # inicio de cada columna, consecutivos
+    filas: np.ndarray           # posición del vendedor
+    columnas: np.ndarray        # posición del periodo
+    conteos: np.ndarray         # visitas en la celda
+
+    def seleccion(self, posiciones=None, ultimos=None):
+        # Celdas de los vendedores indicados, en los últimos `ultimos` periodos
+        celdas = np.ones(len(self.filas), dtype=bool)
+        if posiciones is not None:
+            celdas &= np.isin(self.filas, posiciones)
+        desde = 0 if ultimos is None else max(len(self.periodos) - ultimos, 0)
+        celdas &= self.columnas >= desde
+        return celdas, desde
+
+
+@dataclass
+class CoberturaEquipo:
+    claves: pd.Index            # ruta normalizada de cada vendedor del equipo
+    supervisores: np.ndarray    # supervisor de cada vendedor
+    nombres: np.ndarray         # nombre del vendedor (vacío si no se conoce)
+    codigos_eval: np.ndarray    # posición del vendedor de cada fila de la evaluación (-1 sin ruta)
+    marcas: np.ndarray          # vendedor * ancho + segundos desde origen, ordenadas
+    origen: int                 # segundo (epoch) de la primera visita
+    ancho: int                  # segundos cubiertos + 1
+    matrices: dict              # "M" / "W" -> MatrizVisitas
+
+    @property
+    def fecha_referencia(self):
+        # Visita más reciente del equipo (corte por defecto de las brechas)
+        if not len(self.marcas):
+            return pd.NaT
+        return pd.Timestamp(int(self.origen + (self.marcas % self.ancho).max()), unit="s")
+
+    def ultimas_visitas(self, corte=None):
+        # Última visita hasta el corte (NaT si no hay) y visitas hasta el corte
+        inicio = np.arange(len(self.claves), dtype=np.int64) * self.ancho
+        limite = self.ancho - 1
+        if corte is not None:
+            segundo = pd.Timestamp(corte).to_datetime64().astype("datetime64[s]").astype(np.int64)
+            limite = int(np.clip(segundo - self.origen, -1, self.ancho - 1))
+        desde = np.searchsorted(self.marcas, inicio, side="left")
+        hasta = np.searchsorted(self.marcas, inicio + limite, side="right")
+        visitas = np.maximum(hasta - desde, 0)
+        ultima = np.full(len(self.claves), np.datetime64("NaT"), dtype="datetime64[ns]")
+        con_visita = visitas > 0
+        segundos = self.marcas[hasta[con_visita] - 1] - inicio[con_visita] + self.origen
+        ultima[con_visita] = segundos.astype("datetime64[s]")
+        return ultima, visitas
+
+    def posiciones(self, mascara_eval=None):
+        # Vendedores de las filas de la evaluación seleccionadas; None = todos
+        if mascara_eval is None:
+            return None
+        codigos = self.codigos_eval[mascara_eval]
+        return np.unique(codigos[codigos >= 0])
+
+    def densa(self, periodo="M", posiciones=None, ultimos=None):
+        # Vendedor x periodo con ceros, sólo para mostrar un subconjunto
+        matriz = self.matrices[periodo]
+        celdas, desde = matriz.seleccion(posiciones, ultimos)
+        filas = np.arange(len(self.claves)) if posiciones is None else np.asarray(posiciones)
+        densa = np.zeros((len(self.claves), len(matriz.periodos) - desde), dtype=np.int64)
+        densa[matriz.filas[celdas], matriz.columnas[celdas] - desde] = matriz.conteos[celdas]
+        return pd.DataFrame(densa[filas], index=self.claves[filas], columns=matriz.periodos[desde:])
+
+    def por_supervisor(self, periodo="M", posiciones=None, ultimos=None):
+        # % de los vendedores de cada supervisor con al menos una visita por periodo
+        matriz = self.matrices[periodo]
+        celdas, desde = matriz.seleccion(posiciones, ultimos)
+        codigos, supervisores = pd.factorize(self.supervisores, sort=True)
+        en_equipo = np.ones(len(self.claves), dtype=bool) if posiciones is None else np.isin(
+            np.arange(len(self.claves)), posiciones)
+        equipo = np.bincount(codigos[en_equipo & (codigos >= 0)], minlength=len(supervisores))
+
+        ancho = len(matriz.periodos) - desde
+        grupo = codigos[matriz.filas[celdas]]
+        validas = grupo >= 0
+        visitados = np.bincount(
+            grupo[validas] * ancho + (matriz.columnas[celdas][validas] - desde),
+            minlength=len(supervisores) * ancho,
+        ).reshape(len(supervisores), ancho)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cobertura = visitados / equipo[:, None] * 100
+        tabla = pd.DataFrame(cobertura, index=pd.Index(supervisores, name="supervisor"),
+                             columns=matriz.periodos[desde:])
+        return tabla[equipo > 0]
+
+    def brechas(self, dias=DIAS_BRECHA, corte=None, posiciones=None):
+        # Vendedores sin visita en los `dias` anteriores al corte (o sin ninguna)
+        corte = self.fecha_referencia if corte is None else pd.Timestamp(corte)
+        filas = np.arange(len(self.claves)) if posiciones is None else np.asarray(posiciones, dtype=np.intp)
+        if pd.isna(corte) or not len(filas):
+            return pd.DataFrame(columns=COLUMNAS_BRECHAS)
+        ultima, visitas = self.ultimas_visitas(corte)
+        ultima, visitas = ultima[filas], visitas[filas]
+        sin_visita = np.isnat(ultima)
+        dias_sin = (np.datetime64(corte.to_datetime64(), "ns") - ultima) / np.timedelta64(1, "D")
+        dias_sin = np.floor(np.where(sin_visita, np.nan, dias_sin))
+        en_brecha = sin_visita | (dias_sin > dias)
+        # Primero los que nunca tuvieron visita, luego de mayor a menor antigüedad
+        orden = np.flatnonzero(en_brecha)[np.argsort(-np.nan_to_num(dias_sin[en_brecha], nan=np.inf), kind="stable")]
+        filas, ultima, dias_sin, visitas = filas[orden], ultima[orden], dias_sin[orden], visitas[orden]
+        return pd.DataFrame({
+            "Ruta": self.claves[filas],
+            "Vendedor": self.nombres[filas],
+            "Supervisor": self.supervisores[filas],
+            "Última visita": ultima,
+            "Días sin visita": dias_sin,
+            "Visitas": visitas,
+        })
+
+
+def _nombres(claves, dimension):
+    maestro = getattr(dimension, "maestro", None)
+    if maestro is None or "nombre_vendedor" not in maestro.columns:
+        return np.full(len(claves), "", dtype=object)
+    nombres = pd.Series(maestro["nombre_vendedor"].to_numpy(), index=maestro["clave"].to_numpy())
+    return nombres.reindex(claves).fillna("").to_numpy(dtype=object)
+
+
+def construir_cobertura(df_seg, df_eval, dimension=None, col_ruta="ruta"):
+    rutas = normalizar_claves(df_eval[col_ruta])
+    codigos_eval, claves = pd.factorize(rutas.mask(rutas == ""))     # sin ruta -> -1
+    claves = pd.Index(claves, name="ruta")
+    con_ruta = np.flatnonzero(codigos_eval >= 0)
+    primera_fila = con_ruta[np.unique(codigos_eval[con_ruta], return_index=True)[1]]
+    supervisores = df_eval["supervisor"].to_numpy(dtype=object)[primera_fila] if "supervisor" in df_eval.columns \
+        else np.full(len(claves), "", dtype=object)
+
+    if df_seg is not None and not df_seg.empty and col_ruta in df_seg.columns and "timestamp" in df_seg.columns:
+        codigos = claves.get_indexer(normalizar_claves(df_seg[col_ruta]))
+        fechas = df_seg["timestamp"].to_numpy(dtype="datetime64[ns]")
+        validas = (codigos >= 0) & ~np.isnat(fechas)
+        codigos, fechas = codigos[validas], fechas[validas]
+    else:
+        codigos, fechas = np.empty(0, dtype=np.intp), np.empty(0, dtype="datetime64[ns]")
+
+    # Marcas ordenadas por (vendedor, segundo) en un solo entero
+    segundos = fechas.astype("datetime64[s]").astype(np.int64)
+    origen = int(segundos.min()) if len(segundos) else 0
+    ancho = int(segundos.max()) - origen + 1 if len(segundos) else 1
+    marcas = np.sort(codigos.astype(np.int64) * ancho + (segundos - origen))
+
+    matrices = {}
+    for periodo in PERIODOS.values():
+        filas, indices, conteos = contar_por_periodo(codigos, fechas, periodo)
+        base = indices.min() if len(indices) else 0
+        cantidad = int(indices.max() - base) + 1 if len(indices) else 0
+        matrices[periodo] = MatrizVisitas(
+            periodos=pd.DatetimeIndex(inicio_periodo(np.arange(base, base + cantidad), periodo), name="periodo"),
+            filas=filas.astype(np.intp),
+            columnas=(indices - base).astype(np.intp),
+            conteos=conteos,
+        )
+
+    return CoberturaEquipo(
+        claves=claves,
+        supervisores=supervisores,
+        nombres=_nombres(claves, dimension),
+        codigos_eval=codigos_eval,
+        marcas=marcas,
+        origen=origen,
+        ancho=ancho,
+        matrices=matrices,
+    )
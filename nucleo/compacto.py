@@ -0,0 +1,109 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# =============================================
+# REPRESENTACIÓN COMPACTA EN MEMORIA
+# =============================================
+# Cada proceso de Streamlit mantiene los datasets en memoria. En modo compacto
+# (por defecto; PERFILES_COMPACTO=0 lo desactiva):
+#   - las etiquetas repetidas (ruta, supervisor, vendedor, indicador,
+#     segmento, zona, puesto) se guardan como categóricas
+#   - los puntajes y porcentajes float64 pasan a float32 (también los enteros
+#     de las columnas indicadas en `puntajes`)
+# Una columna de etiquetas casi única (p. ej. ruta en la evaluación, una fila
+# por vendedor) no ahorra nada como categórica y se deja como está.
+MODO_COMPACTO = os.environ.get("PERFILES_COMPACTO", "1").lower() not in ("0", "false", "no")
+COLUMNAS_ETIQUETA = ("ruta", "supervisor", "vendedor", "indicador", "segmento", "zona", "puesto")
+UMBRAL_CARDINALIDAD = 0.5   # categórica si valores distintos <= 50 % de las filas
+
+
+def _conviene_categorica(serie):
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return False
+    if not (pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie)):
+        return False
+    return serie.nunique(dropna=True) <= len(serie) * UMBRAL_CARDINALIDAD
+
+
+def compactar(df, etiquetas=COLUMNAS_ETIQUETA, puntajes=()):
+    # Devuelve un DataFrame nuevo; las columnas sin cambios no se copian
+    if df is None or df.empty:
+        return df
+    cambios = {}
+    for columna in df.columns:
+        serie = df[columna]
+        if columna in etiquetas and _conviene_categorica(serie):
+            cambios[columna] = serie.astype("category")
+        elif serie.dtype == np.float64 or (columna in puntajes and serie.dtype.kind in "iu"):
+            cambios[columna] = serie.astype(np.float32)
+    return df.assign(**cambios) if cambios else df
+
+
+# =============================================
+# DATASETS COMPARTIDOS (SÓLO LECTURA)
+# =============================================
+# Los datasets cacheados se comparten entre sesiones sin copiarlos. Con
+# copy-on-write (pandas 3) las selecciones y las copias superficiales
+# (copy(deep=False)) no duplican datos y nunca escriben sobre el original;
+# congelar() además marca como sólo lectura los arreglos de cada bloque, para
+# que una escritura en el lugar sobre el dataset compartido falle en vez de
+# cambiar lo que ven las demás sesiones. pandas no tiene API pública para
+# esto: se recorre el block manager.
+def congelar(df):
+    if df is None:
+        return df
+    for bloque in getattr(getattr(df, "_mgr", None), "blocks", ()):
+        valores = getattr(bloque.values, "_ndarray", bloque.values)
+        if isinstance(valores, np.ndarray):
+            valores.flags.writeable = False
+    return df
+
+
+def memoria_mb(df):
+    if df is None:
+        return 0.0
+    return df.memory_usage(index=True, deep=True).sum() / 2**20
+
+
+def _buffers_columna(serie):
+    # Identidad de los datos de una columna: dos datasets que la comparten
+    # (selecciones, assign o copias superficiales) apuntan al mismo buffer
+    arreglo = serie.array
+    if hasattr(arreglo, "__arrow_array__"):
+        datos = arreglo.__arrow_array__()
+        return tuple(
+            buffer.address for trozo in getattr(datos, "chunks", [datos])
+            for buffer in trozo.buffers() if buffer is not None
+        )
+    if isinstance(arreglo, pd.Categorical):
+        arreglo = arreglo.codes
+    valores = np.asarray(arreglo)
+    return (valores.__array_interface__["data"][0], valores.strides, len(valores))
+
+
+def reporte_memoria(datasets):
+    # datasets: nombre -> DataFrame. "MB propios" no cuenta las columnas que
+    # el dataset comparte con uno anterior de la lista: su suma es la memoria
+    # retenida, sin contar dos veces lo compartido.
+    vistos = set()
+    filas = []
+    for nombre, df in datasets.items():
+        propios = 0
+        if df is not None:
+            propios = df.index.memory_usage(deep=True)
+            usos = df.memory_usage(index=False, deep=True).to_numpy()
+            for posicion, uso in enumerate(usos):
+                clave = _buffers_columna(df.iloc[:, posicion])
+                if clave not in vistos:
+                    vistos.add(clave)
+                    propios += int(uso)
+        filas.append({
+            "Dataset": nombre,
+            "Filas": 0 if df is None else len(df),
+            "Columnas": 0 if df is None else df.shape[1],
+            "MB": round(memoria_mb(df), 2),
+            "MB propios": round(propios / 2**20, 2),
+        })
+    return pd.DataFrame(filas)
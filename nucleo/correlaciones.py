@@ -0,0 +1,124 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from nucleo.esquema import CATEGORIAS, REGISTRO, resolver_columnas
+from nucleo.vendedores import normalizar_claves
+
+# =============================================
+# CORRELACIONES ENTRE COMPETENCIAS E IMPULSORES
+# =============================================
+# Correlación de Pearson por pares completos (cada par usa sólo las filas con
+# dato en ambas columnas, igual que DataFrame.corr) calculada con productos
+# de matrices: con p preguntas y n vendedores son unas pocas multiplicaciones
+# (n x p)ᵀ(n x p), sin recorrer pares en Python. Se calcula una vez por
+# versión de los datos.
+MIN_PARES = 5   # con menos vendedores en común la correlación queda sin dato
+
+
+def correlacion_por_pares(x, y=None, min_pares=MIN_PARES):
+    # x: (n, p), y: (n, q) con NaN -> (r (p, q), pares (p, q))
+    x = np.asarray(x, dtype=float)
+    y = x if y is None else np.asarray(y, dtype=float)
+    mx, my = (~np.isnan(x)).astype(float), (~np.isnan(y)).astype(float)
+    x0, y0 = np.nan_to_num(x), np.nan_to_num(y)
+
+    pares = mx.T @ my
+    suma_x, suma_y = x0.T @ my, mx.T @ y0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = x0.T @ y0 - suma_x * suma_y / pares
+        var_x = (x0 ** 2).T @ my - suma_x ** 2 / pares
+        var_y = mx.T @ (y0 ** 2) - suma_y ** 2 / pares
+        r = cov / np.sqrt(var_x * var_y)
+    r[(pares < min_pares) | ~(var_x > 1e-12) | ~(var_y > 1e-12)] = np.nan
+    return np.clip(r, -1.0, 1.0), pares.astype(np.int64)
+
+
+def etiqueta_pregunta(clave):
+    # "respeto,_trato_cordial_y_empatía" -> "Respeto, trato cordial y empatía"
+    return clave.replace("_", " ").strip(" ?.").capitalize()
+
+
+def matriz_preguntas(df_eval):
+    # Columnas numéricas del formulario, en el orden del registro
+    plan = resolver_columnas(tuple(df_eval.columns))
+    columnas = {}
+    for pregunta in REGISTRO:
+        columna = plan.columna(pregunta.clave)
+        if columna is not None and pd.api.types.is_numeric_dtype(df_eval[columna]):
+            columnas[etiqueta_pregunta(pregunta.clave)] = columna
+    return pd.DataFrame({etiqueta: df_eval[col].to_numpy(dtype=float) for etiqueta, col in columnas.items()})
+
+
+def cumplimiento_por_vendedor(df_eval, df_cump, dimension=None):
+    # Media de cumplimiento_num por indicador para cada fila de df_eval.
+    # Con la dimensión de vendedores el cruce respeta los alias por nombre.
+    if df_cump is None or df_cump.empty or "indicador" not in df_cump.columns:
+        return pd.DataFrame(index=range(len(df_eval)))
+    codigos_eval, claves = pd.factorize(normalizar_claves(df_eval["ruta"]))
+    if dimension is not None and "cumplimiento" in dimension.posiciones:
+        codigos_cump, claves_cump = dimension.codigos("cumplimiento", len(df_cump))
+        a_eval = np.append(pd.Index(claves).get_indexer(claves_cump), -1)    # -1 -> sin clave
+        vendedor_cump = a_eval[codigos_cump]
+    else:
+        vendedor_cump = pd.Index(claves).get_indexer(normalizar_claves(df_cump["vendedor"]))
+
+    codigos_ind, indicadores = pd.factorize(df_cump["indicador"], sort=True)
+    valores = df_cump["cumplimiento_num"].to_numpy(dtype=float)
+    validos = (vendedor_cump >= 0) & (codigos_ind >= 0) & ~np.isnan(valores)
+    celda = vendedor_cump[validos] * len(indicadores) + codigos_ind[validos]
+    tamano = len(claves) * len(indicadores)
+    suma = np.bincount(celda, weights=valores[validos], minlength=tamano)
+    cuenta = np.bincount(celda, minlength=tamano)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        medias = (suma / cuenta).reshape(len(claves), len(indicadores))
+    filas_eval = medias[codigos_eval] if len(claves) else np.full((len(df_eval), len(indicadores)), np.nan)
+    filas_eval[codigos_eval < 0] = np.nan
+    return pd.DataFrame(filas_eval, columns=[str(i) for i in indicadores])
+
+
+@dataclass
+class AnalisisCorrelaciones:
+    categorias: pd.DataFrame    # categoría x categoría
+    preguntas: pd.DataFrame     # pregunta x pregunta
+    impulsores: pd.DataFrame    # (categorías + preguntas) x indicador
+    pares_impulsores: pd.DataFrame  # vendedores con dato en cada celda de impulsores
+
+    def principales_impulsores(self, indicador, cantidad=10):
+        # Competencias con mayor correlación (en valor absoluto) con el indicador
+        if indicador not in self.impulsores.columns:
+            return pd.DataFrame(columns=["Competencia", "Correlación", "Vendedores"])
+        tabla = pd.DataFrame({
+            "Competencia": self.impulsores.index,
+            "Correlación": self.impulsores[indicador].to_numpy(),
+            "Vendedores": self.pares_impulsores[indicador].to_numpy(),
+        }).dropna(subset=["Correlación"])
+        orden = np.argsort(-tabla["Correlación"].abs().to_numpy(), kind="stable")
+        return tabla.iloc[orden[:cantidad]].reset_index(drop=True)
+
+
+def _como_tabla(r, filas, columnas):
+    return pd.DataFrame(r, index=list(filas), columns=list(columnas))
+
+
+def construir_correlaciones(df_eval, df_cump=None, dimension=None):
+    categorias = [c for c in CATEGORIAS if c in df_eval.columns]
+    x_categorias = df_eval[categorias].to_numpy(dtype=float)
+    preguntas = matriz_preguntas(df_eval)
+    x_preguntas = preguntas.to_numpy()
+
+    r_categorias, _ = correlacion_por_pares(x_categorias)
+    r_preguntas, _ = correlacion_por_pares(x_preguntas)
+
+    cumplimiento = cumplimiento_por_vendedor(df_eval, df_cump, dimension)
+    competencias = np.hstack([x_categorias, x_preguntas])
+    r_impulsores, pares = correlacion_por_pares(competencias, cumplimiento.to_numpy(dtype=float))
+    nombres = categorias + list(preguntas.columns)
+
+    return AnalisisCorrelaciones(
+        categorias=_como_tabla(r_categorias, categorias, categorias),
+        preguntas=_como_tabla(r_preguntas, preguntas.columns, preguntas.columns),
+        impulsores=_como_tabla(r_impulsores, nombres, cumplimiento.columns),
+        pares_impulsores=_como_tabla(pares, nombres, cumplimiento.columns),
+    )
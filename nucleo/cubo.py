@@ -0,0 +1,75 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from nucleo.cumplimiento import construir_indice_temporal, ordenar_por_indicador_fecha
+
+# =============================================
+# CUBO DE CUMPLIMIENTO (ROLLUP MATERIALIZADO)
+# =============================================
+# Se agrega una vez por versión del modelo de cumplimiento al grano
+# (indicador, fecha, supervisor, vendedor) guardando suma, conteo, mínimo y
+# máximo de cumplimiento_num. El promedio de cualquier nivel superior es
+# suma / conteo, idéntico al mean sobre las filas crudas. Cada vista queda
+# ordenada por (indicador, fecha): elegir indicador es un acceso a diccionario
+# y el período un corte por búsqueda binaria.
+MEDIDA = "cumplimiento_num"
+AGREGADOS = {"suma": "sum", "conteo": "sum", "minimo": "min", "maximo": "max"}
+VISTAS_CUBO = ((), ("supervisor",), ("vendedor",))
+
+
+def _reagregar(df, niveles):
+    agregado = (
+        df.groupby(list(niveles), observed=True, dropna=False, sort=False)
+        .agg(**{col: (col, funcion) for col, funcion in AGREGADOS.items()})
+        .reset_index()
+    )
+    return _con_promedio(agregado)
+
+
+def _con_promedio(df):
+    conteo = df["conteo"].to_numpy(dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        df[MEDIDA] = np.where(conteo > 0, df["suma"].to_numpy(dtype=float) / conteo, np.nan)
+    return df
+
+
+def _construir_vista(base, niveles):
+    datos = _reagregar(base, ("indicador",) + niveles + ("fecha",))
+    return construir_indice_temporal(ordenar_por_indicador_fecha(datos))
+
+
+@dataclass
+class CuboCumplimiento:
+    vistas: dict            # niveles (tupla) -> IndiceTemporal
+
+    @property
+    def vacio(self):
+        return not self.vistas or self.vistas[()].datos.empty
+
+    def indicadores(self):
+        return self.vistas[()].indicadores() if self.vistas else []
+
+    def rango_fechas(self):
+        return self.vistas[()].rango_fechas() if self.vistas else (None, None)
+
+    def consultar(self, indicador=None, por=(), desde=None, hasta=None, colapsar_fecha=False):
+        # Serie por (por..., fecha) o, con colapsar_fecha, un valor por (por...)
+        tramo = self.vistas[tuple(por)].tramo(indicador, desde, hasta)
+        if not colapsar_fecha:
+            return tramo
+        return _reagregar(tramo, ("indicador",) + tuple(por))
+
+
+def construir_cubo_cumplimiento(df_cump):
+    if df_cump is None or df_cump.empty:
+        return CuboCumplimiento({})
+    medida = df_cump[MEDIDA]
+    base = (
+        df_cump.assign(suma=medida.fillna(0.0), conteo=medida.notna().astype(np.int64),
+                       minimo=medida, maximo=medida)
+        .groupby(["indicador", "fecha", "supervisor", "vendedor"], observed=True, dropna=False, sort=False)
+        .agg(**{col: (col, funcion) for col, funcion in AGREGADOS.items()})
+        .reset_index()
+    )
+    return CuboCumplimiento({niveles: _construir_vista(base, niveles) for niveles in VISTAS_CUBO})
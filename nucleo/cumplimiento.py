@@ -0,0 +1,126 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# =============================================
+# MODELO CANÓNICO DE CUMPLIMIENTO
+# =============================================
+# Se construye una sola vez por versión del libro y todas las vistas (y el PDF)
+# lo consumen en modo sólo lectura:
+#   vendedor, supervisor, indicador -> category
+#   year, mes                        -> enteros
+#   fecha                            -> datetime64 (día 1 del mes)
+#   cumplimiento                     -> float, en puntos porcentuales (85.3)
+#   cumplimiento_num                 -> float, fracción (0.853)
+# Las filas quedan ordenadas por (indicador, fecha) para cortar rangos de
+# fechas por búsqueda binaria con IndiceTemporal.
+COLUMNAS_CATEGORICAS = ["vendedor", "supervisor", "indicador"]
+COLUMNAS_MODELO = ["vendedor", "supervisor", "indicador", "year", "mes", "fecha", "cumplimiento", "cumplimiento_num"]
+
+
+def parsear_porcentaje(serie):
+    # Devuelve puntos porcentuales. Acepta números, "85.3", "85,3 %" y miles
+    # con cualquiera de los dos separadores ("1.234,5" o "1,234.5").
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie.astype(float)
+
+    texto = (
+        serie.astype("string")
+        .str.replace("%", "", regex=False)
+        .str.replace(r"\s", "", regex=True)
+    )
+    ultima_coma = texto.str.rfind(",")
+    ultimo_punto = texto.str.rfind(".")
+
+    # El separador que aparece último es el decimal; el otro es de miles
+    coma_decimal = (ultima_coma > ultimo_punto).fillna(False)
+    texto = texto.where(
+        ~coma_decimal,
+        texto.str.replace(".", "", regex=False).str.replace(",", ".", regex=False),
+    )
+    texto = texto.where(coma_decimal, texto.str.replace(",", "", regex=False))
+
+    return pd.to_numeric(texto.replace("", pd.NA), errors="coerce").astype(float)
+
+
+def construir_fecha(year, mes):
+    # Vectorizado: equivalente a to_datetime(f"{year}-{mes}-01") fila a fila
+    year = pd.to_numeric(year, errors="coerce")
+    mes = pd.to_numeric(mes, errors="coerce")
+    return pd.to_datetime(pd.DataFrame({"year": year, "month": mes, "day": 1}), errors="coerce")
+
+
+def construir_modelo_cumplimiento(df_cump):
+    if df_cump is None or df_cump.empty:
+        return pd.DataFrame({col: pd.Series(dtype=object) for col in COLUMNAS_MODELO})
+
+    modelo = df_cump.copy()
+    for col in COLUMNAS_CATEGORICAS:
+        if col in modelo.columns:
+            modelo[col] = modelo[col].astype("string").str.strip().astype("category")
+
+    modelo["year"] = pd.to_numeric(modelo["year"], errors="coerce").astype("Int16")
+    modelo["mes"] = pd.to_numeric(modelo["mes"], errors="coerce").astype("Int8")
+    modelo["fecha"] = construir_fecha(modelo["year"], modelo["mes"])
+
+    modelo["cumplimiento"] = parsear_porcentaje(modelo["cumplimiento"])
+    modelo["cumplimiento_num"] = modelo["cumplimiento"] / 100
+
+    return ordenar_por_indicador_fecha(modelo)
+
+
+def ordenar_por_indicador_fecha(df):
+    return df.sort_values(["indicador", "fecha"], kind="stable", na_position="last").reset_index(drop=True)
+
+
+# =============================================
+# ÍNDICE TEMPORAL (CORTES POR BÚSQUEDA BINARIA)
+# =============================================
+@dataclass
+class IndiceTemporal:
+    datos: pd.DataFrame     # ordenado por (indicador, fecha)
+    fechas: np.ndarray      # datetime64 de datos["fecha"]
+    limites: dict           # indicador -> (inicio, fin) en datos
+
+    def indicadores(self):
+        return list(self.limites)
+
+    def rango_fechas(self):
+        validas = self.fechas[~np.isnat(self.fechas)]
+        if not len(validas):
+            return None, None
+        return pd.Timestamp(validas.min()), pd.Timestamp(validas.max())
+
+    def posiciones(self, indicador, desde=None, hasta=None):
+        # O(log n): [inicio, fin) del indicador con fecha en [desde, hasta]
+        inicio, fin = self.limites.get(indicador, (0, 0))
+        fechas = self.fechas[inicio:fin]
+        corte_inicio = 0 if desde is None else np.searchsorted(fechas, np.datetime64(desde, "ns"), side="left")
+        corte_fin = len(fechas) if hasta is None else np.searchsorted(fechas, np.datetime64(hasta, "ns"), side="right")
+        return inicio + corte_inicio, inicio + max(corte_inicio, corte_fin)
+
+    def tramo(self, indicador=None, desde=None, hasta=None):
+        if indicador is not None:
+            return self.datos.iloc[slice(*self.posiciones(indicador, desde, hasta))]
+        if desde is None and hasta is None:
+            return self.datos
+        tramos = [np.arange(*self.posiciones(ind, desde, hasta)) for ind in self.limites]
+        return self.datos.iloc[np.concatenate(tramos) if tramos else []]
+
+
+def construir_indice_temporal(df):
+    # df debe venir ordenado por (indicador, fecha)
+    codigos, indicadores = pd.factorize(df["indicador"], sort=False)
+    limites = {}
+    if len(indicadores):
+        # Cada indicador ocupa un bloque contiguo
+        cambios = np.flatnonzero(np.diff(codigos)) + 1
+        inicios = np.concatenate([[0], cambios])
+        fines = np.concatenate([cambios, [len(df)]])
+        limites = {
+            indicadores[codigos[i]]: (int(i), int(f))
+            for i, f in zip(inicios, fines) if codigos[i] >= 0   # sin indicador: fuera del índice
+        }
+    return IndiceTemporal(df, df["fecha"].to_numpy(dtype="datetime64[ns]"), limites)
+
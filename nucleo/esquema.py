@@ -0,0 +1,225 @@
+import functools
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Optional
+
+import pandas as pd
+
+# =============================================
+# NORMALIZACIÓN DE ENCABEZADOS
+# =============================================
+def normalizar_columna(col):
+    return ''.join(
+        c for c in unicodedata.normalize('NFD', col)
+        if unicodedata.category(c) != 'Mn'
+    ).lower().strip().replace(' ', '_')
+
+
+def clave_canonica(texto):
+    # Forma usada para comparar preguntas: sin tildes ni puntuación final
+    # ("Toma la iniciativa...presionado." == "toma_la_iniciativa..._presionado")
+    return normalizar_columna(str(texto)).strip("_.?¿:;")
+
+
+# =============================================
+# REGISTRO DE PREGUNTAS DEL FORMULARIO
+# =============================================
+@dataclass(frozen=True)
+class Pregunta:
+    clave: str
+    categoria: Optional[str] = None     # categoría de puntaje a la que suma
+    competencia: Optional[str] = None   # etiqueta en "Evaluación Completa"
+    seccion: Optional[str] = None
+    ayuda: str = ""
+
+
+SECCION_VENTA = "💰 Venta y Negociación"
+SECCION_CLIENTES = "🤝 Relación con Clientes"
+SECCION_ACTITUD = "🧠 Comportamiento y Actitud"
+SECCION_APTITUDES = "🛠️ Aptitudes Técnicas"
+
+REGISTRO = (
+    # Desempeño Comercial
+    Pregunta("efectividad_real_vs_meta", "Desempeño Comercial", "Efectividad", SECCION_VENTA,
+             "Capacidad para lograr los objetivos de venta"),
+    Pregunta("cumple_con_cuotas_de_venta_mensual", "Desempeño Comercial"),
+    Pregunta("cierra_ventas_sin_depender_de_promociones", "Desempeño Comercial", "Venta Cruzada", SECCION_VENTA,
+             "Capacidad para vender productos complementarios"),
+    Pregunta("promueve_productos_nuevos/ofertas", "Desempeño Comercial"),
+    Pregunta("manejo_de_objeciones_efectivas", None, "Manejo de Objeciones", SECCION_VENTA,
+             "Habilidad para manejar objeciones de clientes"),
+
+    # Ejecución en Ruta
+    Pregunta("visita_todos_sus_clientes_por_día?", "Ejecución en Ruta"),
+    Pregunta("puntualidad_y_asistencia", "Ejecución en Ruta"),
+    Pregunta("planea_su_ruta_diaria", "Ejecución en Ruta"),
+    Pregunta("eficiencia_en_tiempo_por_punto", "Ejecución en Ruta"),
+    Pregunta("planifica_su_ruta_diaria_de_manera_lógica_y_eficiente", None, "Planificación", SECCION_APTITUDES,
+             "Organización y planificación de rutas"),
+
+    # Habilidades Blandas
+    Pregunta("respeto,_trato_cordial_y_empatía", "Habilidades Blandas", "Empatía", SECCION_CLIENTES,
+             "Capacidad para entender las necesidades del cliente"),
+    Pregunta("gana_confianza_del_cliente", "Habilidades Blandas", "Confianza", SECCION_CLIENTES,
+             "Generación de confianza con los clientes"),
+    Pregunta("soluciona_conflictos_con_criterio", "Habilidades Blandas", "Resolución de Conflictos", SECCION_CLIENTES,
+             "Habilidad para resolver problemas con clientes"),
+    Pregunta("clientes_solicitan_ser_visitados_por_él", "Habilidades Blandas"),
+    Pregunta("persiste_en_la_venta_con_educación_y_sin_presión_al_cliente", None, "Persistencia", SECCION_ACTITUD,
+             "Constancia ante desafíos"),
+
+    # Autonomía
+    Pregunta("soluciona_imprevistos_sin_llamar_al_supervisor", "Autonomía"),
+    Pregunta("toma_la_iniciativa_sin_necesidad_de_ser_presionado", "Autonomía", "Iniciativa", SECCION_ACTITUD,
+             "Proactividad y toma de iniciativa"),
+    Pregunta("se_adapta_con_facilidad_a_cambios", "Autonomía"),
+    Pregunta("resuelve_problemas_cotidianos_de_manera_práctica_y_rápida", None, "Adaptación", SECCION_ACTITUD,
+             "Flexibilidad ante cambios"),
+
+    # Herramientas
+    Pregunta("usa_adecuadamente_las_aplicaciones", "Herramientas", "Manejo de Herramientas", SECCION_APTITUDES,
+             "Uso de aplicaciones y sistemas"),
+    Pregunta("reportes_y_formularios_sin_errores", "Herramientas"),
+    Pregunta("mantiene_la_motocicleta_en_condiciones", "Herramientas"),
+    Pregunta("reporta_faltantes_o_problemas_de_averias", None, "Reportes", SECCION_APTITUDES,
+             "Elaboración de informes y reportes"),
+)
+
+# Columnas del formulario que no son preguntas puntuables
+COLUMNAS_CUALITATIVAS = (
+    "fortalezas_mas_destacadas",
+    "oportunidades_de_mejora",
+    "recomendaciones_especificas_de_formacion",
+)
+COLUMNAS_IDENTIFICACION = ("ruta", "supervisor", "marca_temporal", "timestamp", "fecha", "direccion_de_correo_electronico")
+# Fecha de cada respuesta del formulario (se parsea al cargar la evaluación)
+COLUMNAS_FECHA = ("marca_temporal", "timestamp", "fecha")
+
+# Vista por categoría (mismo formato que usaba el dashboard)
+CATEGORIAS = {}
+for _pregunta in REGISTRO:
+    if _pregunta.categoria:
+        CATEGORIAS.setdefault(_pregunta.categoria, []).append(_pregunta.clave)
+
+SECCIONES_COMPETENCIAS = {}
+for _pregunta in REGISTRO:
+    if _pregunta.competencia:
+        SECCIONES_COMPETENCIAS.setdefault(_pregunta.seccion, []).append(_pregunta)
+
+ORDEN_SECCIONES = (SECCION_VENTA, SECCION_CLIENTES, SECCION_ACTITUD, SECCION_APTITUDES)
+ORDEN_COMPETENCIAS = (
+    "Efectividad", "Manejo de Objeciones", "Venta Cruzada",
+    "Empatía", "Confianza", "Resolución de Conflictos",
+    "Iniciativa", "Adaptación", "Persistencia",
+    "Manejo de Herramientas", "Reportes", "Planificación",
+)
+SECCIONES_COMPETENCIAS = {
+    s: sorted(SECCIONES_COMPETENCIAS[s], key=lambda p: ORDEN_COMPETENCIAS.index(p.competencia))
+    for s in ORDEN_SECCIONES if s in SECCIONES_COMPETENCIAS
+}
+
+
+# =============================================
+# PLAN DE COLUMNAS (RESUELTO UNA VEZ POR ENCABEZADO)
+# =============================================
+@dataclass(frozen=True)
+class PlanColumnas:
+    columnas: tuple
+    columna_por_clave: dict                               # clave del registro -> nombre real
+    indices_categoria: dict                               # categoría -> índices de columna
+    no_encontradas: tuple = ()                            # preguntas del registro sin columna
+    ambiguas: dict = field(default_factory=dict)          # clave -> columnas candidatas
+    sin_registrar: tuple = ()                             # columnas que no están en el registro
+
+    def columna(self, clave):
+        return self.columna_por_clave.get(clave)
+
+    def columnas_categoria(self, categoria):
+        return [self.columnas[i] for i in self.indices_categoria.get(categoria, ())]
+
+    @property
+    def valido(self):
+        return not self.no_encontradas and not self.ambiguas
+
+    def reporte(self):
+        filas = [
+            {"Pregunta": clave, "Estado": "No encontrada", "Columnas": ""}
+            for clave in self.no_encontradas
+        ] + [
+            {"Pregunta": clave, "Estado": "Ambigua", "Columnas": ", ".join(candidatas)}
+            for clave, candidatas in self.ambiguas.items()
+        ] + [
+            {"Pregunta": "", "Estado": "Sin registrar", "Columnas": col}
+            for col in self.sin_registrar
+        ]
+        return pd.DataFrame(filas, columns=["Pregunta", "Estado", "Columnas"])
+
+
+@functools.lru_cache(maxsize=16)
+def resolver_columnas(columnas):
+    # columnas: tupla con los encabezados (hashable para cachear por firma).
+    # 1) Coincidencia exacta de la forma canónica: O(columnas + preguntas).
+    # 2) Sólo para las preguntas que quedaron sin columna, búsqueda por
+    #    contención entre las columnas libres (compatibilidad con encabezados
+    #    largos que incluyen la pregunta).
+    columnas = tuple(columnas)
+    canonicas = [clave_canonica(c) for c in columnas]
+    indice_canonico = {}
+    for i, canonica in enumerate(canonicas):
+        indice_canonico.setdefault(canonica, []).append(i)
+
+    excluidas = set(COLUMNAS_IDENTIFICACION + COLUMNAS_CUALITATIVAS)
+    asignadas = {}
+    ambiguas = {}
+    pendientes = []
+    for pregunta in REGISTRO:
+        candidatos = indice_canonico.get(clave_canonica(pregunta.clave), [])
+        if len(candidatos) == 1:
+            asignadas[pregunta.clave] = candidatos[0]
+        elif len(candidatos) > 1:
+            ambiguas[pregunta.clave] = tuple(candidatos)
+        else:
+            pendientes.append(pregunta)
+
+    usadas = set(asignadas.values())
+    libres = [i for i, canonica in enumerate(canonicas) if i not in usadas and canonica not in excluidas]
+    no_encontradas = []
+    for pregunta in pendientes:
+        termino = clave_canonica(pregunta.clave)
+        candidatos = [i for i in libres if termino in canonicas[i]]
+        if len(candidatos) == 1:
+            asignadas[pregunta.clave] = candidatos[0]
+        elif len(candidatos) > 1:
+            ambiguas[pregunta.clave] = tuple(candidatos)
+        else:
+            no_encontradas.append(pregunta.clave)
+
+    # Una misma columna no puede responder a dos preguntas distintas
+    por_columna = {}
+    for clave, i in asignadas.items():
+        por_columna.setdefault(i, []).append(clave)
+    for i, claves in por_columna.items():
+        if len(claves) > 1:
+            for clave in claves:
+                ambiguas[clave] = (i,)
+                del asignadas[clave]
+
+    indices_categoria = {categoria: [] for categoria in CATEGORIAS}
+    for pregunta in REGISTRO:
+        if pregunta.categoria and pregunta.clave in asignadas:
+            indices_categoria[pregunta.categoria].append(asignadas[pregunta.clave])
+
+    usadas = set(asignadas.values()).union(*ambiguas.values())
+    sin_registrar = tuple(
+        columnas[i] for i, canonica in enumerate(canonicas)
+        if i not in usadas and canonica not in excluidas
+    )
+
+    return PlanColumnas(
+        columnas=columnas,
+        columna_por_clave={clave: columnas[i] for clave, i in asignadas.items()},
+        indices_categoria={c: tuple(idx) for c, idx in indices_categoria.items()},
+        no_encontradas=tuple(no_encontradas),
+        ambiguas={clave: tuple(columnas[i] for i in idx) for clave, idx in ambiguas.items()},
+        sin_registrar=sin_registrar,
+    )
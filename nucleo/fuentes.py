@@ -0,0 +1,337 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as TimeoutFuturo
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+# =============================================
+# UBICACIONES POR DEFECTO
+# =============================================
+URL_EVAL = "https://docs.google.com/spreadsheets/d/1hcPBE_gkMmgn4JBjTrqbG3I_vzaFjRraX4sA5e4qKTE/export?format=csv"
+URL_SEG = "https://docs.google.com/spreadsheets/d/1p_vMUMIlprH-4ArY0kl_75XsUqBgIqV-CMEWs-6-zjw/export?format=csv"
+URL_CUMPLIMIENTO = "https://docs.google.com/spreadsheets/d/1miD-cft9CKEjfAv5vHj7P1RB0_bvL9z2/export?format=xlsx"
+
+# Cada fuente se puede redirigir con PERFILES_FUENTE_<NOMBRE> a otra URL,
+# a un archivo local o a un servidor HTTP local de pruebas.
+FUENTES_POR_DEFECTO = {
+    "evaluacion": URL_EVAL,
+    "seguimiento": URL_SEG,
+    "cumplimiento": URL_CUMPLIMIENTO,
+}
+
+# Tiempo máximo por intento (segundos) y reintentos adicionales de cada fuente;
+# se pueden ajustar con PERFILES_TIMEOUT_<NOMBRE> y PERFILES_REINTENTOS_<NOMBRE>.
+LIMITES_FUENTES = {
+    "evaluacion": {"timeout": 30, "reintentos": 2},
+    "seguimiento": {"timeout": 30, "reintentos": 2},
+    "cumplimiento": {"timeout": 60, "reintentos": 1},
+}
+
+DIRECTORIO_INSTANTANEAS = os.environ.get("PERFILES_CACHE_DIR", ".perfiles_cache")
+# Instantáneas que se conservan por fuente (la vigente y las anteriores más
+# recientes); las demás se borran cuando ningún registro las referencia.
+INSTANTANEAS_POR_FUENTE = max(int(os.environ.get("PERFILES_INSTANTANEAS_POR_FUENTE", 2)), 1)
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================
+# FUENTES
+# =============================================
+@dataclass
+class Descarga:
+    # contenido es None cuando la fuente confirma que no hubo cambios
+    contenido: Optional[bytes]
+    etag: Optional[str] = None
+    ultima_modificacion: Optional[str] = None
+
+
+class Fuente:
+    def __init__(self, nombre, ubicacion, timeout=60, reintentos=0):
+        self.nombre = nombre
+        self.ubicacion = ubicacion
+        self.timeout = timeout
+        self.reintentos = reintentos
+
+    @property
+    def plazo_total(self):
+        # Peor caso: todos los intentos agotan su timeout más las esperas entre intentos
+        return self.timeout * (self.reintentos + 1) + sum(_espera(i) for i in range(self.reintentos))
+
+    def descargar(self, etag=None, ultima_modificacion=None):
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.nombre!r}, {self.ubicacion!r})"
+
+
+class FuenteHTTP(Fuente):
+    def descargar(self, etag=None, ultima_modificacion=None):
+        peticion = urllib.request.Request(self.ubicacion)
+        if etag:
+            peticion.add_header("If-None-Match", etag)
+        if ultima_modificacion:
+            peticion.add_header("If-Modified-Since", ultima_modificacion)
+
+        try:
+            with urllib.request.urlopen(peticion, timeout=self.timeout) as respuesta:
+                return Descarga(
+                    respuesta.read(),
+                    respuesta.headers.get("ETag"),
+                    respuesta.headers.get("Last-Modified"),
+                )
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                return Descarga(None, etag, ultima_modificacion)
+            raise
+
+
+class FuenteArchivo(Fuente):
+    def descargar(self, etag=None, ultima_modificacion=None):
+        # ETag sintético: si el archivo no cambió de fecha ni tamaño, no se relee
+        info = os.stat(self.ubicacion)
+        marca = f"{info.st_mtime_ns}-{info.st_size}"
+        if etag == marca:
+            return Descarga(None, marca)
+        return Descarga(Path(self.ubicacion).read_bytes(), marca)
+
+
+def crear_fuente(nombre, ubicacion, timeout=60, reintentos=0):
+    if ubicacion.startswith(("http://", "https://")):
+        return FuenteHTTP(nombre, ubicacion, timeout, reintentos)
+    if ubicacion.startswith("file://"):
+        ubicacion = ubicacion[len("file://"):]
+    return FuenteArchivo(nombre, ubicacion, timeout, reintentos)
+
+
+def fuentes_configuradas():
+    fuentes = {}
+    for nombre, ubicacion in FUENTES_POR_DEFECTO.items():
+        sufijo = nombre.upper()
+        limites = LIMITES_FUENTES.get(nombre, {})
+        fuentes[nombre] = crear_fuente(
+            nombre,
+            os.environ.get(f"PERFILES_FUENTE_{sufijo}", ubicacion),
+            timeout=float(os.environ.get(f"PERFILES_TIMEOUT_{sufijo}", limites.get("timeout", 60))),
+            reintentos=int(os.environ.get(f"PERFILES_REINTENTOS_{sufijo}", limites.get("reintentos", 0))),
+        )
+    return fuentes
+
+
+# =============================================
+# ALMACÉN DE INSTANTÁNEAS (DIRECCIONADO POR CONTENIDO)
+# =============================================
+@dataclass
+class Instantanea:
+    nombre: str
+    sha: str
+    cambiado: bool
+
+
+class AlmacenInstantaneas:
+    def __init__(self, directorio=DIRECTORIO_INSTANTANEAS, conservar=INSTANTANEAS_POR_FUENTE):
+        self.directorio = Path(directorio)
+        self.objetos = self.directorio / "objetos"
+        self.registros = self.directorio / "registros"
+        self.objetos.mkdir(parents=True, exist_ok=True)
+        self.registros.mkdir(parents=True, exist_ok=True)
+        self.conservar = max(int(conservar), 1)
+        self._lock = threading.Lock()
+
+    def ruta_objeto(self, sha):
+        return self.objetos / sha[:2] / sha
+
+    def existe(self, sha):
+        return self.ruta_objeto(sha).exists()
+
+    def guardar(self, contenido):
+        sha = hashlib.sha256(contenido).hexdigest()
+        destino = self.ruta_objeto(sha)
+        if not destino.exists():
+            destino.parent.mkdir(parents=True, exist_ok=True)
+            _escribir_atomico(destino, contenido)
+        return sha
+
+    def leer(self, sha):
+        return self.ruta_objeto(sha).read_bytes()
+
+    def registro(self, nombre):
+        ruta = self.registros / f"{nombre}.json"
+        if not ruta.exists():
+            return {}
+        try:
+            return json.loads(ruta.read_text(encoding="utf-8"))
+        except ValueError:
+            return {}
+
+    def actualizar_registro(self, nombre, registro):
+        datos = json.dumps(registro, ensure_ascii=False).encode("utf-8")
+        _escribir_atomico(self.registros / f"{nombre}.json", datos)
+
+    def registrar(self, nombre, contenido, **metadatos):
+        # Guarda el contenido como instantánea vigente de la fuente, conserva
+        # las `conservar` más recientes y borra los objetos que ya no
+        # referencia ningún registro. Todo bajo el lock: otra fuente no puede
+        # purgar un objeto recién guardado antes de quedar registrado.
+        with self._lock:
+            sha = self.guardar(contenido)
+            anterior = self.registro(nombre)
+            recientes = [sha] + [
+                s for s in anterior.get("recientes", [anterior.get("sha")]) if s and s != sha
+            ]
+            self.actualizar_registro(nombre, {"sha": sha, "recientes": recientes[:self.conservar], **metadatos})
+            self._purgar()
+        return sha
+
+    def referenciados(self):
+        shas = set()
+        for ruta in self.registros.glob("*.json"):
+            registro = self.registro(ruta.stem)
+            shas.update(s for s in [registro.get("sha")] + registro.get("recientes", []) if s)
+        return shas
+
+    def _purgar(self):
+        # Objetos sin registro que los referencie (también los que quedaron de
+        # versiones anteriores del almacén); los temporales se ignoran
+        vigentes = self.referenciados()
+        for carpeta in self.objetos.iterdir():
+            if not carpeta.is_dir():
+                continue
+            for objeto in carpeta.iterdir():
+                if objeto.name.startswith(".tmp-") or objeto.name in vigentes:
+                    continue
+                try:
+                    objeto.unlink()
+                except OSError:
+                    logger.warning("No se pudo borrar la instantánea %s", objeto.name)
+            try:
+                carpeta.rmdir()     # sólo si quedó vacía
+            except OSError:
+                pass
+
+
+def _escribir_atomico(destino, contenido):
+    fd, temporal = tempfile.mkstemp(dir=destino.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(contenido)
+        os.replace(temporal, destino)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+
+def obtener_instantanea(fuente, almacen):
+    registro = almacen.registro(fuente.nombre)
+    sha_previo = registro.get("sha")
+    if sha_previo and not almacen.existe(sha_previo):
+        sha_previo = None
+
+    # Petición condicional sólo si todavía tenemos la copia local
+    descarga = fuente.descargar(
+        etag=registro.get("etag") if sha_previo else None,
+        ultima_modificacion=registro.get("ultima_modificacion") if sha_previo else None,
+    )
+    if descarga.contenido is None:
+        return Instantanea(fuente.nombre, sha_previo, False)
+
+    sha = almacen.registrar(
+        fuente.nombre, descarga.contenido,
+        etag=descarga.etag,
+        ultima_modificacion=descarga.ultima_modificacion,
+        ubicacion=fuente.ubicacion,
+    )
+    return Instantanea(fuente.nombre, sha, sha != sha_previo)
+
+
+# =============================================
+# DESCARGA CONCURRENTE CON DEGRADACIÓN PARCIAL
+# =============================================
+# Estados posibles de cada fuente tras una carga
+ACTUALIZADO = "actualizado"    # contenido nuevo descargado
+SIN_CAMBIOS = "sin_cambios"    # la fuente confirmó que no cambió
+OBSOLETO = "obsoleto"          # falló la descarga; se usa la última instantánea
+FALLIDO = "fallido"            # falló la descarga y no hay instantánea previa
+
+
+@dataclass
+class ResultadoFuente:
+    nombre: str
+    estado: str
+    sha: Optional[str] = None
+    error: Optional[str] = None
+    intentos: int = 0
+    segundos: float = 0.0
+    momento: float = 0.0
+
+    @property
+    def disponible(self):
+        return self.sha is not None
+
+
+def _espera(intento):
+    return min(0.5 * 2 ** intento, 5.0)
+
+
+def obtener_con_reintentos(fuente, almacen):
+    inicio = time.monotonic()
+    error = None
+    for intento in range(fuente.reintentos + 1):
+        if intento:
+            time.sleep(_espera(intento - 1))
+        try:
+            instantanea = obtener_instantanea(fuente, almacen)
+            return ResultadoFuente(
+                fuente.nombre,
+                ACTUALIZADO if instantanea.cambiado else SIN_CAMBIOS,
+                sha=instantanea.sha,
+                intentos=intento + 1,
+                segundos=time.monotonic() - inicio,
+                momento=time.time(),
+            )
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            logger.warning("Fuente %s: intento %d fallido (%s)", fuente.nombre, intento + 1, error)
+
+    return _resultado_degradado(fuente, almacen, error, fuente.reintentos + 1, time.monotonic() - inicio)
+
+
+def _resultado_degradado(fuente, almacen, error, intentos, segundos):
+    sha_previo = almacen.registro(fuente.nombre).get("sha")
+    if sha_previo and almacen.existe(sha_previo):
+        return ResultadoFuente(fuente.nombre, OBSOLETO, sha_previo, error, intentos, segundos, time.time())
+    return ResultadoFuente(fuente.nombre, FALLIDO, None, error, intentos, segundos, time.time())
+
+
+def obtener_instantaneas(fuentes, almacen):
+    # Todas las fuentes se descargan a la vez: la latencia total queda acotada
+    # por la fuente más lenta (o por su plazo_total), no por la suma.
+    inicio = time.monotonic()
+    resultados = {}
+    pool = ThreadPoolExecutor(max_workers=max(len(fuentes), 1), thread_name_prefix="fuente")
+    try:
+        futuros = {nombre: pool.submit(obtener_con_reintentos, fuente, almacen) for nombre, fuente in fuentes.items()}
+        for nombre, futuro in futuros.items():
+            fuente = fuentes[nombre]
+            restante = max(fuente.plazo_total - (time.monotonic() - inicio), 0)
+            try:
+                resultados[nombre] = futuro.result(timeout=restante)
+            except TimeoutFuturo:
+                resultados[nombre] = _resultado_degradado(
+                    fuente, almacen, f"Sin respuesta en {fuente.plazo_total:.1f} s",
+                    fuente.reintentos + 1, time.monotonic() - inicio,
+                )
+    finally:
+        # No esperar a hilos colgados: su resultado ya se descartó
+        pool.shutdown(wait=False, cancel_futures=True)
+    return resultados
@@ -0,0 +1,123 @@
+import io
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from nucleo.esquema import CATEGORIAS, COLUMNAS_FECHA
+from nucleo.fuentes import DIRECTORIO_INSTANTANEAS, _escribir_atomico
+from nucleo.seguimiento import parsear_timestamps
+from nucleo.vendedores import _VACIO, indexar_posiciones, normalizar_clave, normalizar_claves
+
+# =============================================
+# HISTORIAL DE CICLOS DE EVALUACIÓN (PARQUET, SÓLO AGREGAR)
+# =============================================
+# Cada versión procesada de la evaluación se guarda una vez como un archivo
+# parquet comprimido: ciclos/<fecha_ciclo>_<sha>.parquet. Nunca se reescribe
+# un ciclo existente. Puntaje y segmento se guardan con las reglas por
+# defecto para que los ciclos sean comparables entre sí.
+DIRECTORIO_CICLOS = os.environ.get("PERFILES_CICLOS_DIR", os.path.join(DIRECTORIO_INSTANTANEAS, "ciclos"))
+COLUMNAS_CICLO = ["ruta", "supervisor"] + list(CATEGORIAS) + ["puntaje_total", "potencial", "segmento"]
+FORMATO_FECHA_CICLO = "%Y%m%dT%H%M%S"
+
+
+def fecha_evaluacion(df_eval):
+    # Respuesta más reciente del formulario; None si la evaluación no trae fechas
+    for columna in COLUMNAS_FECHA:
+        if columna in df_eval.columns:
+            fecha = parsear_timestamps(df_eval[columna]).max()
+            if pd.notna(fecha):
+                return pd.Timestamp(fecha)
+    return None
+
+
+class AlmacenCiclos:
+    def __init__(self, directorio=DIRECTORIO_CICLOS):
+        self.directorio = Path(directorio)
+        self.directorio.mkdir(parents=True, exist_ok=True)
+
+    def archivos(self):
+        # Orden cronológico: el nombre empieza con la fecha del ciclo
+        return sorted(self.directorio.glob("*.parquet"))
+
+    def existe(self, ciclo):
+        return any(self.directorio.glob(f"*_{ciclo}.parquet"))
+
+    def registrar(self, ciclo, df_eval, fecha_ciclo=None):
+        # Devuelve True si el ciclo es nuevo y se guardó
+        ciclo = ciclo[:16]
+        if self.existe(ciclo):
+            return False
+        # Fecha del ciclo: la de los datos evaluados; la de ingesta sólo si no traen fecha
+        fecha_ciclo = pd.Timestamp(fecha_ciclo or fecha_evaluacion(df_eval) or datetime.now())
+        columnas = [c for c in COLUMNAS_CICLO if c in df_eval.columns]
+        instantanea = df_eval[columnas].assign(
+            ciclo=ciclo,
+            fecha_ciclo=pd.Timestamp(fecha_ciclo),
+            segmento=df_eval["segmento"].astype(str) if "segmento" in df_eval.columns else None,
+        )
+        buffer = io.BytesIO()
+        instantanea.to_parquet(buffer, index=False, compression="zstd")
+        destino = self.directorio / f"{fecha_ciclo.strftime(FORMATO_FECHA_CICLO)}_{ciclo}.parquet"
+        _escribir_atomico(destino, buffer.getvalue())
+        return True
+
+    def cargar(self):
+        archivos = self.archivos()
+        if not archivos:
+            return construir_historial(pd.DataFrame(columns=COLUMNAS_CICLO + ["ciclo", "fecha_ciclo"]))
+        return construir_historial(pd.concat([pd.read_parquet(a) for a in archivos], ignore_index=True))
+
+
+@dataclass
+class HistorialEvaluaciones:
+    datos: pd.DataFrame         # ordenado por (fecha_ciclo, ciclo, ruta)
+    ciclos: pd.DataFrame        # ciclo, fecha_ciclo, inicio, fin, vendedores
+    posiciones: dict            # clave normalizada -> posiciones (en orden cronológico)
+
+    @property
+    def vacio(self):
+        return self.ciclos.empty
+
+    def trayectoria(self, vendedor):
+        return self.datos.iloc[self.posiciones.get(normalizar_clave(vendedor), _VACIO)]
+
+    def ciclo(self, ciclo):
+        fila = self.ciclos.loc[self.ciclos["ciclo"] == ciclo]
+        if fila.empty:
+            return self.datos.iloc[0:0]
+        return self.datos.iloc[int(fila["inicio"].iloc[0]):int(fila["fin"].iloc[0])]
+
+    def estado_al(self, fecha):
+        # Último ciclo registrado en o antes de la fecha
+        fechas = self.ciclos["fecha_ciclo"].to_numpy(dtype="datetime64[ns]")
+        i = np.searchsorted(fechas, np.datetime64(pd.Timestamp(fecha), "ns"), side="right") - 1
+        if i < 0:
+            return self.datos.iloc[0:0]
+        return self.datos.iloc[int(self.ciclos["inicio"].iloc[i]):int(self.ciclos["fin"].iloc[i])]
+
+    def transiciones(self, ciclo_desde, ciclo_hasta, claves=None):
+        # Matriz segmento anterior x segmento nuevo (vendedores presentes en ambos ciclos)
+        desde = self.ciclo(ciclo_desde)[["clave", "segmento"]]
+        hasta = self.ciclo(ciclo_hasta)[["clave", "segmento"]]
+        if claves is not None:
+            hasta = hasta[hasta["clave"].isin(claves)]
+        pares = desde.merge(hasta, on="clave", suffixes=("_desde", "_hasta"))
+        return pd.crosstab(pares["segmento_desde"], pares["segmento_hasta"])
+
+
+def construir_historial(datos):
+    datos = datos.assign(clave=normalizar_claves(datos["ruta"]))
+    datos = datos.sort_values(["fecha_ciclo", "ciclo", "clave"], kind="stable").reset_index(drop=True)
+
+    ciclos = (
+        datos.reset_index()
+        .groupby(["fecha_ciclo", "ciclo"], sort=True)
+        .agg(inicio=("index", "min"), fin=("index", "max"), vendedores=("clave", "nunique"))
+        .reset_index()
+    )
+    ciclos["fin"] += 1
+    return HistorialEvaluaciones(datos, ciclos, indexar_posiciones(datos["clave"].to_numpy()))
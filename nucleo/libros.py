@@ -0,0 +1,52 @@
+import io
+import os
+
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+# =============================================
+# LECTURA DE LIBROS XLSX
+# =============================================
+# "completo" usa pandas/openpyxl en modo normal; "streaming" abre el libro en
+# modo sólo lectura y recorre las filas sin cargar el árbol XML completo, lo
+# que reduce el pico de memoria en libros grandes. Las filas pasan por el
+# mismo TextParser que usa read_excel: ambos modos dan los mismos tipos.
+MODOS_LIBRO = ("completo", "streaming")
+MODO_LIBRO = os.environ.get("PERFILES_MODO_LIBRO", "completo")
+
+
+def leer_libro(contenido, hojas=None, modo=MODO_LIBRO):
+    # Un único parseo del libro devuelve todas las hojas pedidas (o todas si hojas es None)
+    if modo not in MODOS_LIBRO:
+        raise ValueError(f"Modo de lectura desconocido: {modo!r}. Opciones: {MODOS_LIBRO}")
+
+    if modo == "completo":
+        return pd.read_excel(io.BytesIO(contenido), sheet_name=list(hojas) if hojas else None)
+    return _leer_libro_streaming(contenido, hojas)
+
+
+def _leer_libro_streaming(contenido, hojas=None):
+    from openpyxl import load_workbook
+
+    libro = load_workbook(io.BytesIO(contenido), read_only=True, data_only=True)
+    try:
+        nombres = list(hojas) if hojas else libro.sheetnames
+        faltantes = [h for h in nombres if h not in libro.sheetnames]
+        if faltantes:
+            raise ValueError(f"Hojas no encontradas en el libro: {faltantes}")
+
+        resultado = {}
+        for nombre in nombres:
+            filas = libro[nombre].iter_rows(values_only=True)
+            encabezado = next(filas, None)
+            if encabezado is None:
+                resultado[nombre] = pd.DataFrame()
+                continue
+            # Encabezados vacíos como "" (igual que read_excel) -> "Unnamed: i"
+            encabezado = ["" if valor is None else valor for valor in encabezado]
+            # Descartar filas completamente vacías (celdas con formato pero sin datos)
+            registros = [fila for fila in filas if any(valor is not None for valor in fila)]
+            resultado[nombre] = TextParser([encabezado] + registros, header=0).read()
+        return resultado
+    finally:
+        libro.close()
@@ -0,0 +1,98 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# =============================================
+# UBICACIONES DE VISITAS (COORDENADAS Y AGREGACIÓN EN GRILLA)
+# =============================================
+# Las coordenadas se parsean una vez por versión del seguimiento. Para el mapa,
+# por encima de LIMITE_PUNTOS_MAPA se envían marcadores agregados por celda
+# (una grilla en grados cuyo tamaño depende del zoom) en lugar de cada visita.
+LIMITE_PUNTOS_MAPA = int(os.environ.get("PERFILES_MAPA_MAX_PUNTOS", 5000))
+CELDAS_POR_MOSAICO = 8      # ~32 px por celda con mosaicos de 256 px
+COLUMNAS_UBICACIONES = ["ruta", "supervisor", "timestamp", "location", "lat", "lon"]
+
+
+def parsear_coordenadas(serie):
+    # "18.42516,-69.89514" -> (lat, lon) float64; inválidas o fuera de rango -> NaN
+    partes = serie.astype("string").str.split(",", n=1, expand=True)
+    if partes.shape[1] < 2:
+        vacio = np.full(len(serie), np.nan)
+        return vacio, vacio.copy()
+    lat = pd.to_numeric(partes[0].str.strip(), errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    lon = pd.to_numeric(partes[1].str.strip(), errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    fuera = (np.abs(lat) > 90) | (np.abs(lon) > 180)
+    lat[fuera] = np.nan
+    lon[fuera] = np.nan
+    return lat, lon
+
+
+def construir_ubicaciones(df_seg):
+    # Sólo las visitas con coordenadas válidas, con lat/lon numéricos
+    if df_seg is None or df_seg.empty or "location" not in df_seg.columns:
+        return pd.DataFrame(columns=COLUMNAS_UBICACIONES)
+    lat, lon = parsear_coordenadas(df_seg["location"])
+    validas = ~(np.isnan(lat) | np.isnan(lon))
+    columnas = [c for c in ("ruta", "supervisor", "timestamp", "location") if c in df_seg.columns]
+    ubicaciones = df_seg.loc[validas, columnas].reset_index(drop=True)
+    ubicaciones["lat"] = lat[validas]
+    ubicaciones["lon"] = lon[validas]
+    if "supervisor" in ubicaciones.columns:
+        ubicaciones["supervisor"] = ubicaciones["supervisor"].astype("category")
+    return ubicaciones
+
+
+def tamano_celda(zoom):
+    # Ancho en grados de un mosaico a ese zoom, dividido en CELDAS_POR_MOSAICO
+    return 360.0 / (2 ** float(zoom)) / CELDAS_POR_MOSAICO
+
+
+def agregar_en_grilla(ubicaciones, zoom, grupo="supervisor"):
+    # Un marcador por (celda, grupo): posición media y cantidad de visitas
+    if ubicaciones.empty:
+        return pd.DataFrame(columns=[grupo, "lat", "lon", "visitas"])
+    celda = tamano_celda(zoom)
+    lat = ubicaciones["lat"].to_numpy()
+    lon = ubicaciones["lon"].to_numpy()
+    fila = np.floor(lat / celda).astype(np.int64)
+    columna = np.floor(lon / celda).astype(np.int64)
+    fila -= fila.min()
+    columna -= columna.min()
+
+    if grupo in ubicaciones.columns:
+        codigos_grupo, grupos = pd.factorize(ubicaciones[grupo], use_na_sentinel=False)
+    else:
+        codigos_grupo, grupos = np.zeros(len(ubicaciones), dtype=np.int64), pd.Index([""])
+
+    # Clave entera única por (fila, columna, grupo) y agrupación por hash
+    n_grupos = max(len(grupos), 1)
+    clave = (fila * (int(columna.max()) + 1) + columna) * n_grupos + codigos_grupo
+    inversa, unicas = pd.factorize(clave)
+
+    visitas = np.bincount(inversa, minlength=len(unicas))
+    return pd.DataFrame({
+        grupo: np.asarray(grupos)[np.asarray(unicas) % n_grupos],
+        "lat": np.bincount(inversa, weights=lat, minlength=len(unicas)) / visitas,
+        "lon": np.bincount(inversa, weights=lon, minlength=len(unicas)) / visitas,
+        "visitas": visitas,
+    })
+
+
+def marcadores_mapa(ubicaciones, zoom, limite_puntos=LIMITE_PUNTOS_MAPA):
+    # -> (marcadores, agregado): puntos crudos si caben bajo el límite; si no,
+    # grilla del zoom pedido, que se hace más gruesa hasta respetar el límite
+    if len(ubicaciones) <= limite_puntos:
+        return ubicaciones.assign(visitas=1), False
+    zoom = int(zoom)
+    marcadores = agregar_en_grilla(ubicaciones, zoom)
+    while len(marcadores) > limite_puntos and zoom > 0:
+        zoom -= 1
+        marcadores = agregar_en_grilla(ubicaciones, zoom)
+    return marcadores, True
+
+
+def centro_mapa(ubicaciones):
+    if ubicaciones.empty:
+        return {"lat": 18.48, "lon": -69.93}
+    return {"lat": float(ubicaciones["lat"].median()), "lon": float(ubicaciones["lon"].median())}
@@ -0,0 +1,129 @@
+import contextlib
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# =============================================
+# PERFILADO DE RERUNS POR TRAMOS
+# =============================================
+# Tramos anidados (datos > etapa, vista > pestaña > gráfico) medidos con
+# perf_counter. Desactivado, tramo() devuelve un contexto nulo compartido y
+# medido() deja la función intacta: el costo es una llamada a método.
+# Activo, cada rerun se exporta como una línea JSON por tramo al logger
+# "nucleo.perfilado" y, con PERFILES_PERFILADO_ARCHIVO, a un archivo JSONL.
+ACTIVO = os.environ.get("PERFILES_PERFILADO", "").lower() in ("1", "true", "si", "sí")
+ARCHIVO_PERFILADO = os.environ.get("PERFILES_PERFILADO_ARCHIVO")
+
+_NULO = contextlib.nullcontext()
+_BLOQUEO_ARCHIVO = threading.Lock()
+
+
+@dataclass
+class Tramo:
+    tipo: str                   # datos, etapa, vista, pestaña, gráfico, tabla, pdf...
+    nombre: str
+    ruta: str                   # "vista:Individual/pestaña:📊 Resumen/gráfico:..."
+    profundidad: int
+    inicio: float               # segundos desde el inicio del rerun
+    duracion: Optional[float] = None
+    atributos: dict = field(default_factory=dict)
+
+
+class Perfilador:
+    def __init__(self, activo=ACTIVO, archivo=ARCHIVO_PERFILADO):
+        self.activo = activo
+        self.archivo = archivo
+        self.rerun = uuid.uuid4().hex[:12]
+        self.origen = time.perf_counter()
+        self.tramos = []
+        self._abiertos = []
+
+    def iniciar(self, tipo, nombre="", **atributos):
+        if not self.activo:
+            return
+        padre = self._abiertos[-1].ruta + "/" if self._abiertos else ""
+        etiqueta = f"{tipo}:{nombre}" if nombre else tipo
+        tramo = Tramo(tipo, str(nombre), padre + etiqueta, len(self._abiertos),
+                      time.perf_counter() - self.origen, atributos=atributos)
+        self.tramos.append(tramo)
+        self._abiertos.append(tramo)
+
+    def terminar(self):
+        if not self.activo or not self._abiertos:
+            return
+        tramo = self._abiertos.pop()
+        tramo.duracion = time.perf_counter() - self.origen - tramo.inicio
+
+    @contextlib.contextmanager
+    def _medir(self, tipo, nombre, atributos):
+        self.iniciar(tipo, nombre, **atributos)
+        try:
+            yield
+        finally:
+            self.terminar()
+
+    def tramo(self, tipo, nombre="", **atributos):
+        if not self.activo:
+            return _NULO
+        return self._medir(tipo, nombre, atributos)
+
+    def medido(self, funcion, tipo="etapa"):
+        # Decorador: un tramo por llamada con el nombre de la función
+        if not self.activo:
+            return funcion
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with self._medir(tipo, funcion.__name__, {}):
+                return funcion(*args, **kwargs)
+        return envoltura
+
+    def cerrar(self):
+        # Cierra los tramos que quedaron abiertos; devuelve la duración del rerun
+        while self._abiertos:
+            self.terminar()
+        return time.perf_counter() - self.origen
+
+    def registros(self):
+        return [
+            {
+                "rerun": self.rerun,
+                "tramo": t.ruta,
+                "tipo": t.tipo,
+                "nombre": t.nombre,
+                "profundidad": t.profundidad,
+                "inicio_ms": round(t.inicio * 1000, 3),
+                "duracion_ms": None if t.duracion is None else round(t.duracion * 1000, 3),
+                **t.atributos,
+            }
+            for t in self.tramos
+        ]
+
+    def exportar(self):
+        # Una línea JSON por tramo; devuelve las líneas exportadas
+        lineas = [json.dumps(r, ensure_ascii=False, default=str) for r in self.registros()]
+        for linea in lineas:
+            logger.info(linea)
+        if self.archivo and lineas:
+            with _BLOQUEO_ARCHIVO, open(self.archivo, "a", encoding="utf-8") as f:
+                f.write("\n".join(lineas) + "\n")
+        return lineas
+
+    def desglose(self, total=None):
+        # Tabla para el panel: un tramo por fila, sangrado por profundidad
+        total = total or self.cerrar()
+        return pd.DataFrame({
+            "Tramo": ["  " * t.profundidad + (f"{t.tipo}: {t.nombre}" if t.nombre else t.tipo) for t in self.tramos],
+            "ms": [round((t.duracion or 0.0) * 1000, 1) for t in self.tramos],
+            "%": [round((t.duracion or 0.0) / total * 100, 1) if total else 0.0 for t in self.tramos],
+        })
@@ -0,0 +1,94 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from nucleo.carga import normalizar_informacion
+from nucleo.compacto import MODO_COMPACTO, compactar
+from nucleo.cubo import construir_cubo_cumplimiento
+from nucleo.esquema import CATEGORIAS, COLUMNAS_CUALITATIVAS, resolver_columnas
+from nucleo.segmentacion import REGLAS_POR_DEFECTO, aplicar_reglas
+from nucleo.vendedores import construir_dimension_vendedores
+
+# =============================================
+# PROCESAMIENTO DE LA EVALUACIÓN
+# =============================================
+COL_VENDEDOR = "ruta"
+COL_SUPERVISOR = "supervisor"
+
+
+def columnas_faltantes(df_eval):
+    # Columnas esenciales ausentes en la hoja de evaluación
+    return [col for col in (COL_VENDEDOR, COL_SUPERVISOR) if col not in df_eval.columns]
+
+
+def procesar_datos(df_eval, compacto=False):
+    # Puntajes por categoría; puntaje total, potencial y segmento salen del
+    # motor de reglas (aplicar_reglas). Modifica y devuelve df_eval; en modo
+    # compacto devuelve un DataFrame nuevo con puntajes float32 y categóricas.
+    numericas = [
+        col for col in df_eval.columns
+        if col not in [COL_VENDEDOR, COL_SUPERVISOR] + list(COLUMNAS_CUALITATIVAS)
+        and not pd.api.types.is_datetime64_any_dtype(df_eval[col])
+    ]
+    for col in numericas:
+        df_eval[col] = pd.to_numeric(df_eval[col], errors='coerce')
+    if compacto:
+        df_eval = compactar(df_eval, puntajes=numericas)
+
+    # Calcular puntajes por categoría con el plan de columnas precompilado
+    plan = resolver_columnas(tuple(df_eval.columns))
+    for categoria in CATEGORIAS:
+        cols_categoria = [col for col in plan.columnas_categoria(categoria) if pd.api.types.is_numeric_dtype(df_eval[col])]
+
+        df_eval[categoria] = df_eval[cols_categoria].mean(axis=1) if cols_categoria else np.nan
+
+    return df_eval
+
+
+def resumen_equipo(df_eval):
+    # Agregados del Resumen Ejecutivo que sólo dependen de la evaluación segmentada
+    segment_counts = df_eval['segmento'].value_counts().reset_index()
+    segment_counts.columns = ['Segmento', 'Cantidad']
+    return {
+        'total_colaboradores': df_eval[COL_VENDEDOR].nunique(),
+        'total_supervisores': df_eval[COL_SUPERVISOR].nunique(),
+        'media_total': df_eval['puntaje_total'].mean(),
+        'media_potencial': df_eval['potencial'].mean(),
+        'avg_areas': {area: df_eval[area].mean() for area in CATEGORIAS},
+        'segment_counts': segment_counts,
+    }
+
+
+# =============================================
+# MODELO COMPLETO (USO POR LOTES / SIN INTERFAZ)
+# =============================================
+@dataclass
+class ModeloPerfiles:
+    df_eval: pd.DataFrame       # evaluación con categorías, puntajes y segmento
+    df_seg: pd.DataFrame
+    df_cump: pd.DataFrame       # modelo canónico de cumplimiento
+    df_info: pd.DataFrame
+    dimension: object           # DimensionVendedores
+    cubo: object                # CuboCumplimiento
+    reglas: object              # ReglasSegmentacion aplicadas
+
+
+def construir_modelo(datos, reglas=REGLAS_POR_DEFECTO, compacto=MODO_COMPACTO):
+    # datos: DatosCargados (nucleo.carga.cargar_datos)
+    faltantes = columnas_faltantes(datos.df_eval)
+    if faltantes:
+        raise ValueError(f"Columnas no encontradas en la evaluación: {', '.join(faltantes)}")
+    df_eval = aplicar_reglas(procesar_datos(datos.df_eval.copy(deep=False), compacto), reglas)
+    df_info = normalizar_informacion(datos.df_info)
+    if compacto:
+        df_info = compactar(df_info)
+    return ModeloPerfiles(
+        df_eval=df_eval,
+        df_seg=datos.df_seg,
+        df_cump=datos.df_cump,
+        df_info=df_info,
+        dimension=construir_dimension_vendedores(df_eval, df_info, datos.df_seg, datos.df_cump),
+        cubo=construir_cubo_cumplimiento(datos.df_cump),
+        reglas=reglas,
+    )
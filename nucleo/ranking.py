@@ -0,0 +1,90 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from nucleo.esquema import CATEGORIAS
+from nucleo.segmentacion import REGLAS_POR_DEFECTO
+
+# =============================================
+# MOTOR DE RANKING DEL EQUIPO
+# =============================================
+# Se construye una vez por versión de la evaluación y reglas de segmentación:
+#   - por métrica, la permutación de filas de mayor a menor (sin dato al final)
+#   - percentil de cada vendedor en todo el equipo (0-100)
+#   - nivel de color por métrica (mismos umbrales que la segmentación)
+#   - máscaras booleanas por supervisor y códigos de ruta para filtrar
+# Filtrar y ordenar en cada rerun es indexar arreglos, sin sort_values.
+METRICAS_RANKING = ("puntaje_total", "potencial") + tuple(CATEGORIAS)
+COLORES_NIVEL = {"Alto": "🟢", "Medio": "🟡", "Bajo": "🔴", "N/D": "⚪"}
+
+
+def permutacion_descendente(valores):
+    # Orden estable de mayor a menor; NaN al final
+    valores = np.asarray(valores, dtype=float)
+    orden = np.argsort(-np.nan_to_num(valores, nan=-np.inf), kind="stable")
+    return orden.astype(np.intp, copy=False)
+
+
+def percentiles(valores):
+    # Porcentaje del equipo con un valor menor o igual; NaN sin percentil
+    return pd.Series(valores).rank(method="max", pct=True).mul(100).to_numpy(dtype=np.float32)
+
+
+def niveles_color(valores, reglas=REGLAS_POR_DEFECTO):
+    valores = np.asarray(valores, dtype=float)
+    return np.select(
+        [np.isnan(valores), valores >= reglas.umbral_alto, valores >= reglas.umbral_bajo],
+        [COLORES_NIVEL["N/D"], COLORES_NIVEL["Alto"], COLORES_NIVEL["Medio"]],
+        default=COLORES_NIVEL["Bajo"],
+    )
+
+
+@dataclass
+class RankingEquipo:
+    orden: dict                 # métrica -> posiciones de fila, de mayor a menor
+    percentiles: pd.DataFrame   # una fila por fila de la evaluación, una columna por métrica
+    colores: pd.DataFrame       # ídem, con el nivel de color
+    mascaras_supervisor: dict   # supervisor -> máscara booleana
+    codigos_ruta: np.ndarray    # código de ruta por fila
+    rutas: pd.Index             # ruta de cada código
+
+    @property
+    def metricas(self):
+        return list(self.orden)
+
+    def mascara(self, supervisores=(), rutas=()):
+        # None si no hay filtro (todas las filas)
+        mascara = None
+        if len(supervisores):
+            mascara = np.logical_or.reduce([
+                self.mascaras_supervisor.get(s, np.zeros(len(self.codigos_ruta), dtype=bool))
+                for s in supervisores
+            ])
+        if len(rutas):
+            codigos = self.rutas.get_indexer(list(rutas))
+            por_ruta = np.isin(self.codigos_ruta, codigos[codigos >= 0])
+            mascara = por_ruta if mascara is None else mascara & por_ruta
+        return mascara
+
+    def ordenar(self, metrica, mascara=None):
+        # Posiciones de fila ordenadas por la métrica, sólo las de la máscara
+        orden = self.orden[metrica]
+        return orden if mascara is None else orden[mascara[orden]]
+
+    def percentiles_de(self, posicion):
+        return self.percentiles.iloc[posicion]
+
+
+def construir_ranking(df_eval, reglas=REGLAS_POR_DEFECTO, metricas=METRICAS_RANKING):
+    metricas = [m for m in metricas if m in df_eval.columns]
+    codigos_ruta, rutas = pd.factorize(df_eval["ruta"], sort=False)
+    codigos_sup, supervisores = pd.factorize(df_eval["supervisor"], sort=False)
+    return RankingEquipo(
+        orden={m: permutacion_descendente(df_eval[m]) for m in metricas},
+        percentiles=pd.DataFrame({m: percentiles(df_eval[m].to_numpy(dtype=float)) for m in metricas}),
+        colores=pd.DataFrame({m: niveles_color(df_eval[m], reglas) for m in metricas}),
+        mascaras_supervisor={s: codigos_sup == i for i, s in enumerate(supervisores)},
+        codigos_ruta=codigos_ruta,
+        rutas=pd.Index(rutas),
+    )
@@ -0,0 +1,353 @@
+import io
+import logging
+import multiprocessing
+import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import pandas as pd
+
+from nucleo.esquema import CATEGORIAS as categorias
+from nucleo.esquema import resolver_columnas
+from nucleo.vendedores import construir_dimension_vendedores
+
+logger = logging.getLogger(__name__)
+
+# =============================================
+# FUNCIÓN PARA GENERAR PDF (MEJORADA)
+# =============================================
+TIPOS_PDF = {
+    "general": "Perfil",
+    "reconocimiento": "Reconocimiento",
+    "mejora": "Plan_Mejora",
+}
+
+
+def _salida_pdf(pdf):
+    # fpdf2 devuelve bytearray; PyFPDF 1.x devolvía str en latin-1
+    salida = pdf.output()
+    if isinstance(salida, str):
+        return salida.encode('latin-1', errors='replace')
+    return bytes(salida)
+
+
+def generar_pdf_perfil(vendedor, df_eval, df_seg, df_cump=None, df_info=None, tipo="general", dimension=None):
+    if dimension is None:
+        dimension = construir_dimension_vendedores(df_eval, df_info, None, df_cump)
+
+    filas_eval = dimension.filas('evaluacion', vendedor)
+    if not len(filas_eval):
+        raise ValueError(f"No se encontró al vendedor {vendedor} en evaluación")
+
+    datos_vendedor = df_eval.iloc[filas_eval[0]].to_dict()
+    info_vendedor = {}
+    if df_info is not None and not df_info.empty:
+        filas_info = dimension.filas('informacion', vendedor)
+        if len(filas_info):
+            info_vendedor = df_info.iloc[filas_info[0]].to_dict()
+
+    df_cump_vendedor = None
+    if df_cump is not None and not df_cump.empty:
+        df_cump_vendedor = dimension.seleccionar(df_cump, 'cumplimiento', vendedor)
+
+    # fpdf se importa al generar el primer PDF: no pesa en el arranque del dashboard
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.set_margins(left=15, top=15, right=15)
+
+    try:
+        pdf.add_font('DejaVu', '', 'DejaVuSans.ttf', uni=True)
+        pdf.set_font('DejaVu', '', 12)
+    except:
+        pdf.set_font("Arial", size=12)
+
+    # Encabezado general
+    pdf.set_fill_color(240, 240, 240)
+    pdf.rect(10, 10, 190, 40, 'F')
+    pdf.set_font('', 'B', 16)
+    pdf.cell(190, 10, txt="IDENTIFICACIÓN COMERCIAL", ln=1, align='C')
+    pdf.set_font('', '', 12)
+    if info_vendedor:
+        pdf.cell(95, 8, txt=f"Nombre: {info_vendedor.get('nombre_vendedor', 'N/D')}", ln=0)
+        pdf.cell(95, 8, txt=f"Ruta: {info_vendedor.get('ruta', 'N/D')}", ln=1)
+        pdf.cell(95, 8, txt=f"Cédula: {info_vendedor.get('cedula', 'N/D')}", ln=0)
+        pdf.cell(95, 8, txt=f"Teléfono: {info_vendedor.get('telefono', 'N/D')}", ln=1)
+        try:
+            fecha_ingreso = pd.to_datetime(info_vendedor.get('fecha_ingreso'))
+            tiempo = (datetime.now() - fecha_ingreso).days // 30
+            pdf.cell(95, 8, txt=f"Antigüedad: {tiempo} meses", ln=0)
+        except:
+            pdf.cell(95, 8, txt="Antigüedad: N/D", ln=0)
+        pdf.cell(95, 8, txt=f"Zona: {info_vendedor.get('zona', 'N/D')}", ln=1)
+    pdf.ln(10)
+
+    # Evaluación cualitativa
+    columnas_cualitativas = {
+        "fortalezas_mas_destacadas": "Fortalezas destacadas",
+        "oportunidades_de_mejora": "Oportunidades de mejora",
+        "recomendaciones_especificas_de_formacion": "Recomendaciones de formación"
+    }
+
+    pdf.set_font('', 'B', 14)
+    pdf.set_fill_color(200, 220, 255)
+    pdf.cell(0, 10, "EVALUACIÓN CUALITATIVA", ln=1, fill=True)
+    pdf.ln(3)
+
+    for col, titulo in columnas_cualitativas.items():
+        pdf.set_font('', 'B', 12)
+        pdf.set_fill_color(240, 240, 240)
+        pdf.cell(0, 8, f"{titulo}:", ln=1, fill=True)
+        contenido = datos_vendedor.get(col, "")
+        if pd.isna(contenido) or str(contenido).strip() == "":
+            pdf.set_font('', 'I', 10)
+            pdf.cell(0, 6, "No fue completado.", ln=1)
+        else:
+            pdf.set_font('', '', 10)
+            pdf.multi_cell(0, 6, str(contenido).strip())
+        pdf.ln(2)
+
+    if tipo == "general":
+        pdf.set_font('', 'B', 14)
+        pdf.set_fill_color(220, 220, 220)
+        pdf.cell(0, 10, "EVALUACIÓN POR COMPETENCIAS", ln=1, fill=True)
+        pdf.ln(3)
+
+        plan = resolver_columnas(tuple(df_eval.columns))
+        for categoria, columnas in categorias.items():
+            pdf.set_font('', 'B', 12)
+            pdf.cell(0, 8, txt=categoria, ln=1)
+            pdf.set_font('', '', 10)
+            for clave in columnas:
+                col = plan.columna(clave)
+                if col in datos_vendedor:
+                    valor = datos_vendedor[col]
+                    if isinstance(valor, (int, float)) and pd.notna(valor):
+                        valor_str = f"{valor:.2f}/10"
+                    else:
+                        valor_str = str(valor)
+                    pdf.cell(0, 6, txt=f"- {col.replace('_', ' ').capitalize()}: {valor_str}", ln=1)
+            pdf.ln(2)
+
+        # Logros
+        if df_cump is not None and not df_cump.empty:
+            logros = df_cump_vendedor[df_cump_vendedor['cumplimiento_num'] > 0.8].sort_values('fecha', ascending=False).head(3)
+            if not logros.empty:
+                pdf.set_font('', 'B', 14)
+                pdf.set_fill_color(220, 220, 220)
+                pdf.cell(0, 10, "LOGROS DESTACADOS", ln=1, fill=True)
+                pdf.set_font('', '', 10)
+                for _, row in logros.iterrows():
+                    mes = f"{row['mes']}-{row['year']}"
+                    cumplimiento = f"{row['cumplimiento']:.2f}%"
+                    pdf.cell(0, 6, txt=f"{row['indicador']}: {cumplimiento} (Mes: {mes})", ln=1)
+
+    elif tipo == "reconocimiento":
+        pdf.set_font('', 'B', 16)
+        pdf.cell(0, 10, txt="CARTA DE RECONOCIMIENTO", ln=1, align='C')
+        pdf.ln(10)
+        pdf.set_font('', '', 12)
+        pdf.multi_cell(0, 8, txt=f"A quien corresponda:")
+        pdf.ln(5)
+        pdf.multi_cell(0, 8, txt=f"Reconocemos al colaborador {vendedor} por su excelente desempeño durante los siguientes periodos:")
+        pdf.ln(5)
+
+        if df_cump is not None and not df_cump.empty:
+            df_vend_cump = df_cump_vendedor
+            df_vend_cump = df_vend_cump[df_vend_cump['cumplimiento_num'] > df_vend_cump['cumplimiento_num'].mean()]
+            df_vend_cump = df_vend_cump.sort_values('fecha', ascending=False)
+            for _, row in df_vend_cump.head(5).iterrows():
+                mes = f"{row['mes']}-{row['year']}"
+                cumplimiento = f"{row['cumplimiento']:.2f}%"
+                pdf.cell(100, 6, txt=f"- {row['indicador']}:", ln=0)
+                pdf.cell(90, 6, txt=f"{cumplimiento} (Mes: {mes})", ln=1)
+
+        pdf.ln(10)
+        pdf.multi_cell(0, 8, txt="Este reconocimiento se otorga como muestra de aprecio por su dedicación y compromiso con la excelencia comercial.")
+        pdf.ln(15)
+        pdf.cell(100, 8, txt="Santo Domingo, " + datetime.now().strftime("%d/%m/%Y"), ln=0)
+        pdf.cell(90, 8, txt="_________________________", ln=1)
+        pdf.cell(100, 8, txt="", ln=0)
+        pdf.cell(90, 8, txt="Firma Supervisor", ln=1)
+        pdf.ln(15)
+        pdf.cell(0, 8, txt="_________________________", ln=1)
+        pdf.cell(0, 8, txt="Firma Gerente Comercial", ln=1)
+
+    elif tipo == "mejora":
+        pdf.set_font('', 'B', 16)
+        pdf.cell(0, 10, txt="PLAN DE MEJORA", ln=1, align='C')
+        pdf.ln(10)
+
+        pdf.set_font('', 'B', 12)
+        pdf.cell(100, 8, txt="Vendedor:", ln=0)
+        pdf.set_font('', '')
+        pdf.cell(90, 8, txt=vendedor, ln=1)
+
+        pdf.set_font('', 'B', 12)
+        pdf.cell(100, 8, txt="Ruta:", ln=0)
+        pdf.set_font('', '')
+        pdf.cell(90, 8, txt=info_vendedor.get('ruta', 'N/D'), ln=1)
+
+        pdf.set_font('', 'B', 12)
+        pdf.cell(100, 8, txt="Fecha:", ln=0)
+        pdf.set_font('', '')
+        pdf.cell(90, 8, txt=datetime.now().strftime("%d/%m/%Y"), ln=1)
+        pdf.ln(10)
+
+        pdf.set_font('', 'B', 14)
+        pdf.cell(0, 10, txt="ÁREAS DE OPORTUNIDAD", ln=1)
+
+        if df_cump is not None and not df_cump.empty:
+            df_vend_cump = df_cump_vendedor
+            df_vend_cump = df_vend_cump[df_vend_cump['cumplimiento_num'] < df_vend_cump['cumplimiento_num'].mean()]
+            df_vend_cump = df_vend_cump.sort_values('fecha', ascending=False)
+            for _, row in df_vend_cump.head(5).iterrows():
+                mes = f"{row['mes']}-{row['year']}"
+                cumplimiento = f"{row['cumplimiento']:.2f}%"
+                pdf.set_font('', 'B', 10)
+                pdf.cell(100, 6, txt=f"{row['indicador']}:", ln=0)
+                pdf.set_font('', '')
+                pdf.cell(90, 6, txt=f"{cumplimiento} (Mes: {mes})", ln=1)
+
+        pdf.ln(5)
+        pdf.set_font('', 'B', 14)
+        pdf.cell(0, 10, txt="PLAN DE ACCIÓN", ln=1)
+        segmento = datos_vendedor.get('segmento', 'N/D')
+        acciones = [
+            "1. Capacitación en técnicas de venta (8 horas)",
+            "2. Acompañamiento semanal del supervisor",
+            "3. Establecimiento de metas quincenales",
+            "4. Revisión diaria de objetivos"
+        ] if "Bajo" in segmento else [
+            "1. Taller especializado de habilidades",
+            "2. Mentoría mensual con vendedor líder",
+            "3. Metas mensuales con retroalimentación"
+        ]
+        for accion in acciones:
+            pdf.set_font('', '', 12)
+            pdf.multi_cell(0, 6, txt=accion)
+            pdf.ln(1)
+
+        pdf.ln(10)
+        pdf.set_font('', 'B', 14)
+        pdf.cell(0, 10, txt="COMPROMISO DEL COLABORADOR", ln=1)
+        pdf.set_font('', '', 12)
+        pdf.multi_cell(0, 8, txt="Yo, _________________________________________, me comprometo a seguir el plan de mejora establecido y a trabajar en las áreas de oportunidad identificadas.")
+        pdf.ln(15)
+        pdf.cell(100, 8, txt="_________________________", ln=0)
+        pdf.cell(90, 8, txt="_________________________", ln=1)
+        pdf.cell(100, 8, txt="Firma Vendedor", ln=0)
+        pdf.cell(90, 8, txt="Firma Supervisor", ln=1)
+
+    return _salida_pdf(pdf)
+
+
+# =============================================
+# GENERACIÓN EN LOTE (POOL DE PROCESOS)
+# =============================================
+# Cada proceso recibe los datasets una sola vez (initializer) y después sólo
+# se le envían tareas (vendedor, tipo). Los PDF se devuelven a medida que
+# terminan para poder escribir el ZIP y la barra de progreso sin esperar al lote.
+_datos_trabajador = {}
+
+# Arrancar un proceso (importar pandas y fpdf) cuesta más que decenas de PDF;
+# por debajo de este número de documentos se generan en el mismo proceso
+MINIMO_TAREAS_POOL = 150
+
+
+def _inicializar_trabajador(df_eval, df_cump, df_info):
+    _datos_trabajador.update(
+        df_eval=df_eval,
+        df_cump=df_cump,
+        df_info=df_info,
+        dimension=construir_dimension_vendedores(df_eval, df_info, None, df_cump),
+    )
+
+
+def _generar_tarea(vendedor, tipo):
+    datos = _datos_trabajador
+    try:
+        pdf_bytes = generar_pdf_perfil(
+            vendedor, datos["df_eval"], None, datos["df_cump"], datos["df_info"], tipo, datos["dimension"]
+        )
+        return vendedor, tipo, pdf_bytes, None
+    except Exception as e:
+        logger.warning("PDF %s de %s no generado: %s", tipo, vendedor, e)
+        return vendedor, tipo, None, str(e)
+
+
+def generar_lote_pdf(vendedores, tipos, df_eval, df_cump=None, df_info=None, max_procesos=None,
+                     artefactos=None, version=None, variante=""):
+    # Genera (vendedor, tipo, bytes | None, error | None) en orden de finalización.
+    # Con un almacén de artefactos, los PDF ya generados para esta versión de
+    # datos se entregan primero y sólo se calculan (y guardan) los faltantes.
+    tareas = [(vendedor, tipo) for vendedor in vendedores for tipo in tipos]
+    if artefactos is not None:
+        pendientes = []
+        for vendedor, tipo in tareas:
+            contenido = artefactos.obtener(vendedor, tipo, version, variante)
+            if contenido is None:
+                pendientes.append((vendedor, tipo))
+            else:
+                yield vendedor, tipo, contenido, None
+        tareas = pendientes
+        for vendedor, tipo, contenido, error in _generar_tareas(tareas, df_eval, df_cump, df_info, max_procesos):
+            if contenido is not None:
+                artefactos.guardar(vendedor, tipo, version, contenido, variante)
+            yield vendedor, tipo, contenido, error
+    else:
+        yield from _generar_tareas(tareas, df_eval, df_cump, df_info, max_procesos)
+
+
+def _generar_tareas(tareas, df_eval, df_cump, df_info, max_procesos):
+    if not tareas:
+        return
+    max_procesos = max_procesos or os.cpu_count() or 1
+
+    if max_procesos == 1 or len(tareas) < MINIMO_TAREAS_POOL:
+        _inicializar_trabajador(df_eval, df_cump, df_info)
+        try:
+            for vendedor, tipo in tareas:
+                yield _generar_tarea(vendedor, tipo)
+        finally:
+            _datos_trabajador.clear()
+        return
+
+    # "spawn" evita heredar hilos del servidor Streamlit al hacer fork
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=min(max_procesos, len(tareas)),
+        mp_context=contexto,
+        initializer=_inicializar_trabajador,
+        initargs=(df_eval, df_cump, df_info),
+    ) as pool:
+        futuros = [pool.submit(_generar_tarea, vendedor, tipo) for vendedor, tipo in tareas]
+        for futuro in as_completed(futuros):
+            yield futuro.result()
+
+
+def nombre_archivo_pdf(vendedor, tipo):
+    seguro = re.sub(r"[^\w\-]+", "_", str(vendedor).strip()).strip("_") or "vendedor"
+    return f"{TIPOS_PDF.get(tipo, tipo)}_{seguro}.pdf"
+
+
+def escribir_zip_lote(resultados, destino=None, al_avanzar=None):
+    # Escribe cada PDF en el ZIP en cuanto llega; devuelve (destino, errores)
+    destino = destino if destino is not None else io.BytesIO()
+    errores = []
+    with zipfile.ZipFile(destino, "w", compression=zipfile.ZIP_DEFLATED) as archivo_zip:
+        for completados, (vendedor, tipo, pdf_bytes, error) in enumerate(resultados, start=1):
+            if pdf_bytes:
+                archivo_zip.writestr(nombre_archivo_pdf(vendedor, tipo), pdf_bytes)
+            else:
+                errores.append((vendedor, tipo, error))
+            if al_avanzar is not None:
+                al_avanzar(completados, vendedor, tipo)
+        if errores:
+            resumen = "\n".join(f"{vendedor}\t{tipo}\t{error}" for vendedor, tipo, error in errores)
+            archivo_zip.writestr("errores.txt", resumen)
+    return destino, errores
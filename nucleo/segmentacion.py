@@ -0,0 +1,134 @@
+from dataclasses import dataclass, replace
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from nucleo.esquema import CATEGORIAS
+
+# =============================================
+# MOTOR DE REGLAS DE SEGMENTACIÓN
+# =============================================
+# Puntaje total y potencial son promedios ponderados de las categorías (las
+# categorías sin dato no cuentan, igual que mean(axis=1)). Cada segmento se
+# define por el nivel de desempeño y de potencial:
+#   "alto" -> valor >= umbral_alto
+#   "bajo" -> valor <  umbral_bajo
+#   None   -> cualquiera
+# Gana la primera regla que cumple; el resto cae en el segmento por defecto.
+# Las reglas son inmutables y hashables: sirven como clave de caché.
+ALTO = "alto"
+BAJO = "bajo"
+
+SEGMENTO_ESTRELLA = "🟢 Alto Desempeño & Alto Potencial"
+SEGMENTO_MANTENEDOR = "🟡 Buen Desempeño pero Bajo Potencial"
+SEGMENTO_POTENCIAL = "🟠 Alto Potencial pero Bajo Desempeño"
+SEGMENTO_RIESGO = "🔴 Bajo Desempeño & Bajo Potencial"
+SEGMENTO_MIXTO = "🧩 Inconsistente / Perfil Mixto"
+
+CATEGORIAS_POTENCIAL = ("Autonomía", "Habilidades Blandas", "Herramientas")
+
+
+@dataclass(frozen=True)
+class ReglaSegmento:
+    nombre: str
+    desempeno: Optional[str] = None
+    potencial: Optional[str] = None
+    descripcion: str = ""
+
+
+@dataclass(frozen=True)
+class ReglasSegmentacion:
+    pesos_desempeno: tuple                  # ((categoria, peso), ...)
+    pesos_potencial: tuple
+    umbral_alto: float = 8.0
+    umbral_bajo: float = 6.0
+    corte_matriz: float = 7.0               # líneas de la matriz de talento
+    segmentos: tuple = ()
+    segmento_por_defecto: ReglaSegmento = ReglaSegmento(SEGMENTO_MIXTO)
+
+    @property
+    def nombres_segmentos(self):
+        return [s.nombre for s in self.segmentos] + [self.segmento_por_defecto.nombre]
+
+    @property
+    def descripciones(self):
+        return {s.nombre: s.descripcion for s in self.segmentos + (self.segmento_por_defecto,)}
+
+    def con_cambios(self, **cambios):
+        return replace(self, **cambios)
+
+
+REGLAS_POR_DEFECTO = ReglasSegmentacion(
+    pesos_desempeno=tuple((categoria, 1.0) for categoria in CATEGORIAS),
+    pesos_potencial=tuple((categoria, 1.0) for categoria in CATEGORIAS_POTENCIAL),
+    segmentos=(
+        ReglaSegmento(SEGMENTO_ESTRELLA, ALTO, ALTO,
+                      "Vendedores con excelentes resultados actuales y alto potencial de crecimiento. Futuros líderes del equipo."),
+        ReglaSegmento(SEGMENTO_MANTENEDOR, ALTO, BAJO,
+                      "Vendedores consistentes en resultados pero con limitado crecimiento. Claves para operación actual."),
+        ReglaSegmento(SEGMENTO_POTENCIAL, BAJO, ALTO,
+                      "Vendedores con gran capacidad pero bajo desempeño actual. Oportunidad de desarrollo."),
+        ReglaSegmento(SEGMENTO_RIESGO, BAJO, BAJO,
+                      "Vendedores con bajo rendimiento y poca proyección. Requieren acciones inmediatas."),
+    ),
+    segmento_por_defecto=ReglaSegmento(SEGMENTO_MIXTO, descripcion="Vendedores con desempeño irregular. Necesitan evaluación detallada."),
+)
+
+
+def promedio_ponderado(df, pesos):
+    # Promedio por fila ignorando NaN: sum(w·x) / sum(w) sobre las categorías con dato
+    columnas = [categoria for categoria, peso in pesos if categoria in df.columns and peso > 0]
+    if not columnas:
+        return np.full(len(df), np.nan)
+    valores = df[columnas].to_numpy(dtype=float)
+    w = np.array([dict(pesos)[c] for c in columnas], dtype=float)
+    presentes = ~np.isnan(valores)
+    total_pesos = presentes @ w
+    with np.errstate(invalid="ignore", divide="ignore"):
+        promedio = np.where(total_pesos > 0, np.where(presentes, valores, 0.0) @ w / total_pesos, np.nan)
+    # Se calcula en float64 y se devuelve con la precisión de las categorías (float32 en modo compacto)
+    return promedio.astype(np.result_type(np.float32, *df[columnas].dtypes), copy=False)
+
+
+def _condicion(valores, nivel, reglas):
+    if nivel == ALTO:
+        return valores >= reglas.umbral_alto
+    if nivel == BAJO:
+        return valores < reglas.umbral_bajo
+    return np.ones(len(valores), dtype=bool)
+
+
+def segmentar(desempeno, potencial, reglas=REGLAS_POR_DEFECTO):
+    desempeno = np.asarray(desempeno, dtype=float)
+    potencial = np.asarray(potencial, dtype=float)
+    condiciones = [
+        _condicion(desempeno, regla.desempeno, reglas) & _condicion(potencial, regla.potencial, reglas)
+        for regla in reglas.segmentos
+    ]
+    codigos = np.select(condiciones, np.arange(len(reglas.segmentos)), default=len(reglas.segmentos))
+    return pd.Categorical.from_codes(codigos, categories=reglas.nombres_segmentos)
+
+
+def aplicar_reglas(df_eval, reglas=REGLAS_POR_DEFECTO):
+    # Devuelve una copia con puntaje_total, potencial y segmento recalculados
+    if df_eval.empty:
+        return df_eval
+    puntaje_total = promedio_ponderado(df_eval, reglas.pesos_desempeno)
+    potencial = promedio_ponderado(df_eval, reglas.pesos_potencial)
+    return df_eval.assign(
+        puntaje_total=puntaje_total,
+        potencial=potencial,
+        segmento=segmentar(puntaje_total, potencial, reglas),
+    )
+
+
+def nivel(valor, reglas=REGLAS_POR_DEFECTO):
+    # "Alto" / "Medio" / "Bajo" con los mismos umbrales de la segmentación
+    if pd.isna(valor):
+        return "N/D"
+    if valor >= reglas.umbral_alto:
+        return "Alto"
+    if valor >= reglas.umbral_bajo:
+        return "Medio"
+    return "Bajo"
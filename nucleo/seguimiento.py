@@ -0,0 +1,154 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from nucleo.vendedores import normalizar_clave, normalizar_claves
+
+# =============================================
+# SEGUIMIENTO PARTICIONADO POR RUTA
+# =============================================
+# El registro de visitas se parsea una vez (timestamp con formato explícito,
+# ver parsear_timestamps) y se indexa una vez por versión:
+#   - una permutación de filas ordenada por ruta normalizada y fecha
+#     descendente (sin fecha al final); cada ruta es un tramo contiguo
+#   - la cantidad de visitas por (ruta, mes), también en tramos por ruta
+# Cambiar de vendedor es buscar su tramo en un diccionario y tomar esas filas,
+# sin recorrer el seguimiento, volver a parsear fechas ni ordenar.
+FORMATO_TIMESTAMP = "%d/%m/%Y %H:%M:%S"     # marca temporal de Google Forms
+FORMATOS_ALTERNATIVOS = ("%d/%m/%Y %H:%M", "%d/%m/%Y", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d")
+_SIN_FECHA = np.iinfo(np.int64).min
+
+
+def _strptime(serie, formato):
+    # pyarrow (C++) es ~10x más rápido que pd.to_datetime con formato
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+    except ImportError:
+        return pd.to_datetime(serie, format=formato, errors="coerce")
+    textos = pa.array(serie.to_numpy(dtype=object, na_value=None), type=pa.string())
+    fechas = pc.strptime(textos, format=formato, unit="us", error_is_null=True)
+    return pd.Series(fechas.to_numpy(zero_copy_only=False), index=serie.index, name=serie.name)
+
+
+def parsear_timestamps(serie, formato=FORMATO_TIMESTAMP, alternativos=FORMATOS_ALTERNATIVOS):
+    # Formato explícito; sólo lo que no coincide se intenta con los alternativos
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
+    serie = serie.astype("string")
+    fechas = _strptime(serie, formato)
+    for alternativo in alternativos:
+        pendientes = fechas.isna() & serie.notna()
+        if not pendientes.any():
+            break
+        fechas[pendientes] = _strptime(serie[pendientes], alternativo)
+    return fechas
+
+
+def indices_periodo(fechas, periodo="M"):
+    # datetime64 sin NaT -> número de mes, o de semana (de lunes a domingo)
+    if periodo == "M":
+        return fechas.astype("datetime64[M]").astype(np.int64)
+    return (fechas.astype("datetime64[D]").astype(np.int64) + 3) // 7     # 1970-01-01 fue jueves
+
+
+def inicio_periodo(indices, periodo="M"):
+    indices = np.asarray(indices, dtype=np.int64)
+    if periodo == "M":
+        return indices.astype("datetime64[M]").astype("datetime64[ns]")
+    return (indices * 7 - 3).astype("datetime64[D]").astype("datetime64[ns]")
+
+
+def contar_por_periodo(codigos, fechas, periodo="M"):
+    # Visitas por (código, periodo) con un solo np.unique sobre la clave
+    # combinada; fechas sin NaT. Devuelve códigos, índices de periodo y
+    # conteos, ordenados por código y periodo.
+    if not len(fechas):
+        vacio = np.empty(0, dtype=np.int64)
+        return vacio, vacio.copy(), vacio.copy()
+    periodos = indices_periodo(fechas, periodo)
+    base = periodos.min()
+    ancho = int(periodos.max() - base) + 1
+    unicas, conteos = np.unique(np.asarray(codigos, dtype=np.int64) * ancho + (periodos - base), return_counts=True)
+    return unicas // ancho, unicas % ancho + base, conteos
+
+
+@dataclass
+class VisitasRuta:
+    visitas: pd.DataFrame   # visitas de la ruta, la más reciente primero
+    por_mes: pd.Series      # inicio de mes -> visitas, en orden cronológico
+
+    @property
+    def vacia(self):
+        return self.visitas.empty
+
+    @property
+    def primera(self):
+        return self.visitas["timestamp"].min() if "timestamp" in self.visitas.columns else pd.NaT
+
+    @property
+    def ultima(self):
+        return self.visitas["timestamp"].max() if "timestamp" in self.visitas.columns else pd.NaT
+
+
+@dataclass
+class SeguimientoPorRuta:
+    df_seg: pd.DataFrame    # seguimiento original, sin copiar
+    orden: np.ndarray       # posiciones de fila por ruta y fecha descendente
+    rangos: dict            # clave -> (inicio, fin) en orden
+    meses: np.ndarray       # inicio (datetime64[ns]) de cada (ruta, mes)
+    conteos: np.ndarray     # visitas de cada (ruta, mes)
+    rangos_meses: dict      # clave -> (inicio, fin) en meses/conteos
+
+    def de(self, vendedor):
+        clave = normalizar_clave(vendedor)
+        inicio, fin = self.rangos.get(clave, (0, 0))
+        visitas = self.df_seg.iloc[self.orden[inicio:fin]]
+        inicio, fin = self.rangos_meses.get(clave, (0, 0))
+        por_mes = pd.Series(
+            self.conteos[inicio:fin],
+            index=pd.DatetimeIndex(self.meses[inicio:fin], name="mes"),
+            name="visitas",
+        )
+        return VisitasRuta(visitas, por_mes)
+
+
+def _rangos(codigos_ordenados, claves):
+    # Tramos contiguos de cada código en un arreglo ya ordenado por código
+    cuentas = np.bincount(codigos_ordenados, minlength=len(claves))
+    fines = np.cumsum(cuentas)
+    return {
+        clave: (int(fin - cuenta), int(fin))
+        for clave, cuenta, fin in zip(claves, cuentas, fines)
+        if cuenta and clave != ""
+    }
+
+
+def construir_seguimiento_por_ruta(df_seg, col_ruta="ruta"):
+    if df_seg is None or df_seg.empty or col_ruta not in df_seg.columns:
+        vacio = pd.DataFrame() if df_seg is None else df_seg.iloc[0:0]
+        return SeguimientoPorRuta(vacio, np.empty(0, dtype=np.intp), {},
+                                  np.empty(0, dtype="datetime64[ns]"), np.empty(0, dtype=np.int64), {})
+
+    codigos, claves = pd.factorize(normalizar_claves(df_seg[col_ruta]))
+    if "timestamp" in df_seg.columns:
+        fechas = df_seg["timestamp"].to_numpy(dtype="datetime64[ns]")
+    else:
+        fechas = np.full(len(df_seg), np.datetime64("NaT"), dtype="datetime64[ns]")
+    con_fecha = ~np.isnat(fechas)
+    marcas = np.where(con_fecha, fechas.view(np.int64), _SIN_FECHA)
+
+    # ~marca invierte el orden sin desbordar: fecha descendente, sin fecha al final
+    orden = np.lexsort((~marcas, codigos)).astype(np.intp, copy=False)
+
+    codigos_mes, meses, conteos = contar_por_periodo(codigos[con_fecha], fechas[con_fecha], "M")
+
+    return SeguimientoPorRuta(
+        df_seg=df_seg,
+        orden=orden,
+        rangos=_rangos(codigos[orden], claves),
+        meses=inicio_periodo(meses, "M"),
+        conteos=conteos,
+        rangos_meses=_rangos(codigos_mes, claves),
+    )
@@ -0,0 +1,154 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from nucleo.vendedores import normalizar_clave, normalizar_claves
+
+# =============================================
+# TENDENCIAS DE CUMPLIMIENTO (TODO EL EQUIPO)
+# =============================================
+# Para cada (vendedor, indicador), en una pasada agrupada con np.bincount
+# sobre el modelo de cumplimiento y una vez por versión:
+#   - pendiente de mínimos cuadrados del cumplimiento (puntos por mes)
+#   - media reciente: promedio de los últimos VENTANA_RECIENTE registros (un
+#     solo valor por grupo, no una serie móvil)
+#   - volatilidad: desvío estándar alrededor de la recta de tendencia
+# Por vendedor se resume con la pendiente media de sus indicadores; de ahí
+# salen la métrica de tendencia de HHRR y la clasificación del equipo.
+VENTANA_RECIENTE = 3
+MIN_PUNTOS = 2              # con menos registros no hay pendiente
+UMBRAL_ESTABLE = 0.5        # |pendiente| < 0.5 pp/mes se considera estable
+MEJORANDO, EMPEORANDO, ESTABLE, SIN_DATOS = "↑ Mejorando", "↓ Empeorando", "→ Estable", "N/D"
+
+
+def etiqueta_tendencia(pendiente, umbral=UMBRAL_ESTABLE):
+    pendiente = np.asarray(pendiente, dtype=float)
+    return np.select(
+        [np.isnan(pendiente), pendiente >= umbral, pendiente <= -umbral],
+        [SIN_DATOS, MEJORANDO, EMPEORANDO],
+        default=ESTABLE,
+    )
+
+
+def estadisticas_agrupadas(grupos, x, y, cantidad, ventana=VENTANA_RECIENTE):
+    # grupos: código por fila (0..cantidad-1); x, y sin NaN.
+    # Devuelve puntos, pendiente, media reciente y volatilidad por grupo.
+    def suma(pesos=None):
+        return np.bincount(grupos, weights=pesos, minlength=cantidad)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        puntos = suma()
+        x_media, y_media = suma(x) / puntos, suma(y) / puntos
+        dx, dy = x - x_media[grupos], y - y_media[grupos]
+        sxx, sxy, syy = suma(dx * dx), suma(dx * dy), suma(dy * dy)
+        pendiente = np.where((puntos >= MIN_PUNTOS) & (sxx > 0), sxy / sxx, np.nan)
+        residuo = np.maximum(syy - np.nan_to_num(pendiente) * sxy, 0.0)
+        volatilidad = np.where(puntos > MIN_PUNTOS, np.sqrt(residuo / (puntos - 2)), np.nan)
+
+        # Últimos `ventana` registros de cada grupo: orden por (grupo, x) y
+        # posición contada desde el final del tramo del grupo
+        orden = np.lexsort((x, grupos))
+        fin = np.cumsum(puntos).astype(np.int64)
+        desde_final = fin[grupos[orden]] - np.arange(len(orden)) - 1
+        recientes = orden[desde_final < ventana]
+        media_reciente = (
+            np.bincount(grupos[recientes], weights=y[recientes], minlength=cantidad)
+            / np.bincount(grupos[recientes], minlength=cantidad)
+        )
+    return puntos.astype(np.int64), pendiente, media_reciente, volatilidad
+
+
+@dataclass
+class TendenciasCumplimiento:
+    detalle: pd.DataFrame       # una fila por (clave, indicador)
+    por_vendedor: pd.DataFrame  # una fila por clave (índice), resumen de sus indicadores
+
+    @property
+    def indicadores(self):
+        return sorted(self.detalle["indicador"].unique())
+
+    def de_vendedor(self, vendedor):
+        # Fila de resumen del vendedor, o None sin registros de cumplimiento
+        clave = normalizar_clave(vendedor)
+        if clave not in self.por_vendedor.index:
+            return None
+        return self.por_vendedor.loc[clave]
+
+    def clasificacion(self, indicador=None, claves=None, cantidad=10):
+        # (mejorando, empeorando): los de mayor y menor pendiente
+        if indicador is None:
+            tabla = self.por_vendedor.reset_index()
+        else:
+            tabla = self.detalle[self.detalle["indicador"] == indicador]
+        if claves is not None:
+            tabla = tabla[tabla["clave"].isin(claves)]
+        tabla = tabla[tabla["pendiente"].notna()]
+        pendientes = tabla["pendiente"].to_numpy()
+        orden = np.argsort(-pendientes, kind="stable")
+        mejorando = tabla.iloc[orden[:cantidad]]
+        empeorando = tabla.iloc[orden[::-1][:cantidad]]
+        return (
+            mejorando[mejorando["pendiente"] > 0].reset_index(drop=True),
+            empeorando[empeorando["pendiente"] < 0].reset_index(drop=True),
+        )
+
+
+def construir_tendencias(df_cump, dimension=None, ventana=VENTANA_RECIENTE):
+    columnas = ["clave", "indicador", "puntos", "pendiente", "media_reciente", "volatilidad", "tendencia"]
+    if df_cump is None or df_cump.empty or "cumplimiento" not in df_cump.columns:
+        vacio = pd.DataFrame(columns=columnas)
+        return TendenciasCumplimiento(vacio, vacio.drop(columns="indicador").set_index("clave"))
+
+    if dimension is not None and "cumplimiento" in dimension.posiciones:
+        codigos_vendedor, claves = dimension.codigos("cumplimiento", len(df_cump))
+    else:
+        codigos_vendedor, claves = pd.factorize(normalizar_claves(df_cump["vendedor"]))
+        claves = pd.Index(claves, dtype=object)
+    codigos_ind, indicadores = pd.factorize(df_cump["indicador"], sort=True)
+
+    # Meses como eje x (el modelo trae la fecha del día 1 de cada mes)
+    fechas = df_cump["fecha"].to_numpy(dtype="datetime64[ns]")
+    y = df_cump["cumplimiento"].to_numpy(dtype=float)
+    validas = (codigos_vendedor >= 0) & (codigos_ind >= 0) & ~np.isnat(fechas) & ~np.isnan(y)
+    x = fechas[validas].astype("datetime64[M]").astype(np.int64).astype(float)
+
+    # Un código por (vendedor, indicador) presente, sin crear la matriz completa
+    combinados, grupos = np.unique(
+        codigos_vendedor[validas].astype(np.int64) * len(indicadores) + codigos_ind[validas],
+        return_inverse=True,
+    )
+    puntos, pendiente, media_reciente, volatilidad = estadisticas_agrupadas(
+        grupos, x, y[validas], len(combinados), ventana
+    )
+    vendedor_grupo = combinados // len(indicadores)
+    detalle = pd.DataFrame({
+        "clave": claves[vendedor_grupo],
+        "indicador": np.asarray(indicadores, dtype=object)[combinados % len(indicadores)],
+        "puntos": puntos,
+        "pendiente": pendiente,
+        "media_reciente": media_reciente,
+        "volatilidad": volatilidad,
+        "tendencia": etiqueta_tendencia(pendiente),
+    })
+
+    # Resumen por vendedor: medias de sus indicadores (las pendientes sin dato no cuentan)
+    def media_por_vendedor(valores):
+        con_dato = ~np.isnan(valores)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return (
+                np.bincount(vendedor_grupo[con_dato], weights=valores[con_dato], minlength=len(claves))
+                / np.bincount(vendedor_grupo[con_dato], minlength=len(claves))
+            )
+
+    con_registros = np.bincount(vendedor_grupo, minlength=len(claves)) > 0
+    pendiente_vendedor = media_por_vendedor(pendiente)
+    por_vendedor = pd.DataFrame({
+        "clave": claves,
+        "puntos": np.bincount(vendedor_grupo, weights=puntos, minlength=len(claves)).astype(np.int64),
+        "pendiente": pendiente_vendedor,
+        "media_reciente": media_por_vendedor(media_reciente),
+        "volatilidad": media_por_vendedor(volatilidad),
+        "tendencia": etiqueta_tendencia(pendiente_vendedor),
+    })[con_registros].set_index("clave")
+    return TendenciasCumplimiento(detalle, por_vendedor)
@@ -0,0 +1,112 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# =============================================
+# DIMENSIÓN MAESTRA DE VENDEDORES
+# =============================================
+# Cada dataset identifica al vendedor con una columna distinta:
+#   evaluacion / informacion / seguimiento -> ruta
+#   cumplimiento                           -> vendedor (ruta o nombre)
+# La dimensión normaliza todas las claves y guarda, por dataset, las posiciones
+# de fila de cada vendedor: una búsqueda es un acceso a diccionario y un
+# iloc, en lugar de comparar toda la columna de texto en cada clic.
+DATASETS = ("evaluacion", "informacion", "seguimiento", "cumplimiento")
+_VACIO = np.empty(0, dtype=np.intp)
+
+
+def normalizar_clave(valor):
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+        return ""
+    return " ".join(str(valor).upper().split())
+
+
+def normalizar_claves(serie):
+    return (
+        serie.astype("string")
+        .str.upper()
+        .str.replace(r"\s+", " ", regex=True)
+        .str.strip()
+        .fillna("")
+    )
+
+
+def indexar_posiciones(claves):
+    # claves -> {clave: array de posiciones}, en una sola pasada ordenada
+    codigos, unicos = pd.factorize(claves, sort=False)
+    if not len(unicos):
+        return {}
+    orden = np.argsort(codigos, kind="stable")
+    cortes = np.cumsum(np.bincount(codigos, minlength=len(unicos)))[:-1]
+    return {clave: grupo for clave, grupo in zip(unicos, np.split(orden, cortes)) if clave != ""}
+
+
+@dataclass
+class DimensionVendedores:
+    maestro: pd.DataFrame   # una fila por clave normalizada
+    posiciones: dict        # dataset -> {clave: array de posiciones}
+
+    def filas(self, dataset, vendedor):
+        return self.posiciones.get(dataset, {}).get(normalizar_clave(vendedor), _VACIO)
+
+    def seleccionar(self, df, dataset, vendedor):
+        return df.iloc[self.filas(dataset, vendedor)]
+
+    def codigos(self, dataset, filas):
+        # Código de clave de cada fila del dataset (-1 sin clave) y las claves
+        posiciones = self.posiciones.get(dataset, {})
+        codigos = np.full(filas, -1, dtype=np.intp)
+        for i, grupo in enumerate(posiciones.values()):
+            codigos[grupo] = i
+        return codigos, pd.Index(list(posiciones), dtype=object)
+
+    def contiene(self, dataset, vendedor):
+        return normalizar_clave(vendedor) in self.posiciones.get(dataset, {})
+
+    def no_coincidentes(self):
+        # Vendedores que no aparecen en todos los datasets cargados
+        presentes = [f"en_{d}" for d in DATASETS if d in self.posiciones]
+        if not presentes:
+            return self.maestro.iloc[0:0]
+        return self.maestro[~self.maestro[presentes].all(axis=1)]
+
+
+def construir_dimension_vendedores(df_eval, df_info=None, df_seg=None, df_cump=None, col_ruta="ruta"):
+    claves = {}
+    if df_eval is not None and col_ruta in df_eval.columns:
+        claves["evaluacion"] = normalizar_claves(df_eval[col_ruta])
+    if df_info is not None and not df_info.empty and col_ruta in df_info.columns:
+        claves["informacion"] = normalizar_claves(df_info[col_ruta])
+    if df_seg is not None and not df_seg.empty and col_ruta in df_seg.columns:
+        claves["seguimiento"] = normalizar_claves(df_seg[col_ruta])
+
+    if df_cump is not None and not df_cump.empty and "vendedor" in df_cump.columns:
+        claves_cump = normalizar_claves(df_cump["vendedor"])
+        # En cumplimiento el vendedor puede venir por nombre: se traduce a ruta con informaciones
+        if "informacion" in claves and "nombre_vendedor" in df_info.columns:
+            alias = pd.Series(
+                claves["informacion"].to_numpy(),
+                index=normalizar_claves(df_info["nombre_vendedor"]).to_numpy(),
+            )
+            alias = alias[~alias.index.duplicated()]
+            conocidas = set(claves.get("evaluacion", [])) | set(claves["informacion"])
+            por_nombre = ~claves_cump.isin(conocidas) & claves_cump.isin(alias.index)
+            claves_cump = claves_cump.mask(por_nombre, claves_cump[por_nombre].map(alias))
+        claves["cumplimiento"] = claves_cump
+
+    posiciones = {dataset: indexar_posiciones(serie.to_numpy()) for dataset, serie in claves.items()}
+
+    todas = pd.Index(sorted(set().union(*[p.keys() for p in posiciones.values()])), name="clave")
+    maestro = pd.DataFrame(index=todas)
+    for dataset in DATASETS:
+        if dataset in posiciones:
+            maestro[f"en_{dataset}"] = todas.isin(list(posiciones[dataset].keys()))
+    if "evaluacion" in posiciones and "supervisor" in df_eval.columns:
+        supervisores = pd.Series(df_eval["supervisor"].to_numpy(), index=claves["evaluacion"].to_numpy())
+        maestro["supervisor"] = supervisores[~supervisores.index.duplicated()].reindex(todas).to_numpy()
+    if "informacion" in posiciones and "nombre_vendedor" in df_info.columns:
+        nombres = pd.Series(df_info["nombre_vendedor"].to_numpy(), index=claves["informacion"].to_numpy())
+        maestro["nombre_vendedor"] = nombres[~nombres.index.duplicated()].reindex(todas).to_numpy()
+
+    return DimensionVendedores(maestro.reset_index(), posiciones)
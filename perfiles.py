@@ -1,12 +1,35 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import numpy as np
 from datetime import datetime
-from fpdf import FPDF
 import base64
-import unicodedata
+import os
+import time
+
+from nucleo import carga
+from nucleo.artefactos import AlmacenArtefactos, version_artefactos
+from nucleo.carga import normalizar_informacion
+from nucleo.cobertura import DIAS_BRECHA, PERIODOS, construir_cobertura
+from nucleo.compacto import MODO_COMPACTO, compactar, congelar, reporte_memoria
+from nucleo.correlaciones import construir_correlaciones
+from nucleo.cubo import construir_cubo_cumplimiento
+from nucleo.esquema import CATEGORIAS, SECCIONES_COMPETENCIAS, resolver_columnas
+from nucleo.fuentes import ACTUALIZADO, FALLIDO, OBSOLETO, SIN_CAMBIOS, AlmacenInstantaneas
+from nucleo.historial import AlmacenCiclos
+from nucleo.mapas import centro_mapa, construir_ubicaciones, marcadores_mapa
+from nucleo.perfilado import ACTIVO as PERFILADO_ACTIVO, Perfilador
+from nucleo.procesamiento import (
+    COL_SUPERVISOR, COL_VENDEDOR, columnas_faltantes, procesar_datos, resumen_equipo
+)
+from nucleo.ranking import construir_ranking
+from nucleo.reportes import TIPOS_PDF, escribir_zip_lote, generar_lote_pdf, generar_pdf_perfil
+from nucleo.seguimiento import construir_seguimiento_por_ruta
+from nucleo.segmentacion import (
+    CATEGORIAS_POTENCIAL, REGLAS_POR_DEFECTO, SEGMENTO_ESTRELLA, SEGMENTO_MANTENEDOR,
+    SEGMENTO_MIXTO, SEGMENTO_POTENCIAL, SEGMENTO_RIESGO, aplicar_reglas, nivel
+)
+from nucleo.tendencias import MEJORANDO, SIN_DATOS, VENTANA_RECIENTE, construir_tendencias
+from nucleo.vendedores import construir_dimension_vendedores, normalizar_claves
 
 # =============================================
 # 3. EL RESTO DE TU DASHBOARD (CONTENIDO PROTEGIDO)
@@ -21,427 +44,342 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Latencia de cada rerun (visible en la barra lateral con PERFILES_DEBUG=1)
+MODO_DEPURACION = os.environ.get("PERFILES_DEBUG", "").lower() in ("1", "true", "si", "sí")
+inicio_rerun = time.perf_counter()
+
+# Tramos por sección (datos, etapas, vista, pestañas, gráficos, tablas, PDF).
+# Con PERFILES_DEBUG o PERFILES_PERFILADO; si no, no miden nada.
+perfilador = Perfilador(activo=MODO_DEPURACION or PERFILADO_ACTIVO)
+perfilador.iniciar("datos")
+
 # =============================================
 # CARGA DE DATOS (CON MANEJO DE ERRORES)
 # =============================================
-@st.cache_data(ttl=3600)
-def cargar_datos():
+@st.cache_resource
+def obtener_almacen():
+    return AlmacenInstantaneas()
+
+# Los parseos se cachean por hash de contenido: sólo se repiten si la fuente cambió.
+# Datasets compartidos entre sesiones (cache_resource, sin copia por sesión ni
+# pickle): se congelan y cada vista trabaja sobre selecciones de ellos.
+# La evaluación se procesa (categorías) y la información se normaliza dentro
+# del mismo parseo: las cachés retienen sólo la versión procesada y compactada,
+# nunca la copia cruda al lado (no comparten arreglos con ella).
+def compactar_fuente(df):
+    return compactar(df) if MODO_COMPACTO else df
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def parsear_evaluacion(sha):
+    df_eval = carga.parsear_evaluacion(obtener_almacen().leer(sha))
+    return congelar(procesar_datos(df_eval, compacto=MODO_COMPACTO))
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def parsear_seguimiento(sha):
+    return congelar(compactar_fuente(carga.parsear_seguimiento(obtener_almacen().leer(sha))))
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def parsear_cumplimiento(sha):
+    df_cump, df_info = carga.parsear_cumplimiento(obtener_almacen().leer(sha))
     try:
-        # URLs de datos
-        URL_EVAL = "https://docs.google.com/spreadsheets/d/1hcPBE_gkMmgn4JBjTrqbG3I_vzaFjRraX4sA5e4qKTE/export?format=csv"
-        URL_SEG = "https://docs.google.com/spreadsheets/d/1p_vMUMIlprH-4ArY0kl_75XsUqBgIqV-CMEWs-6-zjw/export?format=csv"
-        URL_CUMPLIMIENTO = "https://docs.google.com/spreadsheets/d/1miD-cft9CKEjfAv5vHj7P1RB0_bvL9z2/export?format=xlsx"
-
-        # Cargar datos de evaluación y seguimiento
-        df_eval = pd.read_csv(URL_EVAL)
-        df_seg = pd.read_csv(URL_SEG)
-        
-        # Normalizar nombres de columnas
-        def normalizar_columna(col):
-            return ''.join(
-                c for c in unicodedata.normalize('NFD', col)
-                if unicodedata.category(c) != 'Mn'
-            ).lower().strip().replace(' ', '_')
-
-        df_eval.columns = [normalizar_columna(c) for c in df_eval.columns]
-        df_seg.columns = df_seg.columns.str.strip().str.lower().str.replace(' ', '_')
-
-        try:
-            # Cargar datos de cumplimiento
-            df_cump = pd.read_excel(URL_CUMPLIMIENTO, sheet_name='CUMPLIMIENTO')
-            df_cump.columns = df_cump.columns.str.strip().str.lower().str.replace(' ', '_')
-            
-            # Procesar cumplimiento
-            df_cump['fecha'] = pd.to_datetime(df_cump.apply(lambda x: f"{x['year']}-{x['mes']}-01", axis=1))
-            df_cump['cumplimiento_num'] = pd.to_numeric(df_cump['cumplimiento'], errors='coerce')/100
-            
-            # Cargar información de vendedores
-            df_info = pd.read_excel(URL_CUMPLIMIENTO, sheet_name='informaciones')
-            df_info.columns = df_info.columns.str.strip().str.lower().str.replace(' ', '_')
-            
-            # Procesar fechas
-            df_info['fecha_ingreso'] = pd.to_datetime(df_info['fecha_ingreso'])
-            df_info['fecha_nacimiento'] = pd.to_datetime(df_info['fecha_nacimiento'])
-            
-            return df_eval, df_seg, df_cump, df_info
+        df_info = normalizar_informacion(df_info)
+    except Exception as e:
+        st.warning(f"Error al procesar información de vendedores: {str(e)}")
+        df_info = pd.DataFrame()
+    return congelar(compactar_fuente(df_cump)), congelar(compactar_fuente(df_info))
 
-        except Exception as e:
-            st.warning(f"Error al cargar archivo de cumplimientos: {str(e)}")
-            return df_eval, df_seg, pd.DataFrame(), pd.DataFrame()
+@st.cache_resource(ttl=3600, show_spinner="Cargando datos...")
+def cargar_datos():
+    # Descarga concurrente; cada fuente informa su propio estado. Los parsers
+    # ya compactan, así que la carga no vuelve a copiar los datasets.
+    datos = carga.cargar_datos(almacen=obtener_almacen(), parsers={
+        'evaluacion': parsear_evaluacion,
+        'seguimiento': parsear_seguimiento,
+        'cumplimiento': parsear_cumplimiento,
+    }, compacto=False)
+    return (
+        congelar(datos.df_eval), congelar(datos.df_seg), congelar(datos.df_cump), congelar(datos.df_info),
+        datos.estados
+    )
 
-    except Exception as e:
-        st.error(f"Error crítico al cargar datos: {str(e)}")
-        st.stop()
+# Si alguna fuente quedó degradada se reintenta cada 5 minutos sin esperar al TTL
+REINTENTO_FUENTES_DEGRADADAS = 300
+
+with perfilador.tramo("etapa", "cargar_datos"):
+    df_eval_categorias, df_seg_orig, df_cump_orig, df_info, estados_fuentes = cargar_datos()
+if (
+    any(r.estado in (OBSOLETO, FALLIDO) for r in estados_fuentes.values())
+    and time.time() - min(r.momento for r in estados_fuentes.values()) > REINTENTO_FUENTES_DEGRADADAS
+):
+    cargar_datos.clear()
+    df_eval_categorias, df_seg_orig, df_cump_orig, df_info, estados_fuentes = cargar_datos()
+
+# Versión de los datos: hash de contenido de cada fuente
+versiones_datos = tuple(resultado.sha for resultado in estados_fuentes.values())
+version_evaluacion = estados_fuentes['evaluacion'].sha
+version_cumplimiento = estados_fuentes['cumplimiento'].sha
+version_seguimiento = estados_fuentes['seguimiento'].sha
+
+if estados_fuentes['evaluacion'].estado == FALLIDO:
+    st.error(f"Error crítico al cargar datos: {estados_fuentes['evaluacion'].error}")
+    st.stop()
 
-df_eval_orig, df_seg_orig, df_cump_orig, df_info_orig = cargar_datos()
+# Estado de cada fuente: el dashboard se muestra con lo que haya llegado
+ETIQUETAS_FUENTES = {
+    'evaluacion': "Evaluación",
+    'seguimiento': "Seguimiento",
+    'cumplimiento': "Cumplimiento e información de vendedores"
+}
+ICONOS_ESTADO = {ACTUALIZADO: "✅", SIN_CAMBIOS: "✅", OBSOLETO: "🕒", FALLIDO: "❌"}
+
+for nombre, resultado in estados_fuentes.items():
+    etiqueta = ETIQUETAS_FUENTES.get(nombre, nombre)
+    if resultado.estado == OBSOLETO:
+        st.warning(f"{etiqueta}: no se pudo actualizar, se muestra la última copia disponible ({resultado.error})")
+    elif resultado.estado == FALLIDO:
+        st.warning(f"{etiqueta}: no disponible ({resultado.error})")
+
+with st.sidebar.expander("📡 Estado de fuentes"):
+    for nombre, resultado in estados_fuentes.items():
+        st.markdown(
+            f"{ICONOS_ESTADO.get(resultado.estado, '')} **{ETIQUETAS_FUENTES.get(nombre, nombre)}**: "
+            f"{resultado.estado.replace('_', ' ')} · {resultado.segundos:.1f} s · "
+            f"{resultado.intentos} intento(s)"
+        )
 
 # =============================================
 # DEFINICIONES Y VALIDACIONES
 # =============================================
-vendedor_col = "ruta"
-supervisor_col = "supervisor"
+vendedor_col = COL_VENDEDOR
+supervisor_col = COL_SUPERVISOR
 
 # Validar columnas esenciales
-if vendedor_col not in df_eval_orig.columns:
-    st.error(f"Columna '{vendedor_col}' no encontrada. Columnas disponibles: {df_eval_orig.columns.tolist()}")
-    st.stop()
+# Definición de categorías (derivada del registro de preguntas del formulario)
+categorias = CATEGORIAS
+
+# Columnas del formulario: las de la evaluación procesada menos las categorías
+columnas_formulario = [col for col in df_eval_categorias.columns if col not in categorias]
 
-if supervisor_col not in df_eval_orig.columns:
-    st.error(f"Columna '{supervisor_col}' no encontrada. Columnas disponibles: {df_eval_orig.columns.tolist()}")
+for columna_faltante in columnas_faltantes(df_eval_categorias):
+    st.error(f"Columna '{columna_faltante}' no encontrada. Columnas disponibles: {columnas_formulario}")
     st.stop()
 
-# Definición de categorías
-categorias = {
-    "Desempeño Comercial": [
-        "efectividad_real_vs_meta",
-        "cumple_con_cuotas_de_venta_mensual",
-        "cierra_ventas_sin_depender_de_promociones",
-        "promueve_productos_nuevos/ofertas"
-    ],
-    "Ejecución en Ruta": [
-        "visita_todos_sus_clientes_por_día?",
-        "puntualidad_y_asistencia",
-        "planea_su_ruta_diaria",
-        "eficiencia_en_tiempo_por_punto"
-    ],
-    "Habilidades Blandas": [
-        "respeto,_trato_cordial_y_empatía",
-        "gana_confianza_del_cliente",
-        "soluciona_conflictos_con_criterio",
-        "clientes_solicitan_ser_visitados_por_él"
-    ],
-    "Autonomía": [
-        "soluciona_imprevistos_sin_llamar_al_supervisor",
-        "toma_la_iniciativa_sin_necesidad_de_ser_presionado",
-        "se_adapta_con_facilidad_a_cambios"
-    ],
-    "Herramientas": [
-        "usa_adecuadamente_las_aplicaciones",
-        "reportes_y_formularios_sin_errores",
-        "mantiene_la_motocicleta_en_condiciones"
-    ]
-}
+# Plan de columnas del formulario: se resuelve una vez por firma de encabezados
+plan_columnas = resolver_columnas(tuple(columnas_formulario))
 
-descripcion_segmentos = {
-    "🟢 Alto Desempeño & Alto Potencial": "Vendedores con excelentes resultados actuales y alto potencial de crecimiento. Futuros líderes del equipo.",
-    "🟡 Buen Desempeño pero Bajo Potencial": "Vendedores consistentes en resultados pero con limitado crecimiento. Claves para operación actual.",
-    "🟠 Alto Potencial pero Bajo Desempeño": "Vendedores con gran capacidad pero bajo desempeño actual. Oportunidad de desarrollo.",
-    "🔴 Bajo Desempeño & Bajo Potencial": "Vendedores con bajo rendimiento y poca proyección. Requieren acciones inmediatas.",
-    "🧩 Inconsistente / Perfil Mixto": "Vendedores con desempeño irregular. Necesitan evaluación detallada."
-}
+with st.sidebar.expander("🧾 Validación del formulario"):
+    st.caption(f"{len(plan_columnas.columna_por_clave)} preguntas reconocidas")
+    if plan_columnas.valido and not plan_columnas.sin_registrar:
+        st.markdown("✅ Todas las preguntas del registro tienen columna")
+    else:
+        st.dataframe(plan_columnas.reporte(), hide_index=True, use_container_width=True)
 
 # =============================================
-# PROCESAMIENTO DE DATOS
+# REGLAS DE SEGMENTACIÓN (WHAT-IF POR SESIÓN)
 # =============================================
-def procesar_datos(df_eval):
-    try:
-        # Evitar columnas cualitativas al convertir
-        columnas_cualitativas = [
-            "fortalezas_mas_destacadas",
-            "oportunidades_de_mejora",
-            "recomendaciones_especificas_de_formacion"
-        ]
-
-        for col in df_eval.columns:
-            if col not in [vendedor_col, supervisor_col] + columnas_cualitativas:
-                df_eval[col] = pd.to_numeric(df_eval[col], errors='coerce')
-
-        # Calcular puntajes por categoría
-        for categoria, columnas in categorias.items():
-            cols_categoria = [col for col in df_eval.columns if any(term in col for term in columnas)]
-            cols_categoria = [col for col in cols_categoria if pd.api.types.is_numeric_dtype(df_eval[col])]
-            
-            df_eval[categoria] = df_eval[cols_categoria].mean(axis=1) if cols_categoria else np.nan
-
-        # Calcular puntaje total y potencial
-        df_eval['puntaje_total'] = df_eval[list(categorias.keys())].mean(axis=1)
-        df_eval['potencial'] = df_eval[['Autonomía', 'Habilidades Blandas', 'Herramientas']].mean(axis=1)
-
-        # Segmentación del equipo
-        condiciones = [
-            (df_eval['puntaje_total'] >= 8) & (df_eval['potencial'] >= 8),
-            (df_eval['puntaje_total'] >= 8) & (df_eval['potencial'] < 6),
-            (df_eval['puntaje_total'] < 6) & (df_eval['potencial'] >= 8),
-            (df_eval['puntaje_total'] < 6) & (df_eval['potencial'] < 6)
-        ]
-        opciones = [
-            "🟢 Alto Desempeño & Alto Potencial",
-            "🟡 Buen Desempeño pero Bajo Potencial",
-            "🟠 Alto Potencial pero Bajo Desempeño",
-            "🔴 Bajo Desempeño & Bajo Potencial"
-        ]
-        df_eval['segmento'] = np.select(condiciones, opciones, default="🧩 Inconsistente / Perfil Mixto")
-
-        return df_eval
-
-    except Exception as e:
-        st.error(f"Error al procesar datos: {str(e)}")
-        return pd.DataFrame()
+def restablecer_reglas():
+    for clave in [k for k in st.session_state if str(k).startswith('regla_')]:
+        del st.session_state[clave]
+
+with st.sidebar.expander("🎚️ Reglas de segmentación"):
+    umbral_alto = st.slider("Umbral alto", 5.0, 10.0, REGLAS_POR_DEFECTO.umbral_alto, 0.1, key='regla_umbral_alto')
+    umbral_bajo = st.slider("Umbral bajo", 0.0, umbral_alto, min(REGLAS_POR_DEFECTO.umbral_bajo, umbral_alto), 0.1,
+                            key='regla_umbral_bajo')
+    corte_matriz = st.slider("Corte de la matriz de talento", 0.0, 10.0, REGLAS_POR_DEFECTO.corte_matriz, 0.1,
+                             key='regla_corte_matriz')
+    st.caption("Peso de cada categoría en el puntaje total")
+    pesos_desempeno = tuple(
+        (categoria, st.slider(categoria, 0.0, 3.0, peso, 0.25, key=f'regla_peso_{categoria}'))
+        for categoria, peso in REGLAS_POR_DEFECTO.pesos_desempeno
+    )
+    categorias_potencial = st.multiselect("Categorías del potencial", list(categorias.keys()),
+                                          default=list(CATEGORIAS_POTENCIAL), key='regla_potencial')
+    st.button("Restablecer", on_click=restablecer_reglas)
+
+reglas_segmentacion = REGLAS_POR_DEFECTO.con_cambios(
+    umbral_alto=umbral_alto,
+    umbral_bajo=umbral_bajo,
+    corte_matriz=corte_matriz,
+    pesos_desempeno=pesos_desempeno,
+    pesos_potencial=tuple((categoria, 1.0) for categoria in categorias_potencial),
+)
+descripcion_segmentos = reglas_segmentacion.descripciones
 
-df_eval = procesar_datos(df_eval_orig.copy())
+# =============================================
+# PIPELINE DE DATOS DERIVADOS (CACHEADO POR VERSIÓN)
+# =============================================
+# Cada etapa se calcula una vez por versión de sus fuentes y se comparte entre
+# sesiones: un rerun por cambio de widget sólo paga el renderizado. Los
+# DataFrames resultantes se congelan (sólo lectura); para modificarlos se parte
+# de una copia superficial, que con copy-on-write no duplica datos.
+# Las reglas cambian con los sliders: sólo se recalculan puntajes y segmentos
+@perfilador.medido
+@st.cache_resource(max_entries=16, show_spinner=False)
+def etapa_segmentacion(version, reglas, _df_categorias):
+    return congelar(aplicar_reglas(_df_categorias, reglas))
+
+# Dimensión maestra de vendedores: claves normalizadas e índice de filas por dataset
+@perfilador.medido
+@st.cache_resource(max_entries=2, show_spinner=False)
+def obtener_dimension_vendedores(version, _df_eval, _df_info, _df_seg, _df_cump):
+    return construir_dimension_vendedores(_df_eval, _df_info, _df_seg, _df_cump)
+
+# Visitas particionadas por ruta: ordenadas por fecha y con el conteo mensual
+@perfilador.medido
+@st.cache_resource(max_entries=2, show_spinner=False)
+def etapa_seguimiento(version, _df_seg):
+    return construir_seguimiento_por_ruta(_df_seg)
+
+# Cobertura de visitas de todo el equipo: matriz vendedor x mes/semana y última visita
+@perfilador.medido
+@st.cache_resource(max_entries=2, show_spinner=False)
+def etapa_cobertura(version, _df_seg, _df_categorias, _dimension):
+    return construir_cobertura(_df_seg, _df_categorias, _dimension)
+
+# Coordenadas de las visitas parseadas una sola vez (lat/lon numéricos)
+@perfilador.medido
+@st.cache_resource(max_entries=2, show_spinner=False)
+def etapa_ubicaciones(version, _df_seg):
+    return congelar(construir_ubicaciones(_df_seg))
+
+# Historial de ciclos: cada versión nueva de la evaluación se agrega una vez
+# (con las reglas por defecto, para comparar ciclos entre sí)
+@perfilador.medido
+@st.cache_resource(max_entries=2, show_spinner=False)
+def etapa_historial(version, _df_categorias):
+    almacen = AlmacenCiclos()
+    if not _df_categorias.empty:
+        almacen.registrar(version, aplicar_reglas(_df_categorias, REGLAS_POR_DEFECTO))
+    return almacen.cargar()
+
+# Cubo de cumplimiento (indicador, fecha, supervisor, vendedor) para las series y comparativas
+@perfilador.medido
+@st.cache_resource(max_entries=2, show_spinner=False)
+def etapa_cubo(version, _df_cump):
+    return construir_cubo_cumplimiento(_df_cump)
+
+# Tendencias de cumplimiento de todo el equipo: pendiente, media reciente y volatilidad
+@perfilador.medido
+@st.cache_resource(max_entries=2, show_spinner=False)
+def etapa_tendencias(version, _df_cump, _dimension):
+    return construir_tendencias(_df_cump, _dimension)
+
+# Ranking del equipo: orden, percentil y color por métrica (depende de las reglas)
+@perfilador.medido
+@st.cache_resource(max_entries=16, show_spinner=False)
+def etapa_ranking(version, reglas, _df_eval):
+    return construir_ranking(_df_eval, reglas)
+
+# Agregados del Resumen Ejecutivo que sólo dependen de la evaluación
+@perfilador.medido
+@st.cache_resource(max_entries=16, show_spinner=False)
+def etapa_resumen(version, reglas, _df_eval):
+    return resumen_equipo(_df_eval)
+
+# Correlaciones entre áreas y preguntas, e impulsores del cumplimiento
+# (no dependen de las reglas de segmentación)
+@perfilador.medido
+@st.cache_resource(max_entries=2, show_spinner=False)
+def etapa_correlaciones(version, _df_categorias, _df_cump, _dimension):
+    return construir_correlaciones(_df_categorias, _df_cump, _dimension)
+
+df_eval = etapa_segmentacion(version_evaluacion, reglas_segmentacion, df_eval_categorias)
+ranking_equipo = etapa_ranking(version_evaluacion, reglas_segmentacion, df_eval)
+
+# Datos de cumplimiento (modelo canónico ya tipado desde la carga)
+df_cump = df_cump_orig
+
+cubo_cumplimiento = etapa_cubo(version_cumplimiento, df_cump)
+
+try:
+    historial = etapa_historial(version_evaluacion, df_eval_categorias)
+except Exception as e:
+    st.sidebar.warning(f"Historial de evaluaciones no disponible: {str(e)}")
+    historial = None
+
+dimension_vendedores = obtener_dimension_vendedores(versiones_datos, df_eval, df_info, df_seg_orig, df_cump)
+correlaciones = etapa_correlaciones(
+    (version_evaluacion, version_cumplimiento), df_eval_categorias, df_cump, dimension_vendedores
+)
+tendencias_cumplimiento = etapa_tendencias(versiones_datos, df_cump, dimension_vendedores)
 
-# Procesar datos de cumplimiento
-if not df_cump_orig.empty:
-    try:
-        df_cump = df_cump_orig.copy()
-        df_cump['fecha'] = pd.to_datetime(df_cump.apply(lambda x: f"{x['year']}-{x['mes']}-01", axis=1))
-        df_cump['cumplimiento_num'] = (
-            df_cump['cumplimiento']
-            .astype(str)
-            .str.replace('%', '')
-            .str.replace(',', '.')
-            .replace('nan', np.nan)
-            .replace('', np.nan)
-            .astype(float) / 100
-        )
-    except Exception as e:
-        st.warning(f"Error al procesar cumplimientos: {str(e)}")
-        df_cump = pd.DataFrame()
-else:
-    df_cump = pd.DataFrame()
-
-# Procesar datos de información
-if not df_info_orig.empty:
-    try:
-        df_info = df_info_orig.copy()
-        df_info.columns = df_info.columns.str.strip().str.lower().str.replace(' ', '_')
-        df_info['nombre_vendedor'] = df_info['nombre_vendedor'].str.strip().str.upper()
-    except Exception as e:
-        st.warning(f"Error al procesar información de vendedores: {str(e)}")
-        df_info = pd.DataFrame()
-else:
-    df_info = pd.DataFrame()
+sin_cruce = dimension_vendedores.no_coincidentes()
+if not sin_cruce.empty:
+    with st.sidebar.expander(f"🔗 Vendedores sin cruce ({len(sin_cruce)})"):
+        st.caption("Vendedores que no aparecen en todos los datasets")
+        st.dataframe(sin_cruce, hide_index=True, use_container_width=True)
 
 # =============================================
 # FUNCIÓN PARA GENERAR PDF (MEJORADA)
 # =============================================
-def generar_pdf_perfil(vendedor, df_eval, df_seg, df_cump=None, df_info=None, tipo="general"):
+# PDFs ya generados: LRU en memoria + disco, compartido entre sesiones.
+# La versión sale de los datos que usan los PDF (evaluación y cumplimiento; el
+# seguimiento no cambia el documento) e incluye el día porque el documento
+# imprime la fecha y la antigüedad; las reglas de cada sesión van en la
+# variante de cada PDF, así sesiones con distintos sliders no invalidan los
+# PDFs de las demás.
+@st.cache_resource
+def obtener_artefactos_pdf():
+    return AlmacenArtefactos()
+
+artefactos_pdf = obtener_artefactos_pdf()
+version_pdf = version_artefactos(version_evaluacion, version_cumplimiento, datetime.now().date())
+variante_pdf = version_artefactos(reglas_segmentacion)
+if artefactos_pdf.version_vigente != version_pdf:
+    artefactos_pdf.invalidar_excepto(version_pdf)
+
+def generar_pdf(vendedor, tipo="general"):
     try:
-        mask = df_eval['ruta'].str.strip().str.upper() == vendedor.strip().upper()
-        if not mask.any():
-            st.error(f"No se encontró al vendedor {vendedor} en evaluación")
-            return None
-
-        datos_vendedor = df_eval[mask].iloc[0].to_dict()
-        info_vendedor = {}
-        if df_info is not None and not df_info.empty:
-            mask_info = df_info['ruta'].str.strip().str.upper() == vendedor.strip().upper()
-            if mask_info.any():
-                info_vendedor = df_info[mask_info].iloc[0].to_dict()
-
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_auto_page_break(auto=True, margin=15)
-        pdf.set_margins(left=15, top=15, right=15)
+        with perfilador.tramo("pdf", tipo, vendedor=vendedor):
+            return artefactos_pdf.obtener_o_generar(
+                vendedor, tipo, version_pdf,
+                lambda: generar_pdf_perfil(vendedor, df_eval, df_seg_orig, df_cump, df_info, tipo, dimension_vendedores),
+                variante=variante_pdf
+            )
+    except Exception as e:
+        st.error(f"Error al generar PDF: {str(e)}")
+        return None
 
-        try:
-            pdf.add_font('DejaVu', '', 'DejaVuSans.ttf', uni=True)
-            pdf.set_font('DejaVu', '', 12)
-        except:
-            pdf.set_font("Arial", size=12)
-
-        # Encabezado general
-        pdf.set_fill_color(240, 240, 240)
-        pdf.rect(10, 10, 190, 40, 'F')
-        pdf.set_font('', 'B', 16)
-        pdf.cell(190, 10, txt="IDENTIFICACIÓN COMERCIAL", ln=1, align='C')
-        pdf.set_font('', '', 12)
-        if info_vendedor:
-            pdf.cell(95, 8, txt=f"Nombre: {info_vendedor.get('nombre_vendedor', 'N/D')}", ln=0)
-            pdf.cell(95, 8, txt=f"Ruta: {info_vendedor.get('ruta', 'N/D')}", ln=1)
-            pdf.cell(95, 8, txt=f"Cédula: {info_vendedor.get('cedula', 'N/D')}", ln=0)
-            pdf.cell(95, 8, txt=f"Teléfono: {info_vendedor.get('telefono', 'N/D')}", ln=1)
-            try:
-                fecha_ingreso = pd.to_datetime(info_vendedor.get('fecha_ingreso'))
-                tiempo = (datetime.now() - fecha_ingreso).days // 30
-                pdf.cell(95, 8, txt=f"Antigüedad: {tiempo} meses", ln=0)
-            except:
-                pdf.cell(95, 8, txt="Antigüedad: N/D", ln=0)
-            pdf.cell(95, 8, txt=f"Zona: {info_vendedor.get('zona', 'N/D')}", ln=1)
-        pdf.ln(10)
-
-        # Evaluación cualitativa
-        columnas_cualitativas = {
-            "fortalezas_mas_destacadas": "Fortalezas destacadas",
-            "oportunidades_de_mejora": "Oportunidades de mejora",
-            "recomendaciones_especificas_de_formacion": "Recomendaciones de formación"
-        }
+# Puntajes 0-10 como barra en la tabla (sin Styler: no requiere matplotlib)
+def columna_puntaje(columna):
+    return st.column_config.ProgressColumn(columna, min_value=0, max_value=10, format="%.2f")
 
-        pdf.set_font('', 'B', 14)
-        pdf.set_fill_color(200, 220, 255)
-        pdf.cell(0, 10, "EVALUACIÓN CUALITATIVA", ln=1, fill=True)
-        pdf.ln(3)
+# Gráficos y tablas con su tramo: incluye la serialización de plotly y del DataFrame
+def mostrar_grafico(fig, **kwargs):
+    titulo = fig.layout.title.text if perfilador.activo else None
+    with perfilador.tramo("gráfico", titulo or ""):
+        st.plotly_chart(fig, **kwargs)
 
-        for col, titulo in columnas_cualitativas.items():
-            pdf.set_font('', 'B', 12)
-            pdf.set_fill_color(240, 240, 240)
-            pdf.cell(0, 8, f"{titulo}:", ln=1, fill=True)
-            contenido = datos_vendedor.get(col, "")
-            if pd.isna(contenido) or str(contenido).strip() == "":
-                pdf.set_font('', 'I', 10)
-                pdf.cell(0, 6, "No fue completado.", ln=1)
-            else:
-                pdf.set_font('', '', 10)
-                pdf.multi_cell(0, 6, str(contenido).strip())
-            pdf.ln(2)
-
-        if tipo == "general":
-            pdf.set_font('', 'B', 14)
-            pdf.set_fill_color(220, 220, 220)
-            pdf.cell(0, 10, "EVALUACIÓN POR COMPETENCIAS", ln=1, fill=True)
-            pdf.ln(3)
-
-            for categoria, columnas in categorias.items():
-                pdf.set_font('', 'B', 12)
-                pdf.cell(0, 8, txt=categoria, ln=1)
-                pdf.set_font('', '', 10)
-                for col in columnas:
-                    if col in datos_vendedor:
-                        valor = datos_vendedor[col]
-                        if isinstance(valor, (int, float)) and pd.notna(valor):
-                            valor_str = f"{valor:.2f}/10"
-                        else:
-                            valor_str = str(valor)
-                        pdf.cell(0, 6, txt=f"- {col.replace('_', ' ').capitalize()}: {valor_str}", ln=1)
-                pdf.ln(2)
-
-            # Logros
-            if df_cump is not None and not df_cump.empty:
-                logros = df_cump[
-                    (df_cump['vendedor'].str.upper() == vendedor.upper()) &
-                    (df_cump['cumplimiento_num'] > 0.8)
-                ].sort_values('fecha', ascending=False).head(3)
-                if not logros.empty:
-                    pdf.set_font('', 'B', 14)
-                    pdf.set_fill_color(220, 220, 220)
-                    pdf.cell(0, 10, "LOGROS DESTACADOS", ln=1, fill=True)
-                    pdf.set_font('', '', 10)
-                    for _, row in logros.iterrows():
-                        mes = f"{row['mes']}-{row['year']}"
-                        cumplimiento = f"{float(row['cumplimiento']):.2f}%"
-                        pdf.cell(0, 6, txt=f"{row['indicador']}: {cumplimiento} (Mes: {mes})", ln=1)
-
-        elif tipo == "reconocimiento":
-            pdf.set_font('', 'B', 16)
-            pdf.cell(0, 10, txt="CARTA DE RECONOCIMIENTO", ln=1, align='C')
-            pdf.ln(10)
-            pdf.set_font('', '', 12)
-            pdf.multi_cell(0, 8, txt=f"A quien corresponda:")
-            pdf.ln(5)
-            pdf.multi_cell(0, 8, txt=f"Reconocemos al colaborador {vendedor} por su excelente desempeño durante los siguientes periodos:")
-            pdf.ln(5)
-
-            if df_cump is not None and not df_cump.empty:
-                df_vend_cump = df_cump[df_cump['vendedor'].str.upper() == vendedor.upper()].copy()
-                df_vend_cump = df_vend_cump[df_vend_cump['cumplimiento_num'] > df_vend_cump['cumplimiento_num'].mean()]
-                df_vend_cump = df_vend_cump.sort_values(['year', 'mes'], ascending=[False, False])
-                for _, row in df_vend_cump.head(5).iterrows():
-                    mes = f"{row['mes']}-{row['year']}"
-                    cumplimiento = f"{float(row['cumplimiento']):.2f}%"
-                    pdf.cell(100, 6, txt=f"- {row['indicador']}:", ln=0)
-                    pdf.cell(90, 6, txt=f"{cumplimiento} (Mes: {mes})", ln=1)
-
-            pdf.ln(10)
-            pdf.multi_cell(0, 8, txt="Este reconocimiento se otorga como muestra de aprecio por su dedicación y compromiso con la excelencia comercial.")
-            pdf.ln(15)
-            pdf.cell(100, 8, txt="Santo Domingo, " + datetime.now().strftime("%d/%m/%Y"), ln=0)
-            pdf.cell(90, 8, txt="_________________________", ln=1)
-            pdf.cell(100, 8, txt="", ln=0)
-            pdf.cell(90, 8, txt="Firma Supervisor", ln=1)
-            pdf.ln(15)
-            pdf.cell(0, 8, txt="_________________________", ln=1)
-            pdf.cell(0, 8, txt="Firma Gerente Comercial", ln=1)
-
-        elif tipo == "mejora":
-            pdf.set_font('', 'B', 16)
-            pdf.cell(0, 10, txt="PLAN DE MEJORA", ln=1, align='C')
-            pdf.ln(10)
-
-            pdf.set_font('', 'B', 12)
-            pdf.cell(100, 8, txt="Vendedor:", ln=0)
-            pdf.set_font('', '')
-            pdf.cell(90, 8, txt=vendedor, ln=1)
-
-            pdf.set_font('', 'B', 12)
-            pdf.cell(100, 8, txt="Ruta:", ln=0)
-            pdf.set_font('', '')
-            pdf.cell(90, 8, txt=info_vendedor.get('ruta', 'N/D'), ln=1)
-
-            pdf.set_font('', 'B', 12)
-            pdf.cell(100, 8, txt="Fecha:", ln=0)
-            pdf.set_font('', '')
-            pdf.cell(90, 8, txt=datetime.now().strftime("%d/%m/%Y"), ln=1)
-            pdf.ln(10)
-
-            pdf.set_font('', 'B', 14)
-            pdf.cell(0, 10, txt="ÁREAS DE OPORTUNIDAD", ln=1)
-
-            if df_cump is not None and not df_cump.empty:
-                df_vend_cump = df_cump[df_cump['vendedor'].str.upper() == vendedor.upper()].copy()
-                df_vend_cump = df_vend_cump[df_vend_cump['cumplimiento_num'] < df_vend_cump['cumplimiento_num'].mean()]
-                df_vend_cump = df_vend_cump.sort_values(['year', 'mes'], ascending=[False, False])
-                for _, row in df_vend_cump.head(5).iterrows():
-                    mes = f"{row['mes']}-{row['year']}"
-                    cumplimiento = f"{float(row['cumplimiento']):.2f}%"
-                    pdf.set_font('', 'B', 10)
-                    pdf.cell(100, 6, txt=f"{row['indicador']}:", ln=0)
-                    pdf.set_font('', '')
-                    pdf.cell(90, 6, txt=f"{cumplimiento} (Mes: {mes})", ln=1)
-
-            pdf.ln(5)
-            pdf.set_font('', 'B', 14)
-            pdf.cell(0, 10, txt="PLAN DE ACCIÓN", ln=1)
-            segmento = datos_vendedor.get('segmento', 'N/D')
-            acciones = [
-                "1. Capacitación en técnicas de venta (8 horas)",
-                "2. Acompañamiento semanal del supervisor",
-                "3. Establecimiento de metas quincenales",
-                "4. Revisión diaria de objetivos"
-            ] if "Bajo" in segmento else [
-                "1. Taller especializado de habilidades",
-                "2. Mentoría mensual con vendedor líder",
-                "3. Metas mensuales con retroalimentación"
-            ]
-            for accion in acciones:
-                pdf.set_font('', '', 12)
-                pdf.multi_cell(0, 6, txt=accion)
-                pdf.ln(1)
-
-            pdf.ln(10)
-            pdf.set_font('', 'B', 14)
-            pdf.cell(0, 10, txt="COMPROMISO DEL COLABORADOR", ln=1)
-            pdf.set_font('', '', 12)
-            pdf.multi_cell(0, 8, txt="Yo, _________________________________________, me comprometo a seguir el plan de mejora establecido y a trabajar en las áreas de oportunidad identificadas.")
-            pdf.ln(15)
-            pdf.cell(100, 8, txt="_________________________", ln=0)
-            pdf.cell(90, 8, txt="_________________________", ln=1)
-            pdf.cell(100, 8, txt="Firma Vendedor", ln=0)
-            pdf.cell(90, 8, txt="Firma Supervisor", ln=1)
-
-        return pdf.output(dest='S').encode('latin-1', errors='replace')
+def mostrar_tabla(df, **kwargs):
+    with perfilador.tramo("tabla", filas=len(df.index)):
+        st.dataframe(df, **kwargs)
+
+perfilador.terminar()
+fin_preparacion = time.perf_counter()
 
-    except Exception as e:
-        st.error(f"Error al generar PDF: {str(e)}")
-        return None
-    
 # =============================================
 # INTERFAZ PRINCIPAL
 # =============================================
 st.sidebar.header("Filtros")
 vista = st.sidebar.radio("Vista", ["Resumen Ejecutivo", "Individual", "Equipo"])
 
+perfilador.iniciar("vista", vista)
 if vista == "Resumen Ejecutivo":
+    # plotly se importa con la primera vista que grafica, no en el arranque
+    import plotly.express as px
+
     st.header("📊 Resumen Ejecutivo - Visión General")
     st.markdown("""
     **Vista panorámica** del desempeño del equipo comercial con métricas clave, distribución de talento 
     y análisis comparativos por áreas y supervisores.
     """)
     
-    # Calcular métricas generales
-    total_colaboradores = df_eval_orig[vendedor_col].nunique()
-    total_supervisores = df_eval_orig[supervisor_col].nunique()
-    media_total = df_eval['puntaje_total'].mean()
-    media_potencial = df_eval['potencial'].mean()
+    # Métricas generales (precalculadas por versión de la evaluación)
+    resumen = etapa_resumen(version_evaluacion, reglas_segmentacion, df_eval)
+    total_colaboradores = resumen['total_colaboradores']
+    total_supervisores = resumen['total_supervisores']
+    media_total = resumen['media_total']
+    media_potencial = resumen['media_potencial']
 
     # Métricas en columnas
     col1, col2, col3, col4 = st.columns(4)
@@ -459,34 +397,53 @@ if vista == "Resumen Ejecutivo":
         # Filtros para la vista general
         col1, col2 = st.columns(2)
         with col1:
-            indicador_sel = st.selectbox("Seleccionar Indicador", df_cump['indicador'].unique())
+            indicador_sel = st.selectbox("Seleccionar Indicador", cubo_cumplimiento.indicadores())
         with col2:
-            periodo_sel = st.selectbox("Período", ["Últimos 6 meses", "Últimos 12 meses", "Todo el historial"])
+            periodo_sel = st.selectbox("Período", [
+                "Últimos 6 meses", "Últimos 12 meses", "Todo el historial",
+                "Año", "Trimestre", "Rango personalizado"
+            ])
         
-        # Aplicar filtros
-        df_filtrado = df_cump[df_cump['indicador'] == indicador_sel]
+        # Rango [fecha_limite, fecha_fin] aplicado como corte binario sobre el cubo
+        fecha_limite, fecha_fin = None, None
+        fecha_min, fecha_max = cubo_cumplimiento.rango_fechas()
         if periodo_sel == "Últimos 6 meses":
             fecha_limite = pd.to_datetime('today') - pd.DateOffset(months=6)
-            df_filtrado = df_filtrado[df_filtrado['fecha'] >= fecha_limite]
         elif periodo_sel == "Últimos 12 meses":
             fecha_limite = pd.to_datetime('today') - pd.DateOffset(months=12)
-            df_filtrado = df_filtrado[df_filtrado['fecha'] >= fecha_limite]
+        elif periodo_sel in ("Año", "Trimestre") and fecha_min is not None:
+            frecuencia = "Y" if periodo_sel == "Año" else "Q"
+            periodos = pd.period_range(fecha_min, fecha_max, freq=frecuencia)[::-1]
+            periodo = st.selectbox(
+                periodo_sel, list(periodos),
+                format_func=lambda p: str(p.year) if frecuencia == "Y" else f"{p.year} T{p.quarter}"
+            )
+            fecha_limite, fecha_fin = periodo.start_time, periodo.end_time
+        elif periodo_sel == "Rango personalizado" and fecha_min is not None:
+            rango = st.date_input(
+                "Desde / Hasta",
+                value=(fecha_min.date(), fecha_max.date()),
+                min_value=fecha_min.date(),
+                max_value=fecha_max.date()
+            )
+            if len(rango) == 2:
+                fecha_limite, fecha_fin = pd.Timestamp(rango[0]), pd.Timestamp(rango[1])
         
         # Gráfico de evolución general
         fig_evo_general = px.line(
-            df_filtrado.groupby('fecha').agg({'cumplimiento_num': 'mean'}).reset_index(),
+            cubo_cumplimiento.consultar(indicador_sel, desde=fecha_limite, hasta=fecha_fin),
             x='fecha',
             y='cumplimiento_num',
             title=f"Evolución de {indicador_sel} - Equipo Comercial",
             labels={'cumplimiento_num': '% Cumplimiento', 'fecha': 'Fecha'}
         )
         fig_evo_general.update_yaxes(tickformat=".0%")
-        st.plotly_chart(fig_evo_general, use_container_width=True)
+        mostrar_grafico(fig_evo_general, use_container_width=True)
         
         # Comparativa por supervisores
         st.subheader("Comparativa por Supervisores")
         
-        df_sup = df_filtrado.groupby(['supervisor', 'fecha']).agg({'cumplimiento_num': 'mean'}).reset_index()
+        df_sup = cubo_cumplimiento.consultar(indicador_sel, ('supervisor',), desde=fecha_limite, hasta=fecha_fin)
         
         fig_sup = px.line(
             df_sup,
@@ -497,19 +454,21 @@ if vista == "Resumen Ejecutivo":
             labels={'cumplimiento_num': '% Cumplimiento', 'fecha': 'Fecha'}
         )
         fig_sup.update_yaxes(tickformat=".0%")
-        st.plotly_chart(fig_sup, use_container_width=True)
+        mostrar_grafico(fig_sup, use_container_width=True)
         
         # Top 5 y Bottom 5 vendedores
         st.subheader("Top y Bottom Performers")
         
-        df_top = df_filtrado.groupby('vendedor').agg({'cumplimiento_num': 'mean'}).reset_index()
+        df_top = cubo_cumplimiento.consultar(
+            indicador_sel, ('vendedor',), desde=fecha_limite, hasta=fecha_fin, colapsar_fecha=True
+        )[['vendedor', 'cumplimiento_num']]
         df_top = df_top.sort_values('cumplimiento_num', ascending=False)
         
         col_top, col_bottom = st.columns(2)
         
         with col_top:
             st.markdown("🏆 **Top 5 Vendedores**")
-            st.dataframe(
+            mostrar_tabla(
                 df_top.head(5).style.format({'cumplimiento_num': '{:.1%}'}),
                 hide_index=True,
                 use_container_width=True
@@ -517,7 +476,7 @@ if vista == "Resumen Ejecutivo":
         
         with col_bottom:
             st.markdown("⚠️ **Bottom 5 Vendedores**")
-            st.dataframe(
+            mostrar_tabla(
                 df_top.tail(5).style.format({'cumplimiento_num': '{:.1%}'}),
                 hide_index=True,
                 use_container_width=True
@@ -533,13 +492,13 @@ if vista == "Resumen Ejecutivo":
     fig_dist = px.histogram(df_eval, x='puntaje_total', nbins=20, 
                            labels={'puntaje_total': 'Puntaje Total'},
                            color_discrete_sequence=['#636EFA'])
-    st.plotly_chart(fig_dist, use_container_width=True)
+    mostrar_grafico(fig_dist, use_container_width=True)
 
     # Evaluación por áreas
     st.subheader("📌 Evaluación General por Áreas Clave")
     st.caption("Promedio del equipo en cada categoría de evaluación")
     
-    avg_areas = {area: df_eval[area].mean() for area in categorias.keys()}
+    avg_areas = resumen['avg_areas']
     cols = st.columns(len(categorias))
     
     for i, (area, promedio) in enumerate(avg_areas.items()):
@@ -563,13 +522,12 @@ if vista == "Resumen Ejecutivo":
     st.subheader("🧩 Segmentación del Equipo")
     st.caption("Clasificación de vendedores según desempeño y potencial")
     
-    segment_counts = df_eval['segmento'].value_counts().reset_index()
-    segment_counts.columns = ['Segmento', 'Cantidad']
+    segment_counts = resumen['segment_counts']
     
     col1, col2 = st.columns([2, 3])
     
     with col1:
-        st.dataframe(
+        mostrar_tabla(
             segment_counts.merge(
                 pd.DataFrame.from_dict(descripcion_segmentos, orient='index', columns=['Descripción']),
                 left_on='Segmento', right_index=True
@@ -584,24 +542,27 @@ if vista == "Resumen Ejecutivo":
                               names='Segmento',
                               color='Segmento',
                               color_discrete_map={
-                                  "🟢 Alto Desempeño & Alto Potencial": "#00CC96",
-                                  "🟡 Buen Desempeño pero Bajo Potencial": "#FFA15A",
-                                  "🟠 Alto Potencial pero Bajo Desempeño": "#FECB52",
-                                  "🔴 Bajo Desempeño & Bajo Potencial": "#EF553B",
-                                  "🧩 Inconsistente / Perfil Mixto": "#AB63FA"
+                                  SEGMENTO_ESTRELLA: "#00CC96",
+                                  SEGMENTO_MANTENEDOR: "#FFA15A",
+                                  SEGMENTO_POTENCIAL: "#FECB52",
+                                  SEGMENTO_RIESGO: "#EF553B",
+                                  SEGMENTO_MIXTO: "#AB63FA"
                               })
-        st.plotly_chart(fig_segmentos, use_container_width=True)
+        mostrar_grafico(fig_segmentos, use_container_width=True)
 
-    # Mapa de calor de competencias
+    # Mapa de calor de competencias (precalculado por versión de los datos)
     st.subheader("🔥 Correlación entre Competencias")
-    st.caption("Relación estadística entre las diferentes áreas evaluadas")
-    
-    # Preparar datos para el mapa de calor
-    corr_matrix = df_eval[list(categorias.keys())].corr().round(2)
+    nivel_correlacion = st.radio("Nivel", ["Áreas", "Preguntas"], horizontal=True, key="nivel_correlacion")
+    if nivel_correlacion == "Áreas":
+        st.caption("Relación estadística entre las diferentes áreas evaluadas")
+        corr_matrix = correlaciones.categorias.round(2)
+    else:
+        st.caption("Relación entre cada par de preguntas (sólo vendedores con ambas respuestas)")
+        corr_matrix = correlaciones.preguntas.round(2)
     
     fig_heatmap = px.imshow(
         corr_matrix,
-        text_auto=True,
+        text_auto=nivel_correlacion == "Áreas",
         color_continuous_scale='RdBu',
         range_color=[-1, 1],
         labels=dict(x="Competencia", y="Competencia", color="Correlación"),
@@ -610,11 +571,41 @@ if vista == "Resumen Ejecutivo":
     )
     fig_heatmap.update_layout(
         margin=dict(l=0, r=0, t=30, b=0),
-        height=500
+        height=500 if nivel_correlacion == "Áreas" else 800
     )
-    st.plotly_chart(fig_heatmap, use_container_width=True)
+    mostrar_grafico(fig_heatmap, use_container_width=True)
+
+    # Competencias que más se relacionan con el cumplimiento de cada indicador
+    st.subheader("🎯 Impulsores del Cumplimiento")
+    indicadores_impulsores = list(correlaciones.impulsores.columns)
+    if not indicadores_impulsores:
+        st.info("No hay datos de cumplimiento que crucen con la evaluación")
+    else:
+        st.caption("Correlación entre cada competencia y el cumplimiento promedio del vendedor en el indicador")
+        indicador_impulsor = st.selectbox("Indicador", indicadores_impulsores, key="indicador_impulsores")
+        impulsores = correlaciones.principales_impulsores(indicador_impulsor, cantidad=10)
+        if impulsores.empty:
+            st.info(f"Pocos vendedores con evaluación y cumplimiento en {indicador_impulsor}")
+        else:
+            fig_impulsores = px.bar(
+                impulsores.iloc[::-1],
+                x='Correlación',
+                y='Competencia',
+                orientation='h',
+                color='Correlación',
+                color_continuous_scale='RdBu',
+                range_color=[-1, 1],
+                hover_data=['Vendedores']
+            )
+            fig_impulsores.update_layout(margin=dict(l=0, r=0, t=30, b=0), height=450)
+            mostrar_grafico(fig_impulsores, use_container_width=True)
+        with st.expander("Matriz completa de impulsores"):
+            mostrar_tabla(correlaciones.impulsores.round(2), use_container_width=True)
 
 elif vista == "Individual":
+    import plotly.express as px
+    import plotly.graph_objects as go
+
     st.header("👤 Vista Individual")
     st.markdown("""
     **Análisis detallado** por vendedor, incluyendo evaluación completa, seguimiento de visitas 
@@ -628,7 +619,7 @@ elif vista == "Individual":
     # Mostrar información básica del vendedor
     if not df_info.empty:
         try:
-            info_vendedor = df_info[df_info['ruta'].str.strip().str.upper() == vendedor_sel.strip().upper()].iloc[0]
+            info_vendedor = df_info.iloc[dimension_vendedores.filas('informacion', vendedor_sel)[0]]
             
             col1, col2, col3 = st.columns(3)
             with col1:
@@ -650,25 +641,18 @@ elif vista == "Individual":
         st.warning("No se cargó información adicional de vendedores")
     
     # Filtrar datos
-    eval_sel = df_eval[df_eval['ruta'] == vendedor_sel].iloc[0]
-    seg_sel = df_seg_orig[df_seg_orig[vendedor_col] == vendedor_sel]
+    posicion_eval = dimension_vendedores.filas('evaluacion', vendedor_sel)[0]
+    eval_sel = df_eval.iloc[posicion_eval]
+    visitas_ruta = etapa_seguimiento(version_seguimiento, df_seg_orig).de(vendedor_sel)
+    seg_sel = visitas_ruta.visitas
     
-    # Determinar segmento
-    if eval_sel['puntaje_total'] >= 8 and eval_sel['potencial'] >= 8:
-        segmento = "🟢 Alto Desempeño & Alto Potencial"
-    elif eval_sel['puntaje_total'] >= 8 and eval_sel['potencial'] < 6:
-        segmento = "🟡 Buen Desempeño pero Bajo Potencial"
-    elif eval_sel['puntaje_total'] < 6 and eval_sel['potencial'] >= 8:
-        segmento = "🟠 Alto Potencial pero Bajo Desempeño"
-    elif eval_sel['puntaje_total'] < 6 and eval_sel['potencial'] < 6:
-        segmento = "🔴 Bajo Desempeño & Bajo Potencial"
-    else:
-        segmento = "🧩 Inconsistente / Perfil Mixto"
+    # Segmento calculado por el motor de reglas para todo el equipo
+    segmento = eval_sel['segmento']
     
     # Pestañas para vista individual
-    tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 Resumen", "📝 Evaluación Completa", "🔄 Seguimiento", "📈 Indicadores", "🎯 Plan de Desarrollo"])
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["📊 Resumen", "📝 Evaluación Completa", "🔄 Seguimiento", "📈 Indicadores", "🎯 Plan de Desarrollo", "🕓 Historial"])
 
-    with tab1:
+    with tab1, perfilador.tramo("pestaña", "📊 Resumen"):
         st.subheader(f"📊 Resumen de Desempeño: {vendedor_sel}")
 
         # --- Métricas principales ---
@@ -720,7 +704,16 @@ elif vista == "Individual":
             margin=dict(l=50, r=50, t=50, b=50),
             height=500
         )
-        st.plotly_chart(fig, use_container_width=True)
+        mostrar_grafico(fig, use_container_width=True)
+
+        # Percentil dentro del equipo (precalculado en el ranking)
+        st.subheader("📶 Percentil en el Equipo")
+        st.caption("Porcentaje del equipo con un puntaje igual o menor")
+        percentiles_vendedor = ranking_equipo.percentiles_de(posicion_eval)
+        metricas_percentil = {"Puntaje Total": "puntaje_total", "Potencial": "potencial", **{c: c for c in categorias_radar}}
+        for col, (etiqueta, metrica) in zip(st.columns(len(metricas_percentil)), metricas_percentil.items()):
+            valor = percentiles_vendedor.get(metrica, np.nan)
+            col.metric(etiqueta, "N/D" if pd.isna(valor) else f"P{valor:.0f}")
         
         # Nueva sección: Potencial para supervisor
         st.subheader("🔍 Potencial para Supervisor")
@@ -748,46 +741,32 @@ elif vista == "Individual":
             st.metric("📅 Antigüedad", "2.5 años", help="Tiempo en el puesto actual")
 
         with cols_hr[1]:
-            if not df_cump.empty:
-                df_vend_cump = df_cump[df_cump['vendedor'] == vendedor_sel].copy()
-                if not df_vend_cump.empty:
-                    # Solución: Convertir a string primero y manejar NaN
-                    df_vend_cump['cumplimiento_num'] = (
-                        df_vend_cump['cumplimiento'].astype(str)
-                        .str.replace('%', '')
-                        .replace('nan', np.nan)
-                        .astype(float) / 100
-            )
-            
-            df_vend_cump = df_vend_cump.sort_values(['year', 'mes'])
-            tendencia = "↑ Mejorando" if df_vend_cump['cumplimiento_num'].iloc[-1] > df_vend_cump['cumplimiento_num'].iloc[0] else "↓ Empeorando"
-            st.metric("📈 Tendencia Cumplimiento", tendencia)
+            # Precalculada para todo el equipo: pendiente media de sus indicadores
+            tendencia_vendedor = tendencias_cumplimiento.de_vendedor(vendedor_sel)
+            if tendencia_vendedor is None or tendencia_vendedor['tendencia'] == SIN_DATOS:
+                tendencia = SIN_DATOS
+                st.metric("📈 Tendencia Cumplimiento", tendencia)
+            else:
+                tendencia = tendencia_vendedor['tendencia']
+                st.metric(
+                    "📈 Tendencia Cumplimiento", tendencia,
+                    delta=f"{tendencia_vendedor['pendiente']:+.1f} pp/mes",
+                    help=(f"Media de los últimos {VENTANA_RECIENTE} registros: {tendencia_vendedor['media_reciente']:.1f}% · "
+                          f"volatilidad: {tendencia_vendedor['volatilidad']:.1f} pp")
+                )
 
         with cols_hr[2]:
             puntaje_total = eval_sel.get('puntaje_total', 0)
-            if puntaje_total >= 8:
-                consistencia = "Alta"
-                color = "green"
-            elif puntaje_total >= 6:
-                consistencia = "Media"
-                color = "orange"
-            else:
-                consistencia = "Baja"
-                color = "red"
+            nivel_desempeno = nivel(puntaje_total, reglas_segmentacion)
+            consistencia = {"Alto": "Alta", "Medio": "Media"}.get(nivel_desempeno, "Baja")
+            color = {"Alto": "green", "Medio": "orange"}.get(nivel_desempeno, "red")
             st.markdown("🔄 **Consistencia**")
             st.markdown(f"<span style='color:{color}; font-size: 20px'>{consistencia}</span>", unsafe_allow_html=True)
 
         with cols_hr[3]:
             potencial = eval_sel.get('potencial', 0)
-            if potencial >= 8:
-                nivel_potencial = "Alto"
-                color = "green"
-            elif potencial >= 6:
-                nivel_potencial = "Medio"
-                color = "orange"
-            else:
-                nivel_potencial = "Bajo"
-                color = "red"
+            nivel_potencial = nivel(potencial, reglas_segmentacion)
+            color = {"Alto": "green", "Medio": "orange"}.get(nivel_potencial, "red")
             st.markdown("🚀 **Potencial**")
             st.markdown(f"<span style='color:{color}; font-size: 20px'>{nivel_potencial}</span>", unsafe_allow_html=True)
 
@@ -803,22 +782,22 @@ elif vista == "Individual":
                 "Alineamiento Cultural"
             ],
             "Evaluación": [
-                "Alto" if puntaje_total >= 8 else "Medio" if puntaje_total >= 6 else "Bajo",
+                nivel_desempeno,
                 nivel_potencial,
-                tendencia if 'tendencia' in locals() else "N/D",
+                tendencia,
                 consistencia,
                 "Alto"
             ],
             "Recomendación": [
-                "Mantener/Desarrollar" if puntaje_total >= 8 else "Capacitar" if puntaje_total >= 6 else "Revisar",
-                "Invertir en desarrollo" if potencial >= 8 else "Monitorear" if potencial >= 6 else "Limitar inversión",
-                "Reforzar positivamente" if 'tendencia' in locals() and tendencia == "↑ Mejorando" else "Intervenir",
+                {"Alto": "Mantener/Desarrollar", "Medio": "Capacitar"}.get(nivel_desempeno, "Revisar"),
+                {"Alto": "Invertir en desarrollo", "Medio": "Monitorear"}.get(nivel_potencial, "Limitar inversión"),
+                {MEJORANDO: "Reforzar positivamente", SIN_DATOS: "Sin historial"}.get(tendencia, "Intervenir"),
                 "Estable" if consistencia == "Alta" else "Volátil",
                 "Retener"
             ]
         }
 
-        st.dataframe(
+        mostrar_tabla(
             pd.DataFrame(decision_data),
             hide_index=True,
             use_container_width=True
@@ -834,7 +813,7 @@ elif vista == "Individual":
     
     with col_pdf1:
         if st.button("📄 Generar Perfil PDF"):
-            pdf_bytes = generar_pdf_perfil(vendedor_sel, df_eval, df_seg_orig, df_cump_orig, df_info_orig, "general")
+            pdf_bytes = generar_pdf(vendedor_sel, "general")
             if pdf_bytes:
                 st.download_button(
                     label="⬇️ Descargar Perfil Completo",
@@ -845,7 +824,7 @@ elif vista == "Individual":
     
     with col_pdf2:
         if st.button("🏆 Generar Reconocimiento PDF"):
-            pdf_bytes = generar_pdf_perfil(vendedor_sel, df_eval, df_seg_orig, df_cump_orig, df_info_orig, "reconocimiento")
+            pdf_bytes = generar_pdf(vendedor_sel, "reconocimiento")
             if pdf_bytes:
                 st.download_button(
                     label="⬇️ Descargar Reconocimiento",
@@ -856,7 +835,7 @@ elif vista == "Individual":
     
     with col_pdf3:
         if st.button("⚠️ Generar Plan Mejora PDF"):
-            pdf_bytes = generar_pdf_perfil(vendedor_sel, df_eval, df_seg_orig, df_cump_orig, df_info_orig, "mejora")
+            pdf_bytes = generar_pdf(vendedor_sel, "mejora")
             if pdf_bytes:
                 st.download_button(
                     label="⬇️ Descargar Plan de Mejora",
@@ -865,90 +844,27 @@ elif vista == "Individual":
                     mime="application/pdf"
                 )
     
-    with tab2:
+    with tab2, perfilador.tramo("pestaña", "📝 Evaluación Completa"):
         st.subheader("Evaluación Completa por Competencias")
      
         # Verificación de datos
-        if pd.isna(eval_sel['efectividad_real_vs_meta']):
+        columna_efectividad = plan_columnas.columna('efectividad_real_vs_meta')
+        if columna_efectividad is None or pd.isna(eval_sel.get(columna_efectividad, np.nan)):
             st.warning("Datos de evaluación incompletos para este vendedor")
         else:
-            # Sección: Venta y Negociación
-            st.markdown("### 💰 Venta y Negociación")
-            cols_venta = st.columns(3)
-            with cols_venta[0]:
-                valor = eval_sel.get('efectividad_real_vs_meta', np.nan)
-                st.metric("Efectividad", 
-                         f"{valor:.1f}/10" if pd.notna(valor) else "N/D",
-                         help="Capacidad para lograr los objetivos de venta")
-            with cols_venta[1]:
-                valor = eval_sel.get('manejo_de_objeciones_efectivas', np.nan)
-                st.metric("Manejo de Objeciones", 
-                         f"{valor:.1f}/10" if pd.notna(valor) else "N/D",
-                         help="Habilidad para manejar objeciones de clientes")
-            with cols_venta[2]:
-                valor = eval_sel.get('cierra_ventas_sin_depender_de_promociones', np.nan)
-                st.metric("Venta Cruzada", 
-                         f"{valor:.1f}/10" if pd.notna(valor) else "N/D",
-                         help="Capacidad para vender productos complementarios")
-
-            # Sección: Relación con Clientes
-            st.markdown("### 🤝 Relación con Clientes")
-            cols_cliente = st.columns(3)
-            with cols_cliente[0]:
-                valor = eval_sel.get('gana_confianza_del_cliente', np.nan)
-                st.metric("Empatía", 
-                         f"{valor:.1f}/10" if pd.notna(valor) else "N/D",
-                         help="Capacidad para entender las necesidades del cliente")
-            with cols_cliente[1]:
-                valor = eval_sel.get('soluciona_conflictos_con_criterio', np.nan)
-                st.metric("Confianza", 
-                         f"{valor:.1f}/10" if pd.notna(valor) else "N/D",
-                         help="Generación de confianza con los clientes")
-            with cols_cliente[2]:
-                valor = eval_sel.get('soluciona_conflictos_con_criterio', np.nan)
-                st.metric("Resolución de Conflictos", 
-                         f"{valor:.1f}/10" if pd.notna(valor) else "N/D",
-                         help="Habilidad para resolver problemas con clientes")
-
-            # Sección: Comportamiento y Actitud
-            st.markdown("### 🧠 Comportamiento y Actitud")
-            cols_actitud = st.columns(3)
-            with cols_actitud[0]:
-                valor = eval_sel.get('toma_la_iniciativa_sin_necesidad_de_ser_presionado.', np.nan)
-                st.metric("Iniciativa", 
-                         f"{valor:.1f}/10" if pd.notna(valor) else "N/D",
-                         help="Proactividad y toma de iniciativa")
-            with cols_actitud[1]:
-                valor = eval_sel.get('resuelve_problemas_cotidianos_de_manera_práctica_y_rápida.', np.nan)
-                st.metric("Adaptación", 
-                         f"{valor:.1f}/10" if pd.notna(valor) else "N/D",
-                         help="Flexibilidad ante cambios")
-            with cols_actitud[2]:
-                valor = eval_sel.get('persiste_en_la_venta_con_educación_y_sin_presión_al_cliente.', np.nan)
-                st.metric("Persistencia", 
-                         f"{valor:.1f}/10" if pd.notna(valor) else "N/D",
-                         help="Constancia ante desafíos")
-
-            # Sección: Aptitudes
-            st.markdown("### 🛠️ Aptitudes Técnicas")
-            cols_apt = st.columns(3)
-            with cols_apt[0]:
-                valor = eval_sel.get('usa_adecuadamente_las_aplicaciones', np.nan)
-                st.metric("Manejo de Herramientas", 
-                         f"{valor:.1f}/10" if pd.notna(valor) else "N/D",
-                         help="Uso de aplicaciones y sistemas")
-            with cols_apt[1]:
-                valor = eval_sel.get('reporta_faltantes_o_problemas_de_averias', np.nan)
-                st.metric("Reportes", 
-                         f"{valor:.1f}/10" if pd.notna(valor) else "N/D",
-                         help="Elaboración de informes y reportes")
-            with cols_apt[2]:
-                valor = eval_sel.get('planifica_su_ruta_diaria_de_manera_lógica_y_eficiente.', np.nan)
-                st.metric("Planificación", 
-                         f"{valor:.1f}/10" if pd.notna(valor) else "N/D",
-                         help="Organización y planificación de rutas")
+            # Secciones y competencias definidas en el registro del formulario
+            for seccion, preguntas in SECCIONES_COMPETENCIAS.items():
+                st.markdown(f"### {seccion}")
+                cols_seccion = st.columns(3)
+                for i, pregunta in enumerate(preguntas):
+                    columna = plan_columnas.columna(pregunta.clave)
+                    valor = eval_sel.get(columna, np.nan) if columna else np.nan
+                    with cols_seccion[i % 3]:
+                        st.metric(pregunta.competencia, 
+                                 f"{valor:.1f}/10" if pd.notna(valor) else "N/D",
+                                 help=pregunta.ayuda)
     
-    with tab3:
+    with tab3, perfilador.tramo("pestaña", "🔄 Seguimiento"):
         st.subheader("🔄 Seguimiento de Visitas")
         st.caption("Registro histórico de visitas y acompañamientos realizados")
 
@@ -957,16 +873,7 @@ elif vista == "Individual":
         
         if 'location' in df_seg_orig.columns and 'supervisor' in df_seg_orig.columns:
             try:
-                # Crear copia para no modificar el original
-                df_ubicaciones = df_seg_orig.copy()
-                
-                # Separar coordenadas y convertir a numérico
-                coords = df_ubicaciones['location'].str.split(',', expand=True)
-                df_ubicaciones['lat'] = pd.to_numeric(coords[0], errors='coerce')
-                df_ubicaciones['lon'] = pd.to_numeric(coords[1], errors='coerce')
-                
-                # Filtrar solo registros con coordenadas válidas
-                df_ubicaciones = df_ubicaciones.dropna(subset=['lat', 'lon'])
+                df_ubicaciones = etapa_ubicaciones(version_seguimiento, df_seg_orig)
                 
                 if not df_ubicaciones.empty:
                     # Paleta de colores distintivos
@@ -983,39 +890,53 @@ elif vista == "Individual":
                             st.markdown(f"<span style='color:{color}; font-size: 20px'>■</span> {supervisor}", 
                                     unsafe_allow_html=True)
                     
-                    # Crear el mapa con Plotly con puntos más grandes
-                    fig = px.scatter_mapbox(
-                        df_ubicaciones,
+                    # Con muchas visitas se envían marcadores agregados por celda;
+                    # el tamaño de la celda depende del nivel de zoom elegido
+                    zoom_mapa = st.slider("Nivel de zoom", min_value=6, max_value=16, value=12,
+                                          key="zoom_mapa_visitas")
+                    marcadores, agregado = marcadores_mapa(df_ubicaciones, zoom_mapa)
+                    if agregado:
+                        st.caption(f"{len(df_ubicaciones):,} visitas agrupadas en {len(marcadores):,} marcadores")
+                    
+                    # scatter_map (MapLibre) en plotly >= 5.24; scatter_mapbox en versiones anteriores
+                    scatter_map = getattr(px, "scatter_map", None)
+                    opciones_mapa = dict(
                         lat='lat',
                         lon='lon',
                         color='supervisor',
                         color_discrete_map=colores_supervisores,
-                        hover_name='ruta',
-                        hover_data=['supervisor', 'timestamp'],
-                        zoom=12,
-                        size_max=15,  # Controla el tamaño máximo de los puntos
-                        size=[10]*len(df_ubicaciones)  # Tamaño fijo para todos los puntos (10)
+                        zoom=zoom_mapa,
+                        center=centro_mapa(df_ubicaciones),
                     )
-
+                    if agregado:
+                        opciones_mapa.update(size='visitas', size_max=30, hover_data={'visitas': True, 'lat': False, 'lon': False})
+                    else:
+                        opciones_mapa.update(hover_name='ruta', hover_data=['supervisor', 'timestamp'])
+                    
+                    if scatter_map is not None:
+                        fig = scatter_map(marcadores, map_style="open-street-map", **opciones_mapa)
+                    else:
+                        fig = px.scatter_mapbox(marcadores, mapbox_style="open-street-map", **opciones_mapa)
+                    
                     fig.update_layout(
-                        mapbox_style="open-street-map",
                         margin={"r":0,"t":0,"l":0,"b":0},
                         height=600
                     )
                     
-                    # Ajustar el tamaño de los marcadores
-                    fig.update_traces(
-                        marker=dict(
-                            size=12,  # Tamaño aumentado de los puntos (valor original era 8)
-                            opacity=0.8  # Ligera transparencia para mejor visualización
+                    # Tamaño fijo de los puntos individuales
+                    if not agregado:
+                        fig.update_traces(
+                            marker=dict(
+                                size=12,
+                                opacity=0.8  # Ligera transparencia para mejor visualización
+                            )
                         )
-                    )
                     
-                    st.plotly_chart(fig, use_container_width=True)
+                    mostrar_grafico(fig, use_container_width=True)
                     
                     # Mostrar tabla con detalles
                     with st.expander("🔍 Ver detalles de ubicaciones"):
-                        st.dataframe(
+                        mostrar_tabla(
                             df_ubicaciones[['ruta', 'supervisor', 'timestamp', 'location']],
                             use_container_width=True,
                             hide_index=True
@@ -1028,20 +949,17 @@ elif vista == "Individual":
             st.warning("Datos incompletos - se requieren columnas 'location' y 'supervisor'")
 
         # --- Visualización de datos históricos ---
-        if seg_sel.empty:
+        if visitas_ruta.vacia:
             st.warning("No hay registros de seguimiento para este vendedor.")
         else:
-            # Verificar y limpiar la columna de fecha
-            if 'timestamp' in seg_sel.columns:
-                try:
-                    seg_sel['timestamp'] = pd.to_datetime(seg_sel['timestamp'])
-                except:
-                    st.warning("Formato de fecha no reconocido en los registros")
+            # Fechas parseadas en la carga; el conteo mensual viene precalculado
+            con_fecha = 'timestamp' in seg_sel.columns and pd.notna(visitas_ruta.ultima)
+            if 'timestamp' in seg_sel.columns and not con_fecha:
+                st.warning("Formato de fecha no reconocido en los registros")
             
             st.markdown("#### 📅 Visitas por Mes")
-            if 'timestamp' in seg_sel.columns:
-                visitas_por_mes = seg_sel.groupby(seg_sel['timestamp'].dt.to_period('M')).size()
-                visitas_por_mes.index = visitas_por_mes.index.to_timestamp()
+            if con_fecha:
+                visitas_por_mes = visitas_ruta.por_mes
                 
                 fig = px.bar(
                     visitas_por_mes,
@@ -1050,18 +968,18 @@ elif vista == "Individual":
                     labels={'x': 'Mes', 'y': 'N° Visitas'},
                     color_discrete_sequence=['#4E79A7']
                 )
-                st.plotly_chart(fig, use_container_width=True)
+                mostrar_grafico(fig, use_container_width=True)
             else:
                 st.warning("No se encontró columna de fecha para generar el gráfico")
 
             # Tabla con todos los registros de seguimiento
             st.markdown("#### 📝 Últimas Visitas Registradas")
             
-            # Ordenar por fecha descendente y mostrar todas las columnas
+            # Ya ordenadas por fecha descendente; se muestran todas las columnas
             columnas_orden = ['timestamp'] + [col for col in seg_sel.columns if col != 'timestamp']
             
-            st.dataframe(
-                seg_sel.sort_values('timestamp', ascending=False).head(20),
+            mostrar_tabla(
+                seg_sel.head(20),
                 column_order=columnas_orden,
                 use_container_width=True,
                 height=500,
@@ -1073,16 +991,14 @@ elif vista == "Individual":
             col1, col2, col3 = st.columns(3)
             
             with col1:
-                if 'timestamp' in seg_sel.columns:
-                    primera_visita = seg_sel['timestamp'].min()
-                    st.metric("Primera visita", primera_visita.strftime('%d/%m/%Y'))
+                if con_fecha:
+                    st.metric("Primera visita", visitas_ruta.primera.strftime('%d/%m/%Y'))
                 else:
                     st.metric("Total registros", len(seg_sel))
             
             with col2:
-                if 'timestamp' in seg_sel.columns:
-                    ultima_visita = seg_sel['timestamp'].max()
-                    st.metric("Última visita", ultima_visita.strftime('%d/%m/%Y'))
+                if con_fecha:
+                    st.metric("Última visita", visitas_ruta.ultima.strftime('%d/%m/%Y'))
                 else:
                     st.metric("Supervisores distintos", seg_sel['supervisor'].nunique())
             
@@ -1093,23 +1009,13 @@ elif vista == "Individual":
                 else:
                     st.metric("Registros este año", len(seg_sel))
     
-    with tab4:
+    with tab4, perfilador.tramo("pestaña", "📈 Indicadores"):
         st.subheader("📈 Indicadores de Gestión Comercial")
         
         if not df_cump.empty:
-            df_vendedor_cump = df_cump[df_cump['vendedor'] == vendedor_sel].copy()
+            df_vendedor_cump = dimension_vendedores.seleccionar(df_cump, 'cumplimiento', vendedor_sel)
             
             if not df_vendedor_cump.empty:
-                # Convertir porcentaje a numérico
-                df_vendedor_cump['cumplimiento_num'] = (
-                    df_vendedor_cump['cumplimiento']
-                    .astype(str)  # Convertir a string primero
-                    .str.replace('%', '')
-                    .replace('nan', np.nan)  # Manejar valores NaN
-                    .astype(float) / 100
-)
-                df_vendedor_cump['fecha'] = pd.to_datetime(df_vendedor_cump.apply(lambda x: f"{x['year']}-{x['mes']}-01", axis=1))
-                
                 # Gráfico de evolución temporal
                 st.markdown("#### Evolución Temporal")
                 
@@ -1124,15 +1030,13 @@ elif vista == "Individual":
                 )
                 fig_evo.update_yaxes(tickformat=".0%")
                 fig_evo.update_layout(legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1))
-                st.plotly_chart(fig_evo, use_container_width=True)
+                mostrar_grafico(fig_evo, use_container_width=True)
                 
                 # Comparativa con el equipo
                 st.markdown("#### Comparativa con el Equipo")
                 
                 # Calcular promedios del equipo por indicador
-                df_team_avg = df_cump.copy()
-                df_team_avg = df_team_avg.groupby(['indicador', 'year', 'mes']).agg({'cumplimiento_num': 'mean'}).reset_index()
-                df_team_avg['fecha'] = pd.to_datetime(df_team_avg.apply(lambda x: f"{x['year']}-{x['mes']}-01", axis=1))
+                df_team_avg = cubo_cumplimiento.consultar()[['indicador', 'fecha', 'cumplimiento_num']]
                 
                 # Unir datos del vendedor con promedios del equipo
                 df_comparativa = df_vendedor_cump.merge(
@@ -1167,7 +1071,7 @@ elif vista == "Individual":
                     st.markdown("#### Comparativa Multidimensional")
                     
                     # Obtener últimos datos por indicador
-                    df_last_values = df_vendedor_cump.sort_values(['indicador', 'fecha']).groupby('indicador').last().reset_index()
+                    df_last_values = df_vendedor_cump.sort_values(['indicador', 'fecha']).groupby('indicador', observed=True).last().reset_index()
                     
                     fig_radar = go.Figure()
                     
@@ -1181,7 +1085,7 @@ elif vista == "Individual":
                     ))
                     
                     # Añadir promedio equipo
-                    team_last_values = df_team_avg.sort_values(['indicador', 'fecha']).groupby('indicador').last().reset_index()
+                    team_last_values = df_team_avg.sort_values(['indicador', 'fecha']).groupby('indicador', observed=True).last().reset_index()
                     fig_radar.add_trace(go.Scatterpolar(
                         r=team_last_values['cumplimiento_num'],
                         theta=team_last_values['indicador'],
@@ -1197,13 +1101,13 @@ elif vista == "Individual":
                         height=500,
                         title="Comparación con Promedio del Equipo"
                     )
-                    st.plotly_chart(fig_radar, use_container_width=True)
+                    mostrar_grafico(fig_radar, use_container_width=True)
             else:
                 st.warning(f"No se encontraron datos de cumplimiento para {vendedor_sel}")
         else:
             st.warning("No se encontraron datos de cumplimiento para mostrar")
     
-    with tab5:
+    with tab5, perfilador.tramo("pestaña", "🎯 Plan de Desarrollo"):
         st.subheader("🎯 Plan de Desarrollo Personalizado")
         
         # Sección de recomendaciones específicas
@@ -1240,7 +1144,7 @@ elif vista == "Individual":
         st.markdown("---")
         st.subheader("📅 Plan de Acción Según Segmento")
         
-        if segmento == "🟢 Alto Desempeño & Alto Potencial":
+        if segmento == SEGMENTO_ESTRELLA:
             st.success("**Estrategia:** Desarrollo de liderazgo y retención")
             st.markdown("""
             1. **Mentoría:** Asignar como mentor de nuevos vendedores
@@ -1249,7 +1153,7 @@ elif vista == "Individual":
             4. **Visibilidad:** Presentar en reuniones de gerencia
             """)
         
-        elif segmento == "🟡 Buen Desempeño pero Bajo Potencial":
+        elif segmento == SEGMENTO_MANTENEDOR:
             st.info("**Estrategia:** Mantenimiento y desarrollo de autonomía")
             st.markdown("""
             1. **Rotación controlada:** Variar rutas periódicamente
@@ -1258,7 +1162,7 @@ elif vista == "Individual":
             4. **Reconocimiento:** Destacar consistencia en resultados
             """)
         
-        elif segmento == "🟠 Alto Potencial pero Bajo Desempeño":
+        elif segmento == SEGMENTO_POTENCIAL:
             st.warning("**Estrategia:** Desarrollo acelerado")
             st.markdown("""
             1. **Capacitación intensiva:** Programa acelerado de habilidades comerciales
@@ -1267,7 +1171,7 @@ elif vista == "Individual":
             4. **Retroalimentación:** Sesiones de feedback estructurado
             """)
         
-        elif segmento == "🔴 Bajo Desempeño & Bajo Potencial":
+        elif segmento == SEGMENTO_RIESGO:
             st.error("**Estrategia:** Acción correctiva")
             st.markdown("""
             1. **Plan de mejora:** Con objetivos y plazos específicos
@@ -1312,13 +1216,47 @@ elif vista == "Individual":
             ]
         }
         
-        st.dataframe(
+        mostrar_tabla(
             pd.DataFrame(timeline_data),
             hide_index=True,
             use_container_width=True
         )
 
+    with tab6, perfilador.tramo("pestaña", "🕓 Historial"):
+        st.subheader("🕓 Historial de Evaluaciones")
+        st.caption("Puntajes y segmento en cada ciclo de evaluación registrado (reglas por defecto)")
+        
+        trayectoria = historial.trayectoria(vendedor_sel) if historial is not None else pd.DataFrame()
+        if trayectoria.empty:
+            st.info("No hay ciclos registrados para este vendedor")
+        else:
+            if len(trayectoria) > 1:
+                fig_historial = px.line(
+                    trayectoria.melt(id_vars='fecha_ciclo', value_vars=['puntaje_total', 'potencial'],
+                                     var_name='Métrica', value_name='Puntaje'),
+                    x='fecha_ciclo',
+                    y='Puntaje',
+                    color='Métrica',
+                    markers=True,
+                    labels={'fecha_ciclo': 'Ciclo'}
+                )
+                fig_historial.update_yaxes(range=[0, 10])
+                mostrar_grafico(fig_historial, use_container_width=True)
+            else:
+                st.info("Sólo hay un ciclo registrado; la evolución aparecerá con el próximo ciclo")
+            
+            mostrar_tabla(
+                trayectoria[['fecha_ciclo', 'puntaje_total', 'potencial', 'segmento']].rename(columns={
+                    'fecha_ciclo': 'Ciclo', 'puntaje_total': 'Puntaje Total',
+                    'potencial': 'Potencial', 'segmento': 'Segmento'
+                }),
+                hide_index=True,
+                use_container_width=True
+            )
+
 else:  # Vista de Equipo
+    import plotly.express as px
+
     st.header("👥 Vista General del Equipo")
     st.markdown("""
     **Análisis comparativo** del equipo completo, con ranking de vendedores, matriz de talento 
@@ -1332,50 +1270,66 @@ else:  # Vista de Equipo
     rutas = df_eval[vendedor_col].unique()
     ruta_sel = st.sidebar.multiselect("Filtrar por Ruta", rutas)
     
-    # Aplicar filtros
-    df_filtrado = df_eval.copy()
-    if supervisor_sel:
-        df_filtrado = df_filtrado[df_filtrado['supervisor'].isin(supervisor_sel)]
-    if ruta_sel:
-        df_filtrado = df_filtrado[df_filtrado['vendedor'].isin(ruta_sel)]
+    # Aplicar filtros: máscaras precalculadas sobre el dataset compartido, sin copiarlo
+    mascara_filtro = ranking_equipo.mascara(supervisor_sel, ruta_sel)
+    df_filtrado = df_eval if mascara_filtro is None else df_eval[mascara_filtro]
     
     # Pestañas para vista de equipo
-    tab1, tab2, tab3 = st.tabs(["🏆 Ranking", "🧩 Matriz de Talento", "📊 Análisis por Área"])
+    tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs(["🏆 Ranking", "🧩 Matriz de Talento", "📊 Análisis por Área", "📦 Reportes en Lote", "🕓 Evolución", "🗺️ Cobertura", "📈 Tendencias"])
     
-    with tab1:
+    with tab1, perfilador.tramo("pestaña", "🏆 Ranking"):
         st.subheader("Ranking de Vendedores")
         st.caption("Comparativa de desempeño según diferentes métricas")
         
-        metrica_ranking = st.selectbox("Ordenar por", ["Puntaje Total", "Potencial"] + list(categorias.keys()))
-        
-        if metrica_ranking == "Puntaje Total":
-            df_ranking = df_filtrado.sort_values("puntaje_total", ascending=False)
-            col_ranking = "puntaje_total"
-        elif metrica_ranking == "Potencial":
-            df_ranking = df_filtrado.sort_values("potencial", ascending=False)
-            col_ranking = "potencial"
-        else:
-            df_ranking = df_filtrado.sort_values(metrica_ranking, ascending=False)
-            col_ranking = metrica_ranking
-        
-        st.dataframe(
-            df_ranking[[vendedor_col, 'supervisor', col_ranking, 'segmento']]
-            .set_index('ruta')
-            .style.background_gradient(cmap='YlGnBu', subset=[col_ranking]),
+        metricas_ranking = {"Puntaje Total": "puntaje_total", "Potencial": "potencial", **{c: c for c in categorias}}
+        metrica_ranking = st.selectbox("Ordenar por", list(metricas_ranking))
+        col_ranking = metricas_ranking[metrica_ranking]
+
+        # Orden precalculado: sólo se indexa con la máscara del filtro
+        posiciones_ranking = ranking_equipo.ordenar(col_ranking, mascara_filtro)
+
+        # Grilla paginada: sólo la página visible se envía al navegador
+        col_pag1, col_pag2, col_pag3 = st.columns([1, 1, 2])
+        filas_pagina = col_pag1.selectbox("Filas por página", [25, 50, 100], index=1)
+        total_paginas = max(1, -(-len(posiciones_ranking) // filas_pagina))
+        pagina = col_pag2.number_input("Página", min_value=1, max_value=total_paginas, value=1, step=1)
+        inicio_pagina = (int(pagina) - 1) * filas_pagina
+        posiciones_pagina = posiciones_ranking[inicio_pagina:inicio_pagina + filas_pagina]
+        col_pag3.caption(
+            f"Mostrando {inicio_pagina + 1 if len(posiciones_pagina) else 0}–{inicio_pagina + len(posiciones_pagina)} "
+            f"de {len(posiciones_ranking)} vendedores"
+        )
+
+        tabla_ranking = pd.DataFrame({
+            "Posición": np.arange(inicio_pagina + 1, inicio_pagina + len(posiciones_pagina) + 1),
+            "Nivel": ranking_equipo.colores[col_ranking].to_numpy()[posiciones_pagina],
+            vendedor_col: df_eval[vendedor_col].to_numpy()[posiciones_pagina],
+            "supervisor": df_eval['supervisor'].to_numpy()[posiciones_pagina],
+            col_ranking: df_eval[col_ranking].to_numpy()[posiciones_pagina],
+            "Percentil": ranking_equipo.percentiles[col_ranking].to_numpy()[posiciones_pagina],
+            "segmento": df_eval['segmento'].to_numpy()[posiciones_pagina],
+        })
+        mostrar_tabla(
+            tabla_ranking,
+            hide_index=True,
+            column_config={
+                col_ranking: columna_puntaje(col_ranking),
+                "Percentil": st.column_config.NumberColumn("Percentil", format="P%.0f", help="Percentil en todo el equipo"),
+            },
             use_container_width=True
         )
         
         fig = px.bar(
-            df_ranking.head(15),
+            df_eval.iloc[posiciones_ranking[:15]],
             x='ruta',
             y=col_ranking,
             color='supervisor',
             title=f"Top 15 por {metrica_ranking}",
             labels={'ruta': 'ruta', col_ranking: metrica_ranking}
         )
-        st.plotly_chart(fig, use_container_width=True)
+        mostrar_grafico(fig, use_container_width=True)
     
-    with tab2:
+    with tab2, perfilador.tramo("pestaña", "🧩 Matriz de Talento"):
         st.subheader("Matriz de Talento: Desempeño vs Potencial")
         st.caption("Clasificación estratégica del talento en el equipo")
         
@@ -1390,25 +1344,33 @@ else:  # Vista de Equipo
             title="Matriz de Talento"
         )
         
+        # Corte configurable en "Reglas de segmentación"
+        corte = reglas_segmentacion.corte_matriz
         fig.update_layout(
             shapes=[
-                dict(type='line', x0=7, x1=7, y0=0, y1=10, line=dict(color='gray', dash='dot')),
-                dict(type='line', x0=0, x1=10, y0=7, y1=7, line=dict(color='gray', dash='dot')),
-                dict(type='rect', x0=7, x1=10, y0=7, y1=10, line=dict(color='green'), opacity=0.1),
-                dict(type='rect', x0=0, x1=7, y0=7, y1=10, line=dict(color='orange'), opacity=0.1),
-                dict(type='rect', x0=7, x1=10, y0=0, y1=7, line=dict(color='yellow'), opacity=0.1),
-                dict(type='rect', x0=0, x1=7, y0=0, y1=7, line=dict(color='red'), opacity=0.1)
+                dict(type='line', x0=corte, x1=corte, y0=0, y1=10, line=dict(color='gray', dash='dot')),
+                dict(type='line', x0=0, x1=10, y0=corte, y1=corte, line=dict(color='gray', dash='dot')),
+                dict(type='rect', x0=corte, x1=10, y0=corte, y1=10, line=dict(color='green'), opacity=0.1),
+                dict(type='rect', x0=0, x1=corte, y0=corte, y1=10, line=dict(color='orange'), opacity=0.1),
+                dict(type='rect', x0=corte, x1=10, y0=0, y1=corte, line=dict(color='yellow'), opacity=0.1),
+                dict(type='rect', x0=0, x1=corte, y0=0, y1=corte, line=dict(color='red'), opacity=0.1)
             ],
             annotations=[
-                dict(x=8.5, y=8.5, text="Estrellas", showarrow=False, font=dict(color='green')),
-                dict(x=3.5, y=8.5, text="Potenciales", showarrow=False, font=dict(color='orange')),
-                dict(x=8.5, y=3.5, text="Mantenedores", showarrow=False, font=dict(color='gold')),
-                dict(x=3.5, y=3.5, text="Riesgos", showarrow=False, font=dict(color='red'))
+                dict(x=(corte + 10) / 2, y=(corte + 10) / 2, text="Estrellas", showarrow=False, font=dict(color='green')),
+                dict(x=corte / 2, y=(corte + 10) / 2, text="Potenciales", showarrow=False, font=dict(color='orange')),
+                dict(x=(corte + 10) / 2, y=corte / 2, text="Mantenedores", showarrow=False, font=dict(color='gold')),
+                dict(x=corte / 2, y=corte / 2, text="Riesgos", showarrow=False, font=dict(color='red'))
             ],
             height=600
         )
         
-        st.plotly_chart(fig, use_container_width=True)
+        mostrar_grafico(fig, use_container_width=True)
+        
+        # Conteo por segmento con las reglas vigentes
+        conteo_segmentos = df_filtrado['segmento'].value_counts(sort=False)
+        cols_segmentos = st.columns(len(conteo_segmentos))
+        for col, (nombre_segmento, cantidad) in zip(cols_segmentos, conteo_segmentos.items()):
+            col.metric(nombre_segmento, int(cantidad))
         
         st.markdown("""
         #### Interpretación de la Matriz:
@@ -1418,7 +1380,7 @@ else:  # Vista de Equipo
         - **🔴 Riesgos (Bajo desempeño, bajo potencial):** Planes de mejora o salida
         """)
     
-    with tab3:
+    with tab3, perfilador.tramo("pestaña", "📊 Análisis por Área"):
         st.subheader("📊 Análisis por Áreas Clave")
         st.caption("Evaluación detallada por categorías con recomendaciones personalizadas")
         
@@ -1450,15 +1412,13 @@ else:  # Vista de Equipo
             fig_dist.add_vline(x=promedio_area, line_dash="dash", line_color="red", 
                              annotation_text=f"Promedio: {promedio_area:.1f}", 
                              annotation_position="top")
-            st.plotly_chart(fig_dist, use_container_width=True)
+            mostrar_grafico(fig_dist, use_container_width=True)
         
         with col2:
             st.markdown(f"#### Ranking de {area_sel}")
-            st.dataframe(
-                df_area.head(10).style.background_gradient(
-                    cmap='YlGnBu',
-                    subset=[area_sel]
-                ),
+            mostrar_tabla(
+                df_area.head(10),
+                column_config={area_sel: columna_puntaje(area_sel)},
                 use_container_width=True
             )
         
@@ -1477,7 +1437,7 @@ else:  # Vista de Equipo
             labels={'ruta': 'ruta', area_sel: 'Puntaje'},
             category_orders={"estado": ["🔴 Crítico", "🟡 Aceptable", "🟢 Fuerte"]}
         )
-        st.plotly_chart(fig_barras, use_container_width=True)
+        mostrar_grafico(fig_barras, use_container_width=True)
         
         # Recomendaciones por segmento y puntuación
         st.markdown("---")
@@ -1522,10 +1482,297 @@ else:  # Vista de Equipo
                 - Proyectos de innovación
                 """)
 
+    with tab4, perfilador.tramo("pestaña", "📦 Reportes en Lote"):
+        st.subheader("📦 Generación de Reportes en Lote")
+        st.caption("PDF de todos los vendedores del filtro actual (supervisor / ruta), generados en paralelo y comprimidos en un ZIP")
+
+        etiquetas_tipos = {"general": "Perfil", "reconocimiento": "Reconocimiento", "mejora": "Plan de Mejora"}
+        tipos_sel = st.multiselect(
+            "Documentos",
+            list(TIPOS_PDF.keys()),
+            default=list(TIPOS_PDF.keys()),
+            format_func=lambda tipo: etiquetas_tipos.get(tipo, tipo)
+        )
+        vendedores_lote = sorted(df_filtrado[vendedor_col].dropna().unique())
+        total_documentos = len(vendedores_lote) * len(tipos_sel)
+        st.markdown(f"**{len(vendedores_lote)}** vendedores · **{total_documentos}** documentos")
+
+        if st.button("📦 Generar ZIP", disabled=total_documentos == 0):
+            progreso = st.progress(0.0, text="Iniciando generación...")
+
+            def al_avanzar(completados, vendedor, tipo):
+                progreso.progress(
+                    completados / total_documentos,
+                    text=f"{completados}/{total_documentos} · {etiquetas_tipos.get(tipo, tipo)} {vendedor}"
+                )
+
+            resultados = generar_lote_pdf(
+                vendedores_lote, tipos_sel, df_eval, df_cump, df_info,
+                artefactos=artefactos_pdf, version=version_pdf, variante=variante_pdf
+            )
+            with perfilador.tramo("pdf_lote", documentos=total_documentos):
+                zip_lote, errores_lote = escribir_zip_lote(resultados, al_avanzar=al_avanzar)
+            progreso.empty()
+
+            if errores_lote:
+                st.warning(f"{len(errores_lote)} documentos no se pudieron generar (detalle en errores.txt dentro del ZIP)")
+            nombre_zip = "_".join(supervisor_sel) if supervisor_sel else "Equipo"
+            st.download_button(
+                label="⬇️ Descargar ZIP",
+                data=zip_lote.getvalue(),
+                file_name=f"Reportes_{nombre_zip}_{datetime.now().strftime('%Y%m%d')}.zip",
+                mime="application/zip"
+            )
+
+    with tab5, perfilador.tramo("pestaña", "🕓 Evolución"):
+        st.subheader("🕓 Evolución entre Ciclos")
+        st.caption("Historial local de ciclos de evaluación, sin volver a descargar hojas anteriores")
+        
+        if historial is None or historial.vacio:
+            st.info("Todavía no hay ciclos registrados")
+        else:
+            def filtrar_equipo(df_ciclo):
+                if supervisor_sel:
+                    df_ciclo = df_ciclo[df_ciclo['supervisor'].isin(supervisor_sel)]
+                if ruta_sel:
+                    df_ciclo = df_ciclo[df_ciclo['ruta'].isin(ruta_sel)]
+                return df_ciclo
+            
+            # Estado del equipo a una fecha
+            fecha_estado = st.date_input("Estado del equipo al", value=datetime.now().date())
+            estado = filtrar_equipo(historial.estado_al(pd.Timestamp(fecha_estado) + pd.Timedelta(days=1) - pd.Timedelta(1)))
+            if estado.empty:
+                st.info("No hay ciclos registrados antes de esa fecha")
+            else:
+                st.caption(f"Ciclo del {estado['fecha_ciclo'].iloc[0].strftime('%d/%m/%Y %H:%M')} · {len(estado)} vendedores")
+                col1, col2 = st.columns(2)
+                col1.metric("Puntaje Promedio", f"{estado['puntaje_total'].mean():.1f}/10")
+                col2.metric("Potencial Promedio", f"{estado['potencial'].mean():.1f}/10")
+                mostrar_tabla(
+                    estado['segmento'].value_counts().rename_axis('Segmento').reset_index(name='Cantidad'),
+                    hide_index=True,
+                    use_container_width=True
+                )
+            
+            # Transiciones de segmento entre dos ciclos
+            if len(historial.ciclos) > 1:
+                st.markdown("#### Transiciones de Segmento")
+                etiquetas_ciclos = {
+                    fila.ciclo: f"{fila.fecha_ciclo.strftime('%d/%m/%Y %H:%M')} ({fila.vendedores} vendedores)"
+                    for fila in historial.ciclos.itertuples()
+                }
+                lista_ciclos = list(etiquetas_ciclos)
+                col1, col2 = st.columns(2)
+                with col1:
+                    ciclo_desde = st.selectbox("Desde", lista_ciclos, index=len(lista_ciclos) - 2,
+                                               format_func=etiquetas_ciclos.get)
+                with col2:
+                    ciclo_hasta = st.selectbox("Hasta", lista_ciclos, index=len(lista_ciclos) - 1,
+                                               format_func=etiquetas_ciclos.get)
+                
+                claves_equipo = filtrar_equipo(historial.ciclo(ciclo_hasta))['clave']
+                matriz_transiciones = historial.transiciones(ciclo_desde, ciclo_hasta, claves=claves_equipo)
+                if matriz_transiciones.empty:
+                    st.info("No hay vendedores en común entre ambos ciclos")
+                else:
+                    fig_transiciones = px.imshow(
+                        matriz_transiciones,
+                        text_auto=True,
+                        color_continuous_scale='Blues',
+                        labels=dict(x="Segmento nuevo", y="Segmento anterior", color="Vendedores")
+                    )
+                    fig_transiciones.update_layout(height=450, margin=dict(l=0, r=0, t=30, b=0))
+                    mostrar_grafico(fig_transiciones, use_container_width=True)
+
+    with tab6, perfilador.tramo("pestaña", "🗺️ Cobertura"):
+        st.subheader("🗺️ Cobertura de Visitas")
+        st.caption("Visitas de seguimiento de todo el equipo, sin abrir los vendedores uno por uno")
+        
+        cobertura = etapa_cobertura(versiones_datos, df_seg_orig, df_eval_categorias, dimension_vendedores)
+        posiciones_equipo = cobertura.posiciones(mascara_filtro)
+        
+        if pd.isna(cobertura.fecha_referencia):
+            st.info("No hay visitas de seguimiento con fecha para el equipo")
+        else:
+            # Mapa de calor: % de vendedores de cada supervisor con al menos una visita
+            col1, col2 = st.columns(2)
+            with col1:
+                nombre_periodo = st.radio("Periodo", list(PERIODOS), horizontal=True, key="periodo_cobertura")
+            periodo = PERIODOS[nombre_periodo]
+            total_periodos = len(cobertura.matrices[periodo].periodos)
+            with col2:
+                ultimos_periodos = st.slider("Periodos a mostrar", min_value=1, max_value=max(total_periodos, 2),
+                                             value=min(total_periodos, 12 if periodo == "M" else 16),
+                                             key="periodos_cobertura")
+            
+            mapa_cobertura = cobertura.por_supervisor(periodo, posiciones_equipo, ultimos_periodos)
+            formato_periodo = '%m/%Y' if periodo == "M" else '%d/%m/%Y'
+            fig_cobertura = px.imshow(
+                mapa_cobertura.round(0),
+                x=mapa_cobertura.columns.strftime(formato_periodo),
+                text_auto=True,
+                color_continuous_scale='RdYlGn',
+                range_color=[0, 100],
+                aspect='auto',
+                labels=dict(x=nombre_periodo, y="Supervisor", color="% vendedores visitados")
+            )
+            fig_cobertura.update_layout(height=max(250, 60 * len(mapa_cobertura) + 120), margin=dict(l=0, r=0, t=30, b=0))
+            mostrar_grafico(fig_cobertura, use_container_width=True)
+            
+            with st.expander("🔍 Visitas por vendedor"):
+                visitas_vendedor = cobertura.densa(periodo, posiciones_equipo, ultimos_periodos)
+                visitas_vendedor.columns = visitas_vendedor.columns.strftime(formato_periodo)
+                mostrar_tabla(visitas_vendedor, use_container_width=True)
+            
+            # Brechas: vendedores sin visita en N días antes del corte
+            st.markdown("#### ⏰ Vendedores sin Visita")
+            col1, col2 = st.columns(2)
+            with col1:
+                dias_brecha = st.number_input("Días sin visita", min_value=1, max_value=365, value=DIAS_BRECHA,
+                                              key="dias_brecha")
+            with col2:
+                fecha_corte = st.date_input("Fecha de corte", value=cobertura.fecha_referencia.date(),
+                                            key="corte_brecha")
+            st.caption("Por defecto el corte es la visita más reciente registrada")
+            
+            corte = pd.Timestamp(fecha_corte) + pd.Timedelta(days=1) - pd.Timedelta(1)
+            brechas = cobertura.brechas(dias_brecha, corte, posiciones_equipo)
+            total_equipo = len(cobertura.claves) if posiciones_equipo is None else len(posiciones_equipo)
+            col1, col2 = st.columns(2)
+            col1.metric("Vendedores sin visita", f"{len(brechas)} de {total_equipo}")
+            col2.metric("Nunca visitados", int(brechas['Días sin visita'].isna().sum()))
+            
+            if brechas.empty:
+                st.success(f"Todos los vendedores tienen al menos una visita en los últimos {dias_brecha} días")
+            else:
+                mostrar_tabla(
+                    brechas,
+                    column_config={
+                        "Última visita": st.column_config.DatetimeColumn(format="DD/MM/YYYY"),
+                        "Días sin visita": st.column_config.NumberColumn(format="%d"),
+                    },
+                    use_container_width=True,
+                    hide_index=True
+                )
+                st.download_button(
+                    "⬇️ Descargar brechas (CSV)",
+                    data=brechas.to_csv(index=False).encode('utf-8'),
+                    file_name=f"brechas_cobertura_{fecha_corte.strftime('%Y%m%d')}.csv",
+                    mime="text/csv"
+                )
+
+    with tab7, perfilador.tramo("pestaña", "📈 Tendencias"):
+        st.subheader("📈 Tendencias de Cumplimiento")
+        st.caption("Pendiente de la recta de mínimos cuadrados de cada vendedor, en puntos de cumplimiento por mes")
+        
+        if tendencias_cumplimiento.detalle.empty:
+            st.info("No hay datos de cumplimiento para calcular tendencias")
+        else:
+            col1, col2 = st.columns(2)
+            with col1:
+                opciones_indicador = ["Todos (promedio)"] + tendencias_cumplimiento.indicadores
+                indicador_tendencia = st.selectbox("Indicador", opciones_indicador, key="indicador_tendencias")
+            with col2:
+                cantidad_tendencias = st.slider("Vendedores por lista", min_value=5, max_value=25, value=10,
+                                                key="cantidad_tendencias")
+            
+            claves_equipo = None if mascara_filtro is None else normalizar_claves(df_filtrado[vendedor_col]).unique()
+            mejorando, empeorando = tendencias_cumplimiento.clasificacion(
+                None if indicador_tendencia == opciones_indicador[0] else indicador_tendencia,
+                claves=claves_equipo,
+                cantidad=cantidad_tendencias,
+            )
+            
+            # Nombre y supervisor desde la dimensión de vendedores
+            columnas_maestro = [c for c in ('clave', 'nombre_vendedor', 'supervisor') if c in dimension_vendedores.maestro.columns]
+            def tabla_tendencias(tabla):
+                return dimension_vendedores.maestro[columnas_maestro].merge(tabla, on='clave', how='right').rename(columns={
+                    'clave': 'Ruta', 'nombre_vendedor': 'Vendedor', 'supervisor': 'Supervisor',
+                    'pendiente': 'Pendiente (pp/mes)', 'media_reciente': f'Media reciente ({VENTANA_RECIENTE}m)',
+                    'volatilidad': 'Volatilidad (pp)', 'puntos': 'Registros', 'tendencia': 'Tendencia',
+                }).drop(columns=['indicador'], errors='ignore')
+            
+            formato_tendencias = {
+                "Pendiente (pp/mes)": st.column_config.NumberColumn(format="%+.2f"),
+                f"Media reciente ({VENTANA_RECIENTE}m)": st.column_config.NumberColumn(format="%.1f"),
+                "Volatilidad (pp)": st.column_config.NumberColumn(format="%.1f"),
+            }
+            col1, col2 = st.columns(2)
+            with col1:
+                st.markdown("#### ↑ Mejorando")
+                if mejorando.empty:
+                    st.info("Ningún vendedor con tendencia positiva")
+                else:
+                    mostrar_tabla(tabla_tendencias(mejorando), column_config=formato_tendencias,
+                                  use_container_width=True, hide_index=True)
+            with col2:
+                st.markdown("#### ↓ Empeorando")
+                if empeorando.empty:
+                    st.info("Ningún vendedor con tendencia negativa")
+                else:
+                    mostrar_tabla(tabla_tendencias(empeorando), column_config=formato_tendencias,
+                                  use_container_width=True, hide_index=True)
+            
+            extremos = pd.concat([mejorando, empeorando.iloc[::-1]])
+            if not extremos.empty:
+                fig_tendencias = px.bar(
+                    extremos,
+                    x='pendiente',
+                    y='clave',
+                    orientation='h',
+                    color='pendiente',
+                    color_continuous_scale='RdYlGn',
+                    color_continuous_midpoint=0,
+                    hover_data=['media_reciente', 'volatilidad', 'puntos'],
+                    labels={'pendiente': 'Pendiente (pp/mes)', 'clave': 'Ruta'}
+                )
+                fig_tendencias.update_layout(height=max(300, 22 * len(extremos) + 100),
+                                             yaxis={'categoryorder': 'array', 'categoryarray': extremos['clave'].iloc[::-1].tolist()},
+                                             margin=dict(l=0, r=0, t=30, b=0))
+                mostrar_grafico(fig_tendencias, use_container_width=True)
+
+perfilador.terminar()
+
 # =============================================
 # FOOTER
 # =============================================
 st.markdown("---")
 st.caption("Sistema de Gestión de perfiles comercial | © 2025 | Versión 2.1")
 
+duracion_rerun = perfilador.cerrar()
+lineas_perfilado = perfilador.exportar() if perfilador.activo else []
+
+if MODO_DEPURACION:
+    fin_rerun = time.perf_counter()
+    latencias = st.session_state.setdefault('latencias_rerun', [])
+    latencias.append((fin_rerun - inicio_rerun) * 1000)
+    del latencias[:-50]
+    with st.sidebar.expander("⏱️ Latencia"):
+        st.caption(
+            f"Último rerun: {latencias[-1]:.0f} ms "
+            f"(datos {(fin_preparacion - inicio_rerun) * 1000:.0f} ms · "
+            f"vista {(fin_rerun - fin_preparacion) * 1000:.0f} ms)"
+        )
+        st.caption(f"Mediana de {len(latencias)} reruns: {np.median(latencias):.0f} ms")
+        st.dataframe(perfilador.desglose(duracion_rerun), hide_index=True, use_container_width=True)
+        st.download_button(
+            "⬇️ Tramos (JSON)",
+            data="\n".join(lineas_perfilado),
+            file_name=f"perfilado_{perfilador.rerun}.jsonl",
+            mime="application/json"
+        )
+    with st.sidebar.expander("🧮 Memoria"):
+        memoria = reporte_memoria({
+            "Evaluación (categorías)": df_eval_categorias,
+            "Evaluación (segmentada)": df_eval,
+            "Seguimiento": df_seg_orig,
+            "Cumplimiento": df_cump,
+            "Información": df_info,
+        })
+        st.caption(
+            f"{'Modo compacto' if MODO_COMPACTO else 'Modo estándar'} · "
+            f"{memoria['MB propios'].sum():.1f} MB retenidos (columnas compartidas contadas una vez)"
+        )
+        st.dataframe(memoria, hide_index=True, use_container_width=True)
+
 
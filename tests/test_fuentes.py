@@ -0,0 +1,39 @@
+from nucleo.fuentes import AlmacenInstantaneas, crear_fuente, obtener_instantanea
+
+
+def _objetos(almacen):
+    return sorted(p.name for p in almacen.objetos.glob("*/*"))
+
+
+def test_conserva_las_ultimas_instantaneas_por_fuente(tmp_path):
+    almacen = AlmacenInstantaneas(tmp_path / "cache", conservar=2)
+    archivo = tmp_path / "fuente.csv"
+    fuente = crear_fuente("evaluacion", str(archivo))
+
+    shas = []
+    for version in range(4):
+        archivo.write_text(f"a,b\n{version},{version}\n", encoding="utf-8")
+        shas.append(obtener_instantanea(fuente, almacen).sha)
+
+    assert _objetos(almacen) == sorted(shas[-2:])
+    assert almacen.registro("evaluacion")["recientes"] == [shas[3], shas[2]]
+    assert almacen.leer(shas[-1]) == archivo.read_bytes()
+
+
+def test_no_borra_objetos_de_otra_fuente(tmp_path):
+    almacen = AlmacenInstantaneas(tmp_path / "cache", conservar=1)
+    compartido = almacen.registrar("seguimiento", b"mismo contenido")
+    almacen.registrar("evaluacion", b"mismo contenido")
+    almacen.registrar("evaluacion", b"otro contenido")
+
+    assert almacen.existe(compartido)
+    assert len(_objetos(almacen)) == 2
+
+
+def test_purga_objetos_huerfanos(tmp_path):
+    almacen = AlmacenInstantaneas(tmp_path / "cache")
+    huerfano = almacen.guardar(b"sin registro")
+    sha = almacen.registrar("evaluacion", b"vigente")
+
+    assert not almacen.existe(huerfano)
+    assert _objetos(almacen) == [sha]
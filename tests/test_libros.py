@@ -0,0 +1,50 @@
+import io
+from datetime import datetime
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+from nucleo.libros import leer_libro
+
+
+def _libro():
+    libro = Workbook()
+    hoja = libro.active
+    hoja.title = "cumplimiento"
+    hoja.append(["vendedor", "indicador", "meta", "real", "cumplimiento", "fecha", "activo"])
+    hoja.append(["R001", "Volumen", 100, 95.5, 0.955, datetime(2025, 1, 1), True])
+    hoja.append(["R002", "Cobertura", 80, None, None, datetime(2025, 2, 1), False])
+    hoja.append(["R003", None, 120, 130.25, 1.08, datetime(2025, 3, 1), True])
+    hoja.append([None] * 7)     # fila con formato pero sin datos
+
+    info = libro.create_sheet("informacion")
+    info.append(["ruta", "nombre_vendedor", "cedula", "fecha_ingreso", None])
+    info.append(["R001", "ANA", "001", datetime(2020, 5, 4), "x"])      # cédula guardada como texto
+    info.append(["R002", "LUIS", "002", datetime(2019, 1, 15), None])
+
+    buffer = io.BytesIO()
+    libro.save(buffer)
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("hojas", [None, ["cumplimiento"], ["cumplimiento", "informacion"]])
+def test_modos_devuelven_mismos_tipos(hojas):
+    contenido = _libro()
+    completo = leer_libro(contenido, hojas, modo="completo")
+    streaming = leer_libro(contenido, hojas, modo="streaming")
+
+    assert list(completo) == list(streaming)
+    for nombre in completo:
+        pd.testing.assert_series_equal(completo[nombre].dtypes, streaming[nombre].dtypes, obj=nombre)
+        pd.testing.assert_frame_equal(completo[nombre], streaming[nombre], obj=nombre)
+
+
+def test_streaming_hoja_inexistente():
+    with pytest.raises(ValueError, match="no_existe"):
+        leer_libro(_libro(), ["no_existe"], modo="streaming")
+
+
+def test_modo_desconocido():
+    with pytest.raises(ValueError, match="Modo de lectura desconocido"):
+        leer_libro(_libro(), modo="otro")